@@ -0,0 +1,113 @@
+"""Memory used per block of an SCFG.
+
+Builds SCFGs of python bytecode blocks, connected as a chain, and reports
+the traced allocations per block, both for the incremental SCFG API and for
+the SCFGBuilder. As a baseline for the slotted layout of the blocks, labels
+and names, the block objects alone are also measured, once with the real
+classes and once with copies of them that are plain frozen dataclasses
+without slots. Run from the repository root with:
+
+    python -m benchmarks.bench_memory [num_blocks]
+
+"""
+import dataclasses
+import sys
+import tracemalloc
+
+from numba_rvsdg.core.datastructures.basic_block import PythonBytecodeBlock
+from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.datastructures.labels import BlockName, PythonBytecodeLabel
+
+
+def unslotted(cls):
+    """A frozen dataclass with the fields of `cls`, but without slots."""
+    fields = [
+        (f.name, f.type, dataclasses.field(default=None))
+        for f in dataclasses.fields(cls)
+    ]
+    return dataclasses.make_dataclass(
+        f"Unslotted{cls.__name__}", fields, frozen=True
+    )
+
+
+UnslottedBlock = unslotted(PythonBytecodeBlock)
+UnslottedLabel = unslotted(PythonBytecodeLabel)
+UnslottedName = unslotted(BlockName)
+
+
+class _Names:
+    # Hands out names without registering them anywhere, so that only the
+    # block objects themselves are measured.
+    def __init__(self):
+        self.index = -1
+
+    def new_block_name(self, label):
+        self.index += 1
+        return BlockName(f"python_bytecode_block_{self.index}", self.index)
+
+
+def build_incremental(num_blocks):
+    scfg = SCFG()
+    names = [
+        scfg.add_block("python_bytecode", PythonBytecodeLabel(), begin=i * 2, end=i * 2 + 2)
+        for i in range(num_blocks)
+    ]
+    for src, dst in zip(names, names[1:]):
+        scfg.add_connections(src, [dst])
+    return scfg
+
+
+def build_bulk(num_blocks):
+    builder = SCFG.builder()
+    names = [
+        builder.add_block("python_bytecode", PythonBytecodeLabel(), begin=i * 2, end=i * 2 + 2)
+        for i in range(num_blocks)
+    ]
+    for src, dst in zip(names, names[1:]):
+        builder.add_connections(src, [dst])
+    return builder.build()
+
+
+def build_objects(num_blocks):
+    names = _Names()
+    return [
+        PythonBytecodeBlock(names, PythonBytecodeLabel(), begin=i * 2, end=i * 2 + 2)
+        for i in range(num_blocks)
+    ]
+
+
+def build_objects_unslotted(num_blocks):
+    return [
+        UnslottedBlock(
+            block_name=UnslottedName(
+                f"python_bytecode_block_{i}", i, hash(i)
+            ),
+            label=UnslottedLabel(),
+            begin=i * 2,
+            end=i * 2 + 2,
+        )
+        for i in range(num_blocks)
+    ]
+
+
+def measure(build, num_blocks):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        scfg = build(num_blocks)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del scfg
+    return (after - before) / num_blocks
+
+
+def main(num_blocks=10000):
+    builds = (build_incremental, build_bulk, build_objects, build_objects_unslotted)
+    for build in builds:
+        per_block = measure(build, num_blocks)
+        print(f"{build.__name__:24} {per_block:8.1f} bytes per block")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
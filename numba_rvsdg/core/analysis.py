@@ -0,0 +1,78 @@
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class AnalysisManager:
+    """Cache of graph analyses for a single SCFG.
+
+    Every mutating method of the SCFG bumps the `generation` counter. Results
+    are stored together with the generation they were computed at, and a
+    result from an older generation is never handed out again, so stale
+    analyses are dropped without the mutating code having to know which
+    analyses exist.
+
+    Cached results are shared between all callers and must be treated as
+    read-only.
+
+    Analyses that can be updated in place, like the DynamicDominatorTree,
+    may instead be registered with `maintain`. They survive mutations: the
+    SCFG reports every edge it inserts or deletes to them, once the edge
+    lists are updated, and `get` hands them out until they are released.
+
+    Attributes
+    ----------
+    generation: int
+        Mutation counter of the SCFG this manager is attached to.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._cache: Dict[Hashable, Tuple[int, Any]] = {}
+        self.maintained: Dict[Hashable, Any] = {}
+
+    def invalidate(self):
+        """Record a mutation, invalidating all cached analyses."""
+        self.generation += 1
+
+    def get(self, key: Hashable, compute: Callable, *args) -> Any:
+        """Return the cached analysis `key`, running `compute(*args)` if
+        there is no result for the current generation."""
+        if key in self.maintained:
+            return self.maintained[key]
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == self.generation:
+            return entry[1]
+        value = compute(*args)
+        self._cache[key] = (self.generation, value)
+        return value
+
+    def is_cached(self, key: Hashable) -> bool:
+        """Is there a result for `key` at the current generation."""
+        if key in self.maintained:
+            return True
+        entry = self._cache.get(key)
+        return entry is not None and entry[0] == self.generation
+
+    def clear(self):
+        """Drop all cached analyses."""
+        self._cache.clear()
+
+    def maintain(self, key: Hashable, analysis: Any):
+        """Register `analysis` under `key`, to be kept current through its
+        `edge_inserted(src, dst)` and `edge_deleted(src, dst)` methods
+        instead of being dropped on mutations."""
+        self.maintained[key] = analysis
+
+    def release(self, key: Hashable):
+        """Stop maintaining the analysis `key`."""
+        self.maintained.pop(key, None)
+
+    def edge_inserted(self, src: Hashable, dst: Hashable):
+        """Report the new edge from `src` to `dst` to maintained analyses."""
+        for analysis in self.maintained.values():
+            analysis.edge_inserted(src, dst)
+
+    def edge_deleted(self, src: Hashable, dst: Hashable):
+        """Report the removed edge from `src` to `dst` to maintained
+        analyses."""
+        for analysis in self.maintained.values():
+            analysis.edge_deleted(src, dst)
@@ -1,12 +1,14 @@
+import copy
 import dis
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from dataclasses import dataclass, field, InitVar
 
+from numba_rvsdg.core.datastructures.jump_table import JumpTable
 from numba_rvsdg.core.datastructures.labels import Label, NameGenerator, BlockName
 from numba_rvsdg.core.utils import _next_inst_offset
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BasicBlock:
     name_gen: InitVar[NameGenerator]
     """Block Name Generator associated with this BasicBlock.
@@ -24,7 +26,7 @@ class BasicBlock:
         object.__setattr__(self, "block_name", block_name)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PythonBytecodeBlock(BasicBlock):
     begin: int = None
     """The starting bytecode offset.
@@ -53,15 +55,60 @@ class PythonBytecodeBlock(BasicBlock):
         return out
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ControlVariableBlock(BasicBlock):
     variable_assignment: dict = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BranchBlock(BasicBlock):
     variable: str = None
-    branch_value_table: dict = None
+    """The control variable the branch is taken on."""
+
+    branch_value_table: JumpTable = None
+    """Mapping of the values of `variable` to the jump targets, and back.
+    Any mapping or iterable of (value, target) pairs is converted to a
+    JumpTable."""
+
+    def __post_init__(self, name_gen):
+        BasicBlock.__post_init__(self, name_gen)
+        table = self.branch_value_table
+        if not isinstance(table, JumpTable):
+            object.__setattr__(
+                self, "branch_value_table", JumpTable(table or ())
+            )
+
+    def replace_target(self, old: BlockName, new: BlockName) -> "BranchBlock":
+        """A copy of the block, under the same name, that jumps to `new`
+        wherever it jumped to `old`."""
+        block = copy.copy(self)
+        object.__setattr__(
+            block,
+            "branch_value_table",
+            self.branch_value_table.replace_target(old, new),
+        )
+        return block
+
+
+@dataclass(frozen=True, slots=True)
+class RegionBlock(BasicBlock):
+    kind: str = None
+    """The kind of the region, like "loop" or "branch"."""
+
+    header: BlockName = None
+    """The header of the region, the head of `subregion`."""
+
+    exiting: BlockName = None
+    """The exiting block of the region, the only exiting block of
+    `subregion`."""
+
+    subregion: "SCFG" = None
+    """The blocks of the region, with nested regions collapsed into
+    RegionBlocks in turn. Edges leaving the region and the back edges to
+    its header are not part of it."""
+
+    jump_targets: Tuple[BlockName, ...] = ()
+    """The out edges of the exiting block in the original SCFG, in order."""
 
 
 # Maybe we can register new blocks over here instead of static lists
@@ -70,6 +117,7 @@ block_types = {
     "python_bytecode": PythonBytecodeBlock,
     "control_variable": ControlVariableBlock,
     "branch": BranchBlock,
+    "region": RegionBlock,
 }
 
 
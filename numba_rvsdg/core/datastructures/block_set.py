@@ -0,0 +1,192 @@
+from collections.abc import MutableSet
+from typing import Iterable, Iterator
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+
+class BlockSet(MutableSet):
+    """A set of blocks of one SCFG, stored as a bitmask over the dense block
+    ids.
+
+    Bit ``i`` of `mask` is set when the block with dense id ``i`` is a member.
+    Union, intersection and difference with another BlockSet of the same SCFG
+    are single integer operations, so they are word-parallel instead of
+    hashing every member. Membership tests still look up the id of the given
+    BlockName, and iteration yields the members in the order they were added
+    to the SCFG.
+
+    A BlockSet can be used wherever a ``Set[BlockName]`` is expected, and
+    since block ids are never reused it stays valid while blocks are added to
+    the SCFG.
+
+    Parameters
+    ----------
+    scfg: SCFG
+        The SCFG whose blocks are contained.
+    names: Iterable[BlockName]
+        The initial members.
+    """
+
+    __slots__ = ("scfg", "mask")
+
+    def __init__(self, scfg: "SCFG", names: Iterable[BlockName] = ()):
+        self.scfg = scfg
+        if isinstance(names, BlockSet) and names.scfg is scfg:
+            self.mask = names.mask
+        else:
+            self.mask = self._mask_of(names)
+
+    @classmethod
+    def from_mask(cls, scfg: "SCFG", mask: int) -> "BlockSet":
+        new = cls.__new__(cls)
+        new.scfg = scfg
+        new.mask = mask
+        return new
+
+    @classmethod
+    def all_blocks(cls, scfg: "SCFG") -> "BlockSet":
+        """A BlockSet containing every block of `scfg`."""
+        return cls.from_mask(scfg, (1 << len(scfg._block_names)) - 1)
+
+    def _mask_of(self, names: Iterable[BlockName]) -> int:
+        if isinstance(names, BlockSet) and names.scfg is self.scfg:
+            return names.mask
+        ids = self.scfg._block_ids
+        mask = 0
+        for name in names:
+            mask |= 1 << ids[name]
+        return mask
+
+    def _coerce(self, other) -> int:
+        # Members of other that are not blocks of the SCFG can never be in
+        # this set, so they are dropped.
+        if isinstance(other, BlockSet) and other.scfg is self.scfg:
+            return other.mask
+        ids = self.scfg._block_ids
+        mask = 0
+        for name in other:
+            idx = ids.get(name)
+            if idx is not None:
+                mask |= 1 << idx
+        return mask
+
+    def __contains__(self, name) -> bool:
+        idx = self.scfg._block_ids.get(name)
+        return idx is not None and (self.mask >> idx) & 1 == 1
+
+    def __iter__(self) -> Iterator[BlockName]:
+        names = self.scfg._block_names
+        # The binary representation, least significant bit first.
+        bits = bin(self.mask)[:1:-1]
+        idx = bits.find("1")
+        while idx != -1:
+            yield names[idx]
+            idx = bits.find("1", idx + 1)
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __repr__(self):
+        return f"BlockSet({list(self)!r})"
+
+    def add(self, name: BlockName):
+        self.mask |= 1 << self.scfg._block_ids[name]
+
+    def discard(self, name: BlockName):
+        idx = self.scfg._block_ids.get(name)
+        if idx is not None:
+            self.mask &= ~(1 << idx)
+
+    def copy(self) -> "BlockSet":
+        return BlockSet.from_mask(self.scfg, self.mask)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BlockSet) and other.scfg is self.scfg:
+            return self.mask == other.mask
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __le__(self, other) -> bool:
+        if isinstance(other, BlockSet) and other.scfg is self.scfg:
+            return self.mask & ~other.mask == 0
+        return super().__le__(other)
+
+    def __or__(self, other) -> "BlockSet":
+        return BlockSet.from_mask(self.scfg, self.mask | self._mask_of(other))
+
+    def __and__(self, other) -> "BlockSet":
+        return BlockSet.from_mask(self.scfg, self.mask & self._coerce(other))
+
+    def __sub__(self, other) -> "BlockSet":
+        return BlockSet.from_mask(self.scfg, self.mask & ~self._coerce(other))
+
+    def __xor__(self, other) -> "BlockSet":
+        return BlockSet.from_mask(self.scfg, self.mask ^ self._mask_of(other))
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __rsub__(self, other) -> set:
+        return set(name for name in other if name not in self)
+
+    def __ior__(self, other) -> "BlockSet":
+        self.mask |= self._mask_of(other)
+        return self
+
+    def __iand__(self, other) -> "BlockSet":
+        self.mask &= self._coerce(other)
+        return self
+
+    def __isub__(self, other) -> "BlockSet":
+        self.mask &= ~self._coerce(other)
+        return self
+
+    def __ixor__(self, other) -> "BlockSet":
+        self.mask ^= self._mask_of(other)
+        return self
+
+    def union(self, *others) -> "BlockSet":
+        mask = self.mask
+        for other in others:
+            mask |= self._mask_of(other)
+        return BlockSet.from_mask(self.scfg, mask)
+
+    def intersection(self, *others) -> "BlockSet":
+        mask = self.mask
+        for other in others:
+            mask &= self._coerce(other)
+        return BlockSet.from_mask(self.scfg, mask)
+
+    def difference(self, *others) -> "BlockSet":
+        mask = self.mask
+        for other in others:
+            mask &= ~self._coerce(other)
+        return BlockSet.from_mask(self.scfg, mask)
+
+    def update(self, *others):
+        for other in others:
+            self.mask |= self._mask_of(other)
+
+    def intersection_update(self, *others):
+        for other in others:
+            self.mask &= self._coerce(other)
+
+    def difference_update(self, *others):
+        for other in others:
+            self.mask &= ~self._coerce(other)
+
+    def isdisjoint(self, other) -> bool:
+        return self.mask & self._coerce(other) == 0
+
+    def issubset(self, other) -> bool:
+        if isinstance(other, BlockSet) and other.scfg is self.scfg:
+            return self.mask & ~other.mask == 0
+        return all(name in other for name in self)
+
+    def issuperset(self, other) -> bool:
+        return all(name in self for name in other)
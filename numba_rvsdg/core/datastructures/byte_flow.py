@@ -1,16 +1,12 @@
 import dis
 from dataclasses import dataclass
+from typing import List, Optional
 
 from numba_rvsdg.core.datastructures.scfg import SCFG
 from numba_rvsdg.core.datastructures.flow_info import FlowInfo
+from numba_rvsdg.core.passes import PassManager, PassResult, restructure_passes
 from numba_rvsdg.core.utils import _logger, _LogWrap
 
-from numba_rvsdg.core.transformations import (
-    restructure_loop,
-    restructure_branch,
-    join_returns,
-)
-
 
 @dataclass(frozen=True)
 class ByteFlow:
@@ -26,22 +22,20 @@ class ByteFlow:
         scfg = flowinfo.build_basicblocks()
         return ByteFlow(bc=bc, scfg=scfg)
 
-    def _join_returns(self):
-        join_returns(self.scfg)
-
-    def _restructure_loop(self):
-        restructure_loop(self.scfg)
-
-    def _restructure_branch(self):
-        restructure_branch(self.scfg)
-
-    def restructure(self):
-        # close
-        join_returns(self.scfg)
-        # handle loop
-        restructure_loop(self.scfg)
-        # handle branch
-        restructure_branch(self.scfg)
+    def restructure(
+        self, pass_manager: Optional[PassManager] = None
+    ) -> List[PassResult]:
+        """Restructure the SCFG in place, by default by closing it and then
+        restructuring the loops and the branches, and return what each of
+        the passes did. A PassManager may be given to run other passes."""
+        if pass_manager is None:
+            pass_manager = PassManager(restructure_passes())
+        return pass_manager.run(self)
+
+    def nested(self) -> "ByteFlow":
+        """A ByteFlow of the same bytecode, with every region extracted
+        into its own SCFG, see `SCFG.nested`."""
+        return ByteFlow(bc=self.bc, scfg=self.scfg.nested())
 
     @staticmethod
     def bcmap_from_bytecode(bc: dis.Bytecode):
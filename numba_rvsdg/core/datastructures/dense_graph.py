@@ -0,0 +1,154 @@
+from array import array
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from numba_rvsdg.core.datastructures.basic_block import BasicBlock
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+
+class _EdgeView(Mapping):
+    """Read-only ``Dict[BlockName, Tuple[BlockName, ...]]`` view over a CSR
+    edge array pair of a DenseGraph."""
+
+    __slots__ = ("_graph", "_offsets", "_targets")
+
+    def __init__(self, graph: "DenseGraph", offsets: array, targets: array):
+        self._graph = graph
+        self._offsets = offsets
+        self._targets = targets
+
+    def __getitem__(self, name: BlockName) -> Tuple[BlockName, ...]:
+        idx = self._graph.ids[name]
+        names = self._graph.names
+        begin, end = self._offsets[idx], self._offsets[idx + 1]
+        return tuple(names[i] for i in self._targets[begin:end])
+
+    def __iter__(self) -> Iterator[BlockName]:
+        return iter(self._graph.names)
+
+    def __len__(self) -> int:
+        return len(self._graph.names)
+
+
+class DenseGraph:
+    """Integer indexed, array backed snapshot of an SCFG.
+
+    Every block is identified by the dense integer id it was given when it was
+    added to the SCFG. Successors, predecessors and back edges are stored in
+    compressed sparse row (CSR) form: the neighbours of block ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]`` in flat ``array('i')`` buffers.
+
+    A snapshot can also be taken of a SubgraphView, the blocks of the
+    subgraph are then numbered in its iteration order and edges leaving the
+    subgraph are dropped.
+
+    The snapshot reflects the SCFG at the time it was built, and it is meant to
+    be consumed by graph analyses that would otherwise have to hash BlockNames
+    for every edge they visit. The name based API (``__getitem__``,
+    ``__contains__``, ``out_edges`` and ``back_edges``) mirrors the one of the
+    SCFG.
+
+    Attributes
+    ----------
+    scfg: SCFG
+        The SCFG this snapshot was taken from.
+    names: List[BlockName]
+        Mapping of dense ids to BlockNames.
+    ids: Dict[BlockName, int]
+        Mapping of BlockNames to dense ids.
+    """
+
+    __slots__ = (
+        "scfg",
+        "names",
+        "ids",
+        "succ_offsets",
+        "succ_targets",
+        "pred_offsets",
+        "pred_targets",
+        "back_offsets",
+        "back_targets",
+    )
+
+    def __init__(self, scfg: "SCFG", subgraph: Optional["SubgraphView"] = None):
+        self.scfg = scfg
+        if subgraph is None:
+            self.names: List[BlockName] = list(scfg._block_names)
+            self.ids: Dict[BlockName, int] = dict(scfg._block_ids)
+        else:
+            self.names = list(subgraph)
+            self.ids = {name: idx for idx, name in enumerate(self.names)}
+        ids = self.ids
+
+        succ_offsets = array("i", [0])
+        succ_targets = array("i")
+        pred_offsets = array("i", [0])
+        pred_targets = array("i")
+        back_offsets = array("i", [0])
+        back_targets = array("i")
+        for name in self.names:
+            # Edges to names that are not blocks of the graph are dropped,
+            # both from the successors and from the predecessor index.
+            succ_targets.extend(ids[t] for t in scfg.out_edges[name] if t in ids)
+            succ_offsets.append(len(succ_targets))
+            pred_targets.extend(ids[p] for p in scfg.in_edges[name] if p in ids)
+            pred_offsets.append(len(pred_targets))
+            back_targets.extend(ids[t] for t in scfg.back_edges[name] if t in ids)
+            back_offsets.append(len(back_targets))
+
+        self.succ_offsets = succ_offsets
+        self.succ_targets = succ_targets
+        self.pred_offsets = pred_offsets
+        self.pred_targets = pred_targets
+        self.back_offsets = back_offsets
+        self.back_targets = back_targets
+
+    def __getitem__(self, index: BlockName) -> BasicBlock:
+        return self.scfg.blocks[index]
+
+    def __contains__(self, index: BlockName) -> bool:
+        return index in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.succ_targets)
+
+    @property
+    def out_edges(self) -> Mapping[BlockName, Tuple[BlockName, ...]]:
+        return _EdgeView(self, self.succ_offsets, self.succ_targets)
+
+    @property
+    def back_edges(self) -> Mapping[BlockName, Tuple[BlockName, ...]]:
+        return _EdgeView(self, self.back_offsets, self.back_targets)
+
+    def successors(self, idx: int) -> array:
+        """Dense ids of the successors of the block with dense id `idx`."""
+        return self.succ_targets[self.succ_offsets[idx]:self.succ_offsets[idx + 1]]
+
+    def predecessors(self, idx: int) -> array:
+        """Dense ids of the predecessors of the block with dense id `idx`."""
+        return self.pred_targets[self.pred_offsets[idx]:self.pred_offsets[idx + 1]]
+
+    def back_successors(self, idx: int) -> array:
+        """Dense ids of the back edge targets of the block with dense id `idx`."""
+        return self.back_targets[self.back_offsets[idx]:self.back_offsets[idx + 1]]
+
+    def successor_lists(self) -> List[List[int]]:
+        """Successor ids of all blocks as a list of lists.
+
+        Algorithms that visit every edge several times are faster on plain
+        lists than on repeated array slices.
+        """
+        offsets, targets = self.succ_offsets, self.succ_targets
+        return [
+            targets[offsets[i]:offsets[i + 1]].tolist() for i in range(len(self.names))
+        ]
+
+    def predecessor_lists(self) -> List[List[int]]:
+        """Predecessor ids of all blocks as a list of lists."""
+        offsets, targets = self.pred_offsets, self.pred_targets
+        return [
+            targets[offsets[i]:offsets[i + 1]].tolist() for i in range(len(self.names))
+        ]
@@ -70,14 +70,14 @@ class FlowInfo:
         Build a graph of basic-blocks
         """
         offsets = sorted(self.block_offsets)
-        scfg = SCFG()
+        builder = SCFG.builder()
 
         names = {}
         if end_offset is None:
             end_offset = _next_inst_offset(self.last_offset)
 
         for begin, end in zip(offsets, [*offsets[1:], end_offset]):
-            names[begin] = scfg.add_block(
+            names[begin] = builder.add_block(
                 block_type="python_bytecode",
                 block_label=PythonBytecodeLabel(),
                 begin=begin,
@@ -94,7 +94,6 @@ class FlowInfo:
                 targets = [names[o] for o in self.jump_insts[term_offset]]
 
             block_name = names[begin]
-            scfg.add_connections(block_name, targets, [])
+            builder.add_connections(block_name, targets, [])
 
-        scfg.check_graph()
-        return scfg
+        return builder.build()
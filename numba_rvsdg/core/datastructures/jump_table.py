@@ -0,0 +1,72 @@
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterable, Iterator, Tuple, Union
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+_MISSING = object()
+
+
+class JumpTable(Mapping):
+    """The immutable jump table of a BranchBlock.
+
+    As a Mapping it maps the values of the control variable to the jump
+    targets, and `value_of` looks up the value for a target. Both directions
+    are indexed once when the table is built, so lookups are constant time
+    in either direction. When several values jump to the same target,
+    `value_of` returns the first one.
+
+    Parameters
+    ----------
+    table: Mapping or Iterable of (value, target) pairs
+        The entries of the table, in order.
+    """
+
+    __slots__ = ("_targets", "_values")
+
+    def __init__(
+        self,
+        table: Union[Mapping, Iterable[Tuple[Hashable, BlockName]]] = (),
+    ):
+        targets: Dict[Hashable, BlockName] = dict(table)
+        values: Dict[BlockName, Hashable] = {}
+        for value, target in targets.items():
+            values.setdefault(target, value)
+        self._targets = targets
+        self._values = values
+
+    def __getitem__(self, value: Hashable) -> BlockName:
+        return self._targets[value]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._targets)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def __hash__(self):
+        return hash(frozenset(self._targets.items()))
+
+    def __repr__(self):
+        return f"JumpTable({self._targets!r})"
+
+    def value_of(self, target: BlockName, default=_MISSING) -> Hashable:
+        """The first value jumping to `target`. If there is none, `default`
+        is returned if it is given, otherwise KeyError is raised."""
+        value = self._values.get(target, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(target)
+            return default
+        return value
+
+    def targets(self) -> Iterable[BlockName]:
+        """The distinct targets, in the order of their first value."""
+        return self._values.keys()
+
+    def replace_target(self, old: BlockName, new: BlockName) -> "JumpTable":
+        """A new table in which the values that jumped to `old` jump to `new`
+        instead."""
+        return JumpTable(
+            (value, new if target == old else target)
+            for value, target in self._targets.items()
+        )
@@ -1,64 +1,69 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class Label:
     info: List[str] = None
     """Any Block specific information we want to add can go here"""
     ...
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class PythonBytecodeLabel(Label):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class ControlLabel(Label):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticBranch(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticTail(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticExit(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticHead(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticReturn(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticLatch(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SyntheticExitingLatch(ControlLabel):
     pass
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class SynthenticAssignment(ControlLabel):
     pass
 
 
+@dataclass(frozen=True, order=True, slots=True)
+class RegionLabel(Label):
+    pass
+
+
 # Maybe we can register new labels over here instead of static lists
 label_types = {
     "label": Label,
@@ -72,6 +77,7 @@ label_types = {
     "synth_latch": SyntheticLatch,
     "synth_exit_latch": SyntheticExitingLatch,
     "synth_assign": SynthenticAssignment,
+    "region": RegionLabel,
 }
 
 
@@ -82,29 +88,128 @@ def get_label_class(label_type_string):
         raise TypeError(f"Block Type {label_type_string} not recognized.")
 
 
-@dataclass(frozen=True, order=True)
-class BlockName:
-    name: str
-    ...
+def _name_index(name: str) -> int:
+    # The numeric suffix of a generated name, -1 if there is none.
+    _, sep, suffix = name.rpartition("_")
+    if sep and suffix.isdecimal():
+        return int(suffix)
+    return -1
+
 
+@dataclass(frozen=True, eq=False, slots=True)
+class BlockName:
+    """Name of a block.
+
+    BlockNames are created once by the NameGenerator of an SCFG and then
+    shared by every reference to the block, so equality is usually decided by
+    the identity check. Names from different generators, or written out by
+    hand, compare equal if their strings are equal.
+
+    Generated names end in their creation index, which is kept in `index`.
+    For other names it is parsed from the numeric suffix, so it only depends
+    on the string. Names are ordered by `(index, name)`, i.e. in creation
+    order, and the hash of a name with an index is the index itself, so
+    neither needs to look at the string.
+    """
 
-@dataclass(frozen=True, order=True)
+    name: str
+    index: int = field(default=-1, repr=False)
+    """Creation index in the NameGenerator, equal to the numeric suffix of
+    the name. Derived from the name if not given."""
+
+    _hash: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        index = self.index
+        if index == -1:
+            index = _name_index(self.name)
+            object.__setattr__(self, "index", index)
+        object.__setattr__(self, "_hash", index if index != -1 else hash(self.name))
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not BlockName:
+            return NotImplemented
+        return self.index == other.index and self.name == other.name
+
+    def __hash__(self):
+        return self._hash
+
+    def __lt__(self, other):
+        if type(other) is not BlockName:
+            return NotImplemented
+        return (self.index, self.name) < (other.index, other.name)
+
+    def __le__(self, other):
+        if type(other) is not BlockName:
+            return NotImplemented
+        return (self.index, self.name) <= (other.index, other.name)
+
+    def __gt__(self, other):
+        if type(other) is not BlockName:
+            return NotImplemented
+        return (self.index, self.name) > (other.index, other.name)
+
+    def __ge__(self, other):
+        if type(other) is not BlockName:
+            return NotImplemented
+        return (self.index, self.name) >= (other.index, other.name)
+
+    def __reduce__(self):
+        # String hashes differ between processes, recompute on unpickling.
+        return (BlockName, (self.name, self.index))
+
+
+@dataclass(frozen=True, order=True, slots=True)
 class RegionName:
     name: str
     ...
 
 
+# Block name prefixes, cached per Label class.
+_label_prefixes: Dict[type, str] = {}
+
+
+def _name_prefix(label) -> str:
+    cls = type(label)
+    prefix = _label_prefixes.get(cls)
+    if prefix is None:
+        if isinstance(label, Label):
+            # Same as the lowercased dataclass repr up to the first "(".
+            prefix = cls.__name__.lower()
+            _label_prefixes[cls] = prefix
+        else:
+            return str(label).lower().split("(")[0]
+    return prefix
+
+
+def _variable_name(index: int) -> str:
+    # Bijective base 26: a, ..., z, aa, ab, ..., zz, aaa, ...
+    letters = []
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters.append(chr(ord("a") + remainder))
+    return "".join(reversed(letters))
+
+
 @dataclass
 class NameGenerator:
     """Name generator for various element names.
 
+    Blocks, regions and control variables are counted separately. Block
+    names are the Label class name followed by the block index, variable names
+    run from 'a' to 'z' and continue with 'aa', 'ab' and so on.
+
     Attributes
     ----------
 
     block_index : int
         The starting index for blocks
     variable_index: int
-        The starting index for control variables
+        The code point of the first control variable name, 'a' by default.
+        Indices past 'z' continue with 'aa', 'ab' and so on.
     region_index : int
         The starting index for regions
     """
@@ -112,17 +217,22 @@ class NameGenerator:
     variable_index: int = 97  # Variables start at lowercase 'a'
     region_index: int = 0
 
-    def new_block_name(self, label: str) -> BlockName:
+    def new_block_name(self, label: Label) -> BlockName:
         ret = self.block_index
         self.block_index += 1
-        return BlockName(str(label).lower().split("(")[0] + "_" + str(ret))
+        return BlockName(f"{_name_prefix(label)}_{ret}", ret)
 
     def new_region_name(self, kind: str) -> RegionName:
         ret = self.region_index
         self.region_index += 1
-        return RegionName(str(kind).lower().split("(")[0] + "_" + str(ret))
+        return RegionName(f"{_name_prefix(kind)}_{ret}")
 
     def new_var_name(self) -> str:
-        variable_name = chr(self.variable_index)
+        index = self.variable_index - ord("a")
+        if index >= 0:
+            variable_name = _variable_name(index)
+        else:
+            # Starting points below 'a' keep naming by code point.
+            variable_name = chr(self.variable_index)
         self.variable_index += 1
-        return str(variable_name)
+        return variable_name
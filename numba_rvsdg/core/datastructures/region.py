@@ -3,7 +3,7 @@ from dataclasses import dataclass, field, InitVar
 from numba_rvsdg.core.datastructures.labels import NameGenerator, RegionName, BlockName
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Region:
     name_gen: InitVar[NameGenerator]
     """Region Name Generator associated with this Region.
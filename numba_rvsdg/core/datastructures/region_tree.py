@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from numba_rvsdg.core.datastructures.block_set import BlockSet
+from numba_rvsdg.core.datastructures.labels import BlockName, RegionName
+
+
+@dataclass(eq=False)
+class RegionNode:
+    """A region of the region tree.
+
+    Attributes
+    ----------
+    region_name: RegionName
+        The name of the region in `SCFG.regions`.
+    blocks: BlockSet
+        All blocks of the region, including those of nested regions.
+    parent: RegionNode, optional
+        The immediately enclosing region.
+    children: List[RegionNode]
+        The regions immediately nested in this one.
+    """
+
+    region_name: RegionName
+    blocks: BlockSet
+    parent: Optional["RegionNode"] = field(default=None, repr=False)
+    children: List["RegionNode"] = field(default_factory=list, repr=False)
+
+    def __contains__(self, name) -> bool:
+        return name in self.blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def ancestors(self) -> Iterator["RegionNode"]:
+        """The enclosing regions, innermost first."""
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    @property
+    def depth(self) -> int:
+        """Nesting depth, 1 for outermost regions."""
+        return 1 + sum(1 for _ in self.ancestors())
+
+
+class RegionTree:
+    """The nesting of the regions of an SCFG, with an index from every block
+    to the innermost region containing it.
+
+    Regions may be added in any order, as long as they nest: a new region is
+    placed below the innermost region containing all of its blocks, and the
+    regions it contains are moved below it. A region with the same blocks as
+    an existing one, like a branch made of a single loop, is placed around
+    it. Block sets are BlockSets, so the containment tests are bitmask
+    operations.
+
+    Attributes
+    ----------
+    roots: List[RegionNode]
+        The outermost regions, in the order they were added.
+    """
+
+    def __init__(self):
+        self.roots: List[RegionNode] = []
+        self._nodes: Dict[RegionName, RegionNode] = {}
+        self._innermost: Dict[BlockName, RegionNode] = {}
+
+    def __getitem__(self, region_name: RegionName) -> RegionNode:
+        return self._nodes[region_name]
+
+    def __contains__(self, region_name) -> bool:
+        return region_name in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __iter__(self) -> Iterator[RegionNode]:
+        """All regions, every region before the regions nested in it."""
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def add(self, region_name: RegionName, blocks: BlockSet) -> RegionNode:
+        """Add the region `region_name` made of `blocks`.
+
+        Blocks that are not in the enclosing region yet are added to it and
+        to all of its ancestors, like blocks inserted while restructuring.
+        """
+        node = RegionNode(region_name, blocks.copy())
+        # Walk up from any known block to the innermost region containing all
+        # of the known blocks. Regions nest, so it is an ancestor of that block.
+        known = blocks.copy()
+        parent = None
+        for name in blocks:
+            innermost = self._innermost.get(name)
+            if innermost is None:
+                known.discard(name)
+            elif parent is None:
+                parent = innermost
+        while parent is not None and not known < parent.blocks:
+            parent = parent.parent
+
+        siblings = self.roots if parent is None else parent.children
+        inside = [child for child in siblings if child.blocks <= node.blocks]
+        siblings[:] = [child for child in siblings if child not in inside]
+        siblings.append(node)
+        for child in inside:
+            child.parent = node
+        node.children = inside
+        node.parent = parent
+        if parent is not None:
+            parent.blocks |= node.blocks
+            for ancestor in parent.ancestors():
+                ancestor.blocks |= node.blocks
+
+        for name in node.blocks:
+            innermost = self._innermost.get(name)
+            if innermost is None or innermost is parent:
+                self._innermost[name] = node
+        self._nodes[region_name] = node
+        return node
+
+    def add_block(self, name: BlockName, region_name: Optional[RegionName]):
+        """Add the new block `name` to the region `region_name` and to the
+        regions enclosing it, a no-op if `region_name` is None."""
+        if region_name is None:
+            return
+        node = self._nodes[region_name]
+        node.blocks.add(name)
+        for ancestor in node.ancestors():
+            ancestor.blocks.add(name)
+        self._innermost[name] = node
+
+    def region_of(self, name: BlockName) -> Optional[RegionName]:
+        """The innermost region containing `name`, None if it is in none."""
+        node = self._innermost.get(name)
+        return None if node is None else node.region_name
+
+    def parent(self, region_name: RegionName) -> Optional[RegionName]:
+        """The immediately enclosing region, None for outermost regions."""
+        parent = self._nodes[region_name].parent
+        return None if parent is None else parent.region_name
+
+    def children(self, region_name: RegionName) -> List[RegionName]:
+        """The regions immediately nested in `region_name`."""
+        return [child.region_name for child in self._nodes[region_name].children]
+
+    def blocks(self, region_name: RegionName) -> BlockSet:
+        """All blocks of `region_name`, including those of nested regions."""
+        return self._nodes[region_name].blocks
@@ -1,21 +1,71 @@
+import os
 import yaml
 import itertools
 
+from collections import Counter
+from enum import IntEnum
+from functools import cached_property
 from textwrap import dedent
-from typing import Set, Tuple, Dict, List, Iterator
+from types import MappingProxyType
+from typing import Set, Tuple, Dict, List, Iterator, Iterable, Mapping, Optional
 from dataclasses import dataclass, field
 
-from numba_rvsdg.core.datastructures.basic_block import BasicBlock, get_block_class, get_block_class_str
+from numba_rvsdg.core.analysis import AnalysisManager
+from numba_rvsdg.core.datastructures.basic_block import (
+    BasicBlock,
+    BranchBlock,
+    RegionBlock,
+    get_block_class,
+    get_block_class_str,
+)
 from numba_rvsdg.core.datastructures.region import Region
+from numba_rvsdg.core.datastructures.region_tree import RegionTree
 from numba_rvsdg.core.datastructures.labels import (
     Label,
     BlockName,
     NameGenerator,
+    RegionLabel,
     RegionName,
     get_label_class,
 )
 
 
+class CheckLevel(IntEnum):
+    """How thoroughly `SCFG.check_graph` validates an SCFG.
+
+    OFF
+        No validation at all, this is the default.
+    INCREMENTAL
+        After a mutation only the blocks touched by it are validated.
+    FULL
+        The whole graph is validated after every mutation, and the tracked
+        head and exiting blocks are cross-checked whenever they are queried.
+    """
+
+    OFF = 0
+    INCREMENTAL = 1
+    FULL = 2
+
+
+class GraphCheckError(AssertionError):
+    """Raised by `SCFG.check_graph` when the graph is malformed."""
+
+
+def _parse_check_level(value: str) -> CheckLevel:
+    try:
+        return CheckLevel[value.upper()]
+    except KeyError:
+        valid = ", ".join(level.name.lower() for level in CheckLevel)
+        raise ValueError(
+            f"Invalid graph check level {value!r}, expected one of: {valid}."
+        ) from None
+
+
+# The check level of all SCFGs that do not set their own. It can be set from
+# the environment, e.g. NUMBA_RVSDG_CHECK_GRAPH=full, to validate a test run.
+CHECK_LEVEL = _parse_check_level(os.environ.get("NUMBA_RVSDG_CHECK_GRAPH", "off"))
+
+
 @dataclass(frozen=True)
 class SCFG:
     """Maps of BlockNames to respective BasicBlocks.
@@ -24,12 +74,71 @@ class SCFG:
 
     blocks: Dict[BlockName, BasicBlock] = field(default_factory=dict)
 
-    out_edges: Dict[BlockName, List[BlockName]] = field(default_factory=dict)
-    back_edges: Dict[BlockName, List[BlockName]] = field(default_factory=dict)
+    # The edges of every block as tuples, only ever replaced by the mutating
+    # methods, see the read-only `out_edges` and `back_edges` views.
+    _out_edges: Dict[BlockName, Tuple[BlockName, ...]] = field(
+        default_factory=dict, init=False
+    )
+    _back_edges: Dict[BlockName, Tuple[BlockName, ...]] = field(
+        default_factory=dict, init=False
+    )
+    # Predecessor index, kept in sync with _out_edges by the mutating methods.
+    _in_edges: Dict[BlockName, Tuple[BlockName, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Blocks without predecessors and blocks without successors, kept up to
+    # date by the mutating methods. Dicts are used as insertion ordered sets.
+    _heads: Dict[BlockName, None] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _exiting: Dict[BlockName, None] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
     regions: Dict[RegionName, Region] = field(default_factory=dict)
+    # Nesting of the regions and the innermost region of every block, for
+    # the regions added together with their blocks.
+    region_tree: RegionTree = field(
+        default_factory=RegionTree, init=False, repr=False, compare=False
+    )
 
     name_gen: NameGenerator = field(default_factory=NameGenerator, compare=False)
 
+    # Validation level of this SCFG, the global CHECK_LEVEL if None.
+    check_level: Optional[CheckLevel] = field(default=None, repr=False, compare=False)
+
+    # Dense integer ids, assigned to blocks in the order they are added.
+    _block_ids: Dict[BlockName, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _block_names: List[BlockName] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    # Cached analyses, invalidated by every mutating method.
+    analyses: AnalysisManager = field(
+        default_factory=AnalysisManager, init=False, repr=False, compare=False
+    )
+
+    @cached_property
+    def out_edges(self) -> Mapping[BlockName, Tuple[BlockName, ...]]:
+        """Read-only view of the out edges of every block, in order. Edges
+        are changed with `add_edge`, `replace_out_edge` and the other
+        mutating methods, which keep `in_edges` and the tracked head and
+        exiting blocks in sync."""
+        return MappingProxyType(self._out_edges)
+
+    @cached_property
+    def back_edges(self) -> Mapping[BlockName, Tuple[BlockName, ...]]:
+        """Read-only view of the out edges of every block that are marked as
+        back edges."""
+        return MappingProxyType(self._back_edges)
+
+    @cached_property
+    def in_edges(self) -> Mapping[BlockName, Tuple[BlockName, ...]]:
+        """Read-only view of the predecessors of every block, one entry per
+        edge."""
+        return MappingProxyType(self._in_edges)
+
     def __getitem__(self, index: BlockName) -> BasicBlock:
         return self.blocks[index]
 
@@ -38,25 +147,119 @@ class SCFG:
 
     def __iter__(self):
         """Graph Iterator"""
-        # initialise housekeeping datastructures
-        to_visit, seen = [self.find_head()], []
-        while to_visit:
-            # get the next block_name on the list
-            block_name = to_visit.pop(0)
-            # if we have visited this, we skip it
-            if block_name in seen:
-                continue
-            else:
-                seen.append(block_name)
-            # get the corresponding block for the block_name
-            block = self[block_name]
-            # yield the block_name, block combo
-            yield (block_name, block)
-            # finally add any out_edges to the list of block_names to visit
-            to_visit.extend(self.out_edges[block_name])
+        for block_name in self.iter_bfs():
+            yield (block_name, self[block_name])
+
+    def _successors(self, back_edges: bool = True, subgraph=None):
+        out_edges = self.out_edges
+        if back_edges:
+            if subgraph is None:
+                return out_edges.__getitem__
+            return lambda name: [t for t in out_edges[name] if t in subgraph]
+
+        def successors(name):
+            back = self.back_edges[name]
+            return [
+                t for t in out_edges[name]
+                if t not in back and (subgraph is None or t in subgraph)
+            ]
+
+        return successors
+
+    def _start_blocks(self, start) -> List[BlockName]:
+        if start is None:
+            return [self.find_head()]
+        if isinstance(start, BlockName):
+            return [start]
+        return list(start)
+
+    def iter_bfs(
+        self, start=None, back_edges: bool = True, subgraph=None
+    ) -> Iterator[BlockName]:
+        """Breadth-first iterator over the block names.
+
+        Parameters
+        ----------
+        start: BlockName or Iterable[BlockName], optional
+            Where to start from, the head of the graph by default.
+        back_edges: bool
+            Whether to follow edges that are marked as back edges.
+        subgraph: Set[BlockName], optional
+            Only visit blocks contained in this set.
+        """
+        from numba_rvsdg.core.traversal import bfs
+
+        return bfs(self._start_blocks(start), self._successors(back_edges, subgraph))
+
+    def iter_dfs(
+        self, start=None, back_edges: bool = True, subgraph=None
+    ) -> Iterator[BlockName]:
+        """Depth-first preorder iterator over the block names, see `iter_bfs`
+        for the parameters."""
+        from numba_rvsdg.core.traversal import dfs_preorder
+
+        return dfs_preorder(
+            self._start_blocks(start), self._successors(back_edges, subgraph)
+        )
+
+    def iter_postorder(
+        self, start=None, back_edges: bool = True, subgraph=None
+    ) -> Iterator[BlockName]:
+        """Depth-first postorder iterator over the block names, see
+        `iter_bfs` for the parameters."""
+        from numba_rvsdg.core.traversal import dfs_postorder
+
+        return dfs_postorder(
+            self._start_blocks(start), self._successors(back_edges, subgraph)
+        )
+
+    def iter_rpo(
+        self, start=None, back_edges: bool = True, subgraph=None
+    ) -> Iterator[BlockName]:
+        """Reverse postorder iterator over the block names, see `iter_bfs`
+        for the parameters."""
+        from numba_rvsdg.core.traversal import reverse_postorder
+
+        return iter(reverse_postorder(
+            self._start_blocks(start), self._successors(back_edges, subgraph)
+        ))
+
+    def block_id(self, block_name: BlockName) -> int:
+        """Dense integer id of the given block."""
+        return self._block_ids[block_name]
+
+    def to_dense(self) -> "DenseGraph":
+        """Integer indexed, array backed snapshot of this SCFG.
+
+        The snapshot is cached until the SCFG is mutated.
+        """
+        from numba_rvsdg.core.datastructures.dense_graph import DenseGraph
+
+        return self.analyses.get("dense", DenseGraph, self)
+
+    def subgraph(self, blocks: Set[BlockName] = None) -> "SubgraphView":
+        """A lazily filtered view of the given blocks, all blocks by default.
+
+        The view is not copied, it follows later changes to the graph.
+        """
+        from numba_rvsdg.core.datastructures.subgraph import SubgraphView
+
+        return SubgraphView(self, blocks)
+
+    def block_set(self, names: Iterable[BlockName] = ()) -> "BlockSet":
+        """A bitmask backed set of blocks of this SCFG."""
+        from numba_rvsdg.core.datastructures.block_set import BlockSet
+
+        return BlockSet(self, names)
 
     def exclude_blocks(self, exclude_blocks: Set[BlockName]) -> Iterator[BlockName]:
         """Iterator over all nodes not in exclude_blocks."""
+        from numba_rvsdg.core.datastructures.block_set import BlockSet
+
+        if isinstance(exclude_blocks, BlockSet) and exclude_blocks.scfg is self:
+            # The complement is a single mask operation.
+            yield from BlockSet.all_blocks(self) - exclude_blocks
+            return
         for block in self.blocks:
             if block not in exclude_blocks:
                 yield block
@@ -67,58 +270,84 @@ class SCFG:
         Assuming the CFG is closed, this will find the block
         that no other blocks are pointing to.
 
+        The blocks without predecessors are tracked as edges are added and
+        removed, so this is a constant time lookup.
+
         """
+        heads = self._heads
+        if self._check_level() is CheckLevel.FULL:
+            assert set(heads) == self._scan_heads()
+        assert len(heads) == 1
+        return next(iter(heads))
+
+    def find_exiting_blocks(self) -> List[BlockName]:
+        """Find all blocks without any out edges, i.e. the returns.
+
+        Like the head, these are tracked incrementally.
+
+        """
+        if self._check_level() is CheckLevel.FULL:
+            assert set(self._exiting) == self._scan_exiting()
+        return list(self._exiting)
+
+    def _scan_heads(self) -> Set[BlockName]:
         heads = set(self.blocks.keys())
         for name in self.blocks.keys():
             for jt in self.out_edges[name]:
                 heads.discard(jt)
-        assert len(heads) == 1
-        return next(iter(heads))
+        return heads
+
+    def _scan_exiting(self) -> Set[BlockName]:
+        return set(name for name in self.blocks if self.is_exiting(name))
 
     def compute_scc(self) -> List[Set[BlockName]]:
         """
         Strongly-connected component for detecting loops.
+
+        The components are listed in reverse topological order.
         """
-        from numba_rvsdg.networkx_vendored.scc import scc
+        return [set(c) for c in reversed(self.condensation().components)]
 
-        out_edges = self.out_edges
+    def condensation(self) -> "Condensation":
+        """The strongly connected components of the graph and the DAG
+        between them, cached until the SCFG is mutated."""
+        from numba_rvsdg.core.scc import Condensation
 
-        class GraphWrap:
-            def __init__(self, graph):
-                self.graph = graph
+        return self.analyses.get("condensation", lambda: Condensation(self.to_dense()))
 
-            def __getitem__(self, vertex):
-                out = out_edges[vertex]
-                # Exclude node outside of the subgraph
-                return [k for k in out if k in self.graph]
+    def loop_forest(self) -> "LoopForest":
+        """The loop nesting forest, cached until the SCFG is mutated."""
+        from numba_rvsdg.core.loops import LoopForest
 
-            def __iter__(self):
-                return iter(self.graph.keys())
+        return self.analyses.get("loop_forest", lambda: LoopForest(self.to_dense()))
 
-        return list(scc(GraphWrap(self.blocks)))
+    def shape(self) -> "GraphShape":
+        """Which trivial shapes the SCFG has, found with a single DFS and
+        cached until the SCFG is mutated."""
+        from numba_rvsdg.core.shape import summarize_shape
 
-    def compute_scc_subgraph(self, subgraph) -> List[Set[BlockName]]:
-        """
-        Strongly-connected component for detecting loops inside a subgraph.
-        """
-        from numba_rvsdg.networkx_vendored.scc import scc
+        return self.analyses.get("shape", summarize_shape, self)
 
-        out_edges = self.out_edges
+    def program_structure_tree(self) -> "ProgramStructureTree":
+        """The canonical SESE regions and their nesting, cached until the SCFG
+        is mutated."""
+        from numba_rvsdg.core.sese import program_structure_tree
 
-        class GraphWrap:
-            def __init__(self, graph: Dict[BlockName, BasicBlock], subgraph):
-                self.graph = graph
-                self.subgraph = subgraph
+        return self.analyses.get("pst", lambda: program_structure_tree(self))
 
-            def __getitem__(self, vertex):
-                out = out_edges[vertex]
-                # Exclude node outside of the subgraph
-                return [k for k in out if k in subgraph]
+    def compute_scc_subgraph(self, subgraph) -> List[Set[BlockName]]:
+        """
+        Strongly-connected component for detecting loops inside a subgraph.
 
-            def __iter__(self):
-                return iter(self.graph.keys())
+        The subgraph is a SubgraphView or any set of blocks, only its blocks
+        and the edges between them are considered.
+        """
+        from numba_rvsdg.core.datastructures.subgraph import SubgraphView
+        from numba_rvsdg.core.scc import Condensation
 
-        return list(scc(GraphWrap(self.blocks, subgraph)))
+        if not isinstance(subgraph, SubgraphView):
+            subgraph = self.subgraph(subgraph)
+        return [set(c) for c in reversed(Condensation(subgraph).components)]
 
     def find_headers_and_entries(
         self, subgraph: Set[BlockName]
@@ -131,18 +360,19 @@ class SCFG:
         subgraph. Entries point to headers and headers are pointed to by
         entries.
 
+        Only the incoming edges of the subgraph are visited. The subgraph may
+        be any set of blocks, including a BlockSet.
+
         """
-        outside: BlockName
+        inside: BlockName
         entries: Set[BlockName] = set()
         headers: Set[BlockName] = set()
 
-        for outside in self.exclude_blocks(subgraph):
-            nodes_jump_in_loop = subgraph.intersection(
-                self.out_edges[outside]
-            )
-            headers.update(nodes_jump_in_loop)
-            if nodes_jump_in_loop:
-                entries.add(outside)
+        for inside in subgraph:
+            for pred in self.in_edges[inside]:
+                if pred not in subgraph:
+                    headers.add(inside)
+                    entries.add(pred)
         # If the loop has no headers or entries, the only header is the head of
         # the CFG.
         if not headers:
@@ -159,6 +389,8 @@ class SCFG:
         subgraph that have incoming edges from within the subgraph. Exiting
         blocks point to exits and exits and pointed to by exiting blocks.
 
+        The subgraph may be any set of blocks, including a BlockSet.
+
         """
         inside: BlockName
         exiting: Set[BlockName] = set()
@@ -193,14 +425,140 @@ class SCFG:
                 if block in self.blocks:
                     to_vist.extend(self.out_edges[block])
 
+    def is_reachable(self, begin: BlockName, end: BlockName) -> bool:
+        """Is end reachable from begin.
+
+        Same as `is_reachable_dfs`, but answered from a reachability index
+        that is built once and cached until the SCFG is mutated. Names that
+        are not blocks of the graph, such as targets of edges leaving it,
+        are not part of the index: they reach nothing, and are reached if
+        `is_reachable_dfs` finds them.
+        """
+        from numba_rvsdg.core.reachability import ReachabilityIndex
+
+        if begin not in self.blocks:
+            return False
+        if end not in self.blocks:
+            return self.is_reachable_dfs(begin, end)
+
+        index = self.analyses.get(
+            "reachability", lambda: ReachabilityIndex(self.condensation())
+        )
+        return index.reachable(begin, end)
+
     def is_exiting(self, block_name: BlockName):
         return len(self.out_edges[block_name]) == 0
 
     def is_fallthrough(self, block_name: BlockName):
         return len(self.out_edges[block_name]) == 1
 
-    def check_graph(self):
-        pass
+    def _check_level(self) -> CheckLevel:
+        level = self.check_level
+        return CHECK_LEVEL if level is None else level
+
+    def check_graph(self, touched: Optional[Iterable[BlockName]] = None):
+        """Validate the graph according to its check level.
+
+        The mutating methods call this with the blocks they `touched`. At the
+        INCREMENTAL level only those blocks are checked, at the FULL level, or
+        when nothing is passed for `touched`, the whole graph is checked in a
+        single pass over all blocks and edges. Nothing is checked at the OFF
+        level, regardless of the arguments.
+
+        Raises GraphCheckError on dangling or duplicate edges, back edges that
+        are not out edges, a predecessor index or tracked head and exiting
+        blocks that are out of sync with the out edges, and regions that do
+        not refer to blocks of the graph.
+
+        Graphs under construction may have several heads, so this does not
+        require a single head, see `check_closed`.
+        """
+        level = self._check_level()
+        if level is CheckLevel.OFF:
+            return
+        if touched is not None and level is CheckLevel.INCREMENTAL:
+            for name in touched:
+                self._check_block(name)
+                self._check_in_edges(name)
+            return
+        self._check_all()
+
+    def check_closed(self):
+        """Validate a finished graph, independent of the check level.
+
+        In addition to everything `check_graph` checks on the whole graph,
+        the graph must have a single head and the exiting block of every
+        region must be reachable from its header.
+        """
+        self._check_all()
+        if self.blocks and len(self._heads) != 1:
+            raise GraphCheckError(f"Expected a single head, found {list(self._heads)}.")
+        for region_name, region in self.regions.items():
+            if region.header != region.exiting and not self.is_reachable(
+                region.header, region.exiting
+            ):
+                raise GraphCheckError(
+                    f"Exiting block of region {region_name} is not reachable from its header."
+                )
+
+    def _check_all(self):
+        blocks = self.blocks
+        for edges in (self.out_edges, self.back_edges, self.in_edges):
+            if edges.keys() != blocks.keys():
+                raise GraphCheckError("Edges are not recorded for exactly the blocks of the graph.")
+        expected: Dict[BlockName, Counter] = {name: Counter() for name in blocks}
+        for name in blocks:
+            self._check_block(name)
+            for target in self.out_edges[name]:
+                expected[target][name] += 1
+        for name, preds in expected.items():
+            if Counter(self.in_edges[name]) != preds:
+                raise GraphCheckError(f"Predecessors of {name} are out of sync.")
+        for region_name, region in self.regions.items():
+            self._check_region(region_name, region)
+
+    def _check_block(self, name: BlockName):
+        # Checks that only look at the out edges of the block.
+        if name not in self.blocks:
+            raise GraphCheckError(f"Unknown block {name}.")
+        out_edges = self.out_edges[name]
+        for target in out_edges:
+            if target not in self.blocks:
+                raise GraphCheckError(f"Dangling edge from {name} to {target}.")
+        if len(set(out_edges)) != len(out_edges):
+            raise GraphCheckError(f"Duplicate out edges of {name}: {out_edges}.")
+        for target in self.back_edges[name]:
+            if target not in out_edges:
+                raise GraphCheckError(f"Back edge from {name} to {target} is not an out edge.")
+        block = self.blocks[name]
+        # Exiting branch blocks are exempt, their edges are yet to be added
+        # or lie outside of the graph, like those of the exiting block of a
+        # nested region.
+        if isinstance(block, BranchBlock) and out_edges:
+            if not set(block.branch_value_table.values()) <= set(out_edges):
+                raise GraphCheckError(
+                    f"Jump table of {name} targets blocks that are not out edges."
+                )
+        if (name in self._heads) == bool(self.in_edges[name]):
+            raise GraphCheckError(f"Head tracking of {name} is out of sync.")
+        if (name in self._exiting) == bool(out_edges):
+            raise GraphCheckError(f"Exiting tracking of {name} is out of sync.")
+
+    def _check_in_edges(self, name: BlockName):
+        # The predecessor index around a single block.
+        for target in self.out_edges[name]:
+            if name not in self.in_edges[target]:
+                raise GraphCheckError(f"Edge from {name} to {target} is not indexed.")
+        for pred in self.in_edges[name]:
+            if pred not in self.blocks or name not in self.out_edges[pred]:
+                raise GraphCheckError(f"Stale predecessor {pred} of {name}.")
+
+    def _check_region(self, region_name: RegionName, region: Region):
+        if region.region_name != region_name:
+            raise GraphCheckError(f"Region {region.region_name} stored as {region_name}.")
+        for name in (region.header, region.exiting):
+            if name not in self.blocks:
+                raise GraphCheckError(f"Region {region_name} refers to unknown block {name}.")
 
     # We don't need this cause everything is 'hopefully' additive
     # def remove_blocks(self, names: Set[BlockName]):
@@ -217,51 +575,253 @@ class SCFG:
         successors: List[BlockName]
     ):
         # Replace any arcs from any of predecessors to any of successors with
-        # an arc through the inserted block instead.
-        for pred_name in predecessors:
-            # For every predecessor
-            # Add the inserted block as out edge
-            for idx, _out in enumerate(self.out_edges[pred_name]):
-                if _out in successors:
-                    self.out_edges[pred_name][idx] = block_name
-
-            if block_name not in self.out_edges[pred_name]:
-                self.out_edges[pred_name].append(block_name)
-
-            self.out_edges[pred_name] = list(dict.fromkeys(self.out_edges[pred_name]))
-
+        # an arc through the inserted block instead. The out edges of the
+        # block come first, so that maintained analyses never see the
+        # successors cut off.
         for success_name in successors:
             # For every sucessor
             # For inserted block, the sucessor in an out-edge
-            self.out_edges[block_name].append(success_name)
+            self.add_edge(block_name, success_name)
 
-        self.check_graph()
+        for pred_name in predecessors:
+            # For every predecessor
+            # Add the inserted block as out edge
+            pred_outs = []
+            for _out in self.out_edges[pred_name]:
+                if _out in successors:
+                    self._retarget(pred_name, _out, block_name)
+                    _out = block_name
+                pred_outs.append(_out)
+            pred_outs.append(block_name)
+            self._set_out_edges(pred_name, list(dict.fromkeys(pred_outs)))
+
+        self.analyses.invalidate()
+        self.check_graph([block_name, *predecessors, *successors])
+
+    def _new_block(self, block_type: str, block_label: Label, block_args) -> BlockName:
+        # Create the block and add it to the blocks, without any bookkeeping.
+        block_class = get_block_class(block_type)
+        new_block: BasicBlock = block_class(**block_args, label=block_label, name_gen=self.name_gen)
+        name = new_block.block_name
+        self.blocks[name] = new_block
+        return name
 
     def add_block(
         self, block_type: str = "basic", block_label: Label = Label(), **block_args
     ) -> BlockName:
-        block_type = get_block_class(block_type)
-        new_block: BasicBlock = block_type(**block_args, label=block_label, name_gen=self.name_gen)
-
-        name = new_block.block_name
-        self.blocks[name] = new_block
-
-        self.back_edges[name] = []
-        self.out_edges[name] = []
-
+        name = self._new_block(block_type, block_label, block_args)
+        self._block_ids[name] = len(self._block_names)
+        self._block_names.append(name)
+
+        self._back_edges[name] = ()
+        self._out_edges[name] = ()
+        self._in_edges[name] = ()
+        self._heads[name] = None
+        self._exiting[name] = None
+
+        self.analyses.invalidate()
+        self.check_graph([name])
         return name
 
     def add_connections(self, block_name, out_edges=[], back_edges=[]):
-        assert self.out_edges[block_name] == []
-        assert self.back_edges[block_name] == []
-        self.out_edges[block_name] = out_edges
-        self.back_edges[block_name] = back_edges
-
-        self.check_graph()
-
-    def add_region(self, region_head, region_exit, kind):
+        assert not self._out_edges[block_name]
+        assert not self._back_edges[block_name]
+        self._out_edges[block_name] = tuple(out_edges)
+        self._back_edges[block_name] = tuple(back_edges)
+        for target in out_edges:
+            self._link(block_name, target)
+        self._update_exiting(block_name)
+
+        self.analyses.invalidate()
+        if self.analyses.maintained:
+            for target in out_edges:
+                self.analyses.edge_inserted(block_name, target)
+        self.check_graph([block_name, *out_edges])
+
+    def add_edge(self, block_name: BlockName, target: BlockName, back_edge=False):
+        """Append `target` to the out edges of `block_name`, and to the back
+        edges as well if `back_edge` is set."""
+        self._out_edges[block_name] += (target,)
+        self._link(block_name, target)
+        self._exiting.pop(block_name, None)
+        if back_edge:
+            self._back_edges[block_name] += (target,)
+        self.analyses.invalidate()
+        if self.analyses.maintained:
+            self.analyses.edge_inserted(block_name, target)
+        self.check_graph([block_name, target])
+
+    def add_back_edge(self, block_name: BlockName, target: BlockName):
+        """Mark the existing edge from `block_name` to `target` as back edge."""
+        assert target in self._out_edges[block_name]
+        self._back_edges[block_name] += (target,)
+        self.analyses.invalidate()
+        self.check_graph([block_name])
+
+    def replace_out_edge(
+        self, block_name: BlockName, old_target: BlockName, new_target: BlockName
+    ):
+        """Redirect the edge from `block_name` to `old_target` to point to
+        `new_target` instead, keeping its position in the out edges. The
+        jump table of a branch block is redirected along with it."""
+        self._retarget(block_name, old_target, new_target)
+        out_edges = self._out_edges[block_name]
+        pos = out_edges.index(old_target)
+        self._out_edges[block_name] = (
+            out_edges[:pos] + (new_target,) + out_edges[pos + 1:]
+        )
+        self._unlink(block_name, old_target)
+        self._link(block_name, new_target)
+        self.analyses.invalidate()
+        if self.analyses.maintained:
+            self.analyses.edge_inserted(block_name, new_target)
+            self.analyses.edge_deleted(block_name, old_target)
+        self.check_graph([block_name, old_target, new_target])
+
+    def _retarget(self, block_name: BlockName, old_target: BlockName, new_target: BlockName):
+        # Swap in a copy of a branch block whose table follows its redirected
+        # out edge.
+        block = self.blocks[block_name]
+        if (
+            isinstance(block, BranchBlock)
+            and old_target in block.branch_value_table.targets()
+        ):
+            self.blocks[block_name] = block.replace_target(old_target, new_target)
+
+    def _set_out_edges(self, block_name: BlockName, out_edges: Iterable[BlockName]):
+        old_edges = self._out_edges[block_name]
+        out_edges = tuple(out_edges)
+        for target in old_edges:
+            self._unlink(block_name, target)
+        for target in out_edges:
+            self._link(block_name, target)
+        self._out_edges[block_name] = out_edges
+        self._update_exiting(block_name)
+        self.analyses.invalidate()
+        if self.analyses.maintained:
+            # Insertions first, see insert_block_between.
+            for target in out_edges:
+                if target not in old_edges:
+                    self.analyses.edge_inserted(block_name, target)
+            for target in old_edges:
+                if target not in out_edges:
+                    self.analyses.edge_deleted(block_name, target)
+
+    def _link(self, block_name: BlockName, target: BlockName):
+        # Record block_name as predecessor of target.
+        preds = self._in_edges[target]
+        if not preds:
+            self._heads.pop(target, None)
+        self._in_edges[target] = preds + (block_name,)
+
+    def _unlink(self, block_name: BlockName, target: BlockName):
+        # Remove one occurrence of block_name from the predecessors of target.
+        preds = self._in_edges[target]
+        pos = preds.index(block_name)
+        preds = self._in_edges[target] = preds[:pos] + preds[pos + 1:]
+        if not preds:
+            self._heads[target] = None
+
+    def _update_exiting(self, block_name: BlockName):
+        if self._out_edges[block_name]:
+            self._exiting.pop(block_name, None)
+        else:
+            self._exiting[block_name] = None
+
+    def add_region(
+        self, region_head, region_exit, kind, blocks: Optional[Iterable[BlockName]] = None
+    ) -> RegionName:
+        """Add a region and return its name. If the `blocks` of the region
+        are given, it is also placed in the region tree."""
         new_region = Region(self.name_gen, kind, region_head, region_exit)
         self.regions[new_region.region_name] = new_region
+        if blocks is not None:
+            self.region_tree.add(new_region.region_name, self.block_set(blocks))
+        self.analyses.invalidate()
+        self.check_graph([region_head, region_exit])
+        return new_region.region_name
+
+    def nested(self) -> "SCFG":
+        """A copy of this SCFG with every region of the region tree extracted
+        into an SCFG of its own.
+
+        Each region is replaced by a RegionBlock in the SCFG of the region
+        around it, or in the returned SCFG for the outermost regions. The SCFG
+        of a region holds the blocks directly in it and the RegionBlocks of
+        the regions nested in it, without the edges leaving the region and
+        the back edges to its header. It therefore has a single head and a
+        single exiting block, and `find_head`, `compute_scc` and the cached
+        analyses work on the blocks of one level only.
+
+        The blocks and the name generator are shared with this SCFG. Regions
+        that were added without their blocks are not in the region tree and
+        are not extracted.
+        """
+        tree = self.region_tree
+        direct: Dict[Optional[RegionName], List[BlockName]] = {}
+        for name in self.blocks:
+            direct.setdefault(tree.region_of(name), []).append(name)
+
+        region_blocks: Dict[RegionName, RegionBlock] = {}
+        for node in reversed(list(tree)):
+            region = self.regions[node.region_name]
+            subregion = self._nested_level(
+                node.blocks,
+                region.header,
+                direct.get(node.region_name, []),
+                node.children,
+                region_blocks,
+            )
+            region_blocks[node.region_name] = RegionBlock(
+                name_gen=self.name_gen,
+                label=RegionLabel(),
+                kind=region.kind,
+                header=region.header,
+                exiting=region.exiting,
+                subregion=subregion,
+                jump_targets=tuple(self.out_edges[region.exiting]),
+            )
+        return self._nested_level(
+            self.blocks, None, direct.get(None, []), tree.roots, region_blocks
+        )
+
+    def _nested_level(self, blocks, header, direct, children, region_blocks) -> "SCFG":
+        # One level of `nested`: the blocks directly in a region and the
+        # RegionBlocks of the regions nested in it, with the edges between
+        # them.
+        builder = SCFGBuilder(self.check_level, self.name_gen)
+        collapsed: Dict[BlockName, BlockName] = {}
+        for child in children:
+            name = builder.add_existing_block(region_blocks[child.region_name])
+            for inner in child.blocks:
+                collapsed[inner] = name
+        for name in direct:
+            builder.add_existing_block(self.blocks[name])
+
+        def level_edges(targets, skip=()):
+            return list(dict.fromkeys(
+                collapsed.get(target, target) for target in targets
+                if target in blocks and target != header and target not in skip
+            ))
+
+        for child in children:
+            exiting = self.regions[child.region_name].exiting
+            builder.add_connections(
+                region_blocks[child.region_name].block_name,
+                level_edges(self.out_edges[exiting], child.blocks),
+            )
+        for name in direct:
+            builder.add_connections(
+                name,
+                level_edges(self.out_edges[name]),
+                level_edges(self.back_edges[name]),
+            )
+        return builder.build()
+
+    @staticmethod
+    def builder(check_level: Optional[CheckLevel] = None) -> "SCFGBuilder":
+        """Start building a new SCFG in bulk, see SCFGBuilder."""
+        return SCFGBuilder(check_level)
 
     @staticmethod
     def from_yaml(yaml_string):
@@ -270,7 +830,7 @@ class SCFG:
 
     @staticmethod
     def from_dict(graph_dict: Dict[str, Dict]):
-        scfg = SCFG()
+        builder = SCFG.builder()
         ref_dict = {}
 
         for block_ref, block_attrs in graph_dict.items():
@@ -279,7 +839,7 @@ class SCFG:
             label_class = get_label_class(block_attrs.get("label_type", "label"))
             label_info = block_attrs.get("label_info", None)
             block_label = label_class(label_info)
-            block_name = scfg.add_block(block_class, block_label, **block_args)
+            block_name = builder.add_block(block_class, block_label, **block_args)
             ref_dict[block_ref] = block_name
 
         for block_ref, block_attrs in graph_dict.items():
@@ -289,10 +849,9 @@ class SCFG:
             block_name = ref_dict[block_ref]
             out_edges = list(ref_dict[out_ref] for out_ref in out_refs)
             back_edges = list(ref_dict[back_ref] for back_ref in back_refs)
-            scfg.add_connections(block_name, out_edges, back_edges)
+            builder.add_connections(block_name, out_edges, back_edges)
 
-        scfg.check_graph()
-        return scfg, ref_dict
+        return builder.build(), ref_dict
 
     def to_yaml(self):
         # Convert to yaml
@@ -327,3 +886,88 @@ class SCFG:
             graph_dict[str(key)] = curr_dict
 
         return graph_dict
+
+
+class SCFGBuilder:
+    """Bulk constructor for SCFGs.
+
+    Blocks and edges are collected first, and the derived bookkeeping of the
+    SCFG (dense ids, predecessor index, head and exiting blocks) is computed
+    in a single pass by `build`, which also validates the graph once at the
+    end. Building through SCFG.add_block and SCFG.add_connections instead
+    updates the bookkeeping and validates the graph for every single call.
+
+    Example
+    -------
+
+        builder = SCFG.builder()
+        entry = builder.add_block()
+        exit = builder.add_block()
+        builder.add_connections(entry, [exit])
+        scfg = builder.build()
+
+    """
+
+    def __init__(
+        self,
+        check_level: Optional[CheckLevel] = None,
+        name_gen: Optional[NameGenerator] = None,
+    ):
+        if name_gen is None:
+            name_gen = NameGenerator()
+        self._scfg = SCFG(name_gen=name_gen, check_level=check_level)
+        self._out_edges: Dict[BlockName, Tuple[BlockName, ...]] = {}
+        self._back_edges: Dict[BlockName, Tuple[BlockName, ...]] = {}
+
+    def add_block(
+        self, block_type: str = "basic", block_label: Label = Label(), **block_args
+    ) -> BlockName:
+        return self._scfg._new_block(block_type, block_label, block_args)
+
+    def add_existing_block(self, block: BasicBlock) -> BlockName:
+        """Add a block that was created for another SCFG, keeping its name.
+        The name generators of both SCFGs should be the same."""
+        name = block.block_name
+        assert name not in self._scfg.blocks
+        self._scfg.blocks[name] = block
+        return name
+
+    def add_connections(self, block_name, out_edges=(), back_edges=()):
+        assert block_name in self._scfg.blocks
+        assert block_name not in self._out_edges
+        self._out_edges[block_name] = tuple(out_edges)
+        self._back_edges[block_name] = tuple(back_edges)
+
+    def build(self) -> SCFG:
+        """Finish the SCFG. The builder must not be used afterwards."""
+        scfg = self._scfg
+        blocks = scfg.blocks
+        in_edges: Dict[BlockName, List[BlockName]] = {name: [] for name in blocks}
+        for name, out_edges in self._out_edges.items():
+            for target in out_edges:
+                preds = in_edges.get(target)
+                if preds is None:
+                    raise ValueError(f"Edge from {name} to unknown block {target}.")
+                preds.append(name)
+            if len(set(out_edges)) != len(out_edges):
+                raise ValueError(f"Duplicate out edges of {name}: {out_edges}.")
+            for target in self._back_edges[name]:
+                if target not in out_edges:
+                    raise ValueError(f"Back edge from {name} to {target} is not an out edge.")
+
+        scfg._block_names.extend(blocks)
+        scfg._block_ids.update(zip(blocks, range(len(blocks))))
+        for name in blocks:
+            out_edges = self._out_edges.get(name, ())
+            scfg._out_edges[name] = out_edges
+            scfg._back_edges[name] = self._back_edges.get(name, ())
+            scfg._in_edges[name] = tuple(in_edges[name])
+            if not in_edges[name]:
+                scfg._heads[name] = None
+            if not out_edges:
+                scfg._exiting[name] = None
+
+        scfg.analyses.invalidate()
+        scfg.check_graph()
+        self._scfg = None
+        return scfg
@@ -0,0 +1,117 @@
+from collections.abc import Set
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+
+class _Neighbours:
+    """Re-iterable, lazily filtered neighbours of one block of a
+    SubgraphView."""
+
+    __slots__ = ("_edges", "_blocks")
+
+    def __init__(self, edges: List[BlockName], blocks):
+        self._edges = edges
+        self._blocks = blocks
+
+    def __iter__(self) -> Iterator[BlockName]:
+        blocks = self._blocks
+        return (name for name in self._edges if name in blocks)
+
+    def __contains__(self, name) -> bool:
+        return name in self._blocks and name in self._edges
+
+    def __len__(self) -> int:
+        blocks = self._blocks
+        return sum(1 for name in self._edges if name in blocks)
+
+    def __repr__(self):
+        return f"_Neighbours({list(self)!r})"
+
+
+class SubgraphView(Set):
+    """View of the blocks of an SCFG restricted to a subset of them.
+
+    Edges are filtered on the fly when they are visited, so creating a view
+    and walking it does not allocate any adjacency lists. The view is a
+    ``Set[BlockName]`` of the contained blocks, and indexing it with a block
+    yields the successors inside the subgraph, so it can be handed to any
+    algorithm written against an adjacency mapping, such as the SCC. The
+    view is live: it reflects later mutations of the SCFG and of `blocks`.
+
+    Parameters
+    ----------
+    scfg: SCFG
+        The SCFG to look at.
+    blocks: Set[BlockName], optional
+        The blocks of the subgraph, any set including a BlockSet. All blocks
+        of the SCFG if not given.
+    """
+
+    __slots__ = ("scfg", "blocks")
+
+    def __init__(self, scfg: "SCFG", blocks: Optional[Set] = None):
+        self.scfg = scfg
+        self.blocks = scfg.blocks if blocks is None else blocks
+
+    def __contains__(self, name) -> bool:
+        return name in self.blocks
+
+    def __iter__(self) -> Iterator[BlockName]:
+        return iter(self.blocks)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __getitem__(self, name: BlockName) -> _Neighbours:
+        return _Neighbours(self.scfg.out_edges[name], self.blocks)
+
+    def __repr__(self):
+        return f"SubgraphView({list(self.blocks)!r})"
+
+    def successors(self, name: BlockName) -> _Neighbours:
+        """Successors of `name` inside the subgraph."""
+        return _Neighbours(self.scfg.out_edges[name], self.blocks)
+
+    def predecessors(self, name: BlockName) -> _Neighbours:
+        """Predecessors of `name` inside the subgraph."""
+        return _Neighbours(self.scfg.in_edges[name], self.blocks)
+
+    def back_successors(self, name: BlockName) -> _Neighbours:
+        """Back edge targets of `name` inside the subgraph."""
+        return _Neighbours(self.scfg.back_edges[name], self.blocks)
+
+    def subgraph(self, blocks: Iterable[BlockName]) -> "SubgraphView":
+        """A view of the blocks of this view that are also in `blocks`."""
+        return SubgraphView(self.scfg, set(name for name in blocks if name in self.blocks))
+
+    def to_dense(self) -> "DenseGraph":
+        """Integer indexed snapshot of the subgraph, with the blocks numbered
+        in iteration order."""
+        from numba_rvsdg.core.datastructures.dense_graph import DenseGraph
+
+        return DenseGraph(self.scfg, self)
+
+    def find_headers_and_entries(self) -> Tuple[Set, Set]:
+        """See `SCFG.find_headers_and_entries`."""
+        return self.scfg.find_headers_and_entries(self.blocks)
+
+    def find_exiting_and_exits(self) -> Tuple[Set, Set]:
+        """See `SCFG.find_exiting_and_exits`."""
+        return self.scfg.find_exiting_and_exits(self.blocks)
+
+    def compute_scc(self) -> List[Set]:
+        """Strongly connected components of the subgraph."""
+        return self.scfg.compute_scc_subgraph(self)
+
+    def is_reachable(self, begin: BlockName, end: BlockName) -> bool:
+        """Is `end` reachable from `begin` without leaving the subgraph.
+
+        This indexes the whole subgraph, for many queries build a
+        ReachabilityIndex of the view once instead.
+        """
+        from numba_rvsdg.core.reachability import ReachabilityIndex
+
+        if begin not in self.blocks or end not in self.blocks:
+            return False
+        return ReachabilityIndex(self).reachable(begin, end)
@@ -0,0 +1,583 @@
+import heapq
+import itertools
+from collections.abc import Mapping, Set
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+from numba_rvsdg.core.traversal import dfs_postorder
+
+
+class DominatorSet(Set):
+    """The set of dominators of a single block.
+
+    This is a view on a DominatorTree: membership is answered by the tree in
+    constant time and iteration walks the immediate dominator chain, so the
+    set is never materialized.
+    """
+
+    __slots__ = ("_tree", "_idx")
+
+    def __init__(self, tree: "DominatorTree", idx: int):
+        self._tree = tree
+        self._idx = idx
+
+    def __contains__(self, name: BlockName) -> bool:
+        idx = self._tree.ids.get(name)
+        if idx is None:
+            return False
+        return self._tree._dominates(idx, self._idx)
+
+    def __iter__(self) -> Iterator[BlockName]:
+        tree = self._tree
+        names, idom, virtual = tree.names, tree._idom, tree._virtual
+        idx = self._idx
+        while True:
+            yield names[idx]
+            parent = idom[idx]
+            if parent == virtual or parent == -1:
+                return
+            idx = parent
+
+    def __len__(self) -> int:
+        return self._tree._depth[self._idx]
+
+    def __repr__(self):
+        return f"DominatorSet({set(self)!r})"
+
+
+class DominatorTree(Mapping):
+    """Dominator tree of a graph over dense integer ids.
+
+    The immediate dominators are computed with the iterative algorithm from
+    Cooper, Harvey and Kennedy, "A Simple, Fast Dominance Algorithm": nodes are
+    numbered in postorder and visited in reverse postorder, and the immediate
+    dominator of a node is the intersection of the dominator tree paths of its
+    already processed predecessors. Graphs with several entries are handled by
+    a virtual root that points to all of them.
+
+    The tree is then numbered with DFS pre- and postorder intervals, so that
+    `dominates` is answered in constant time.
+
+    As a Mapping the tree maps every BlockName to the DominatorSet of that
+    block, which makes it a drop-in replacement for the dictionary of
+    dominator sets computed previously. Blocks that can not be reached from
+    any entry are only dominated by themselves.
+
+    Parameters
+    ----------
+    names: List[BlockName]
+        Mapping of dense ids to BlockNames.
+    ids: Dict[BlockName, int]
+        Mapping of BlockNames to dense ids.
+    succs: Sequence[Sequence[int]]
+        Successor ids for every id (use the predecessors for post-dominators).
+    preds: Sequence[Sequence[int]]
+        Predecessor ids for every id (use the successors for post-dominators).
+    roots: Sequence[int]
+        The entries of the graph (the exits for post-dominators).
+    """
+
+    def __init__(
+        self,
+        names: List[BlockName],
+        ids: Dict[BlockName, int],
+        succs: Sequence[Sequence[int]],
+        preds: Sequence[Sequence[int]],
+        roots: Sequence[int],
+    ):
+        if not roots:
+            raise RuntimeError("no entry points: dominator algorithm cannot be seeded")
+        self.names = names
+        self.ids = ids
+        self.roots = [names[r] for r in roots]
+
+        num_nodes = len(names)
+        virtual = self._virtual = num_nodes
+
+        idom, rpo = _immediate_dominators(succs, preds, roots)
+        self._idom = idom
+
+        # Number the tree with DFS intervals.
+        children: List[List[int]] = [[] for _ in range(num_nodes + 1)]
+        for node in rpo:
+            children[idom[node]].append(node)
+        self._children = children
+        pre = [-1] * (num_nodes + 1)
+        post = [-1] * (num_nodes + 1)
+        depth = [1] * (num_nodes + 1)
+        depth[virtual] = 0
+        counter = 0
+        stack = [(virtual, iter(children[virtual]))]
+        pre[virtual] = counter
+        while stack:
+            node, it = stack[-1]
+            for child in it:
+                counter += 1
+                pre[child] = counter
+                depth[child] = depth[node] + 1
+                stack.append((child, iter(children[child])))
+                break
+            else:
+                stack.pop()
+                post[node] = counter
+        self._pre = pre
+        self._post = post
+        self._depth = depth
+
+    def _dominates(self, a: int, b: int) -> bool:
+        if a == b:
+            return True
+        if self._pre[b] == -1:
+            # b is unreachable.
+            return False
+        return self._pre[a] < self._pre[b] and self._post[b] <= self._post[a]
+
+    def dominates(self, a: BlockName, b: BlockName) -> bool:
+        """Does `a` dominate `b`."""
+        return self._dominates(self.ids[a], self.ids[b])
+
+    def strictly_dominates(self, a: BlockName, b: BlockName) -> bool:
+        """Does `a` dominate `b` with `a` not being `b`."""
+        return a != b and self.dominates(a, b)
+
+    def idom(self, name: BlockName) -> Optional[BlockName]:
+        """The immediate dominator of `name`, None for entries and unreachable
+        blocks."""
+        parent = self._idom[self.ids[name]]
+        if parent == self._virtual or parent == -1:
+            return None
+        return self.names[parent]
+
+    def children(self, name: BlockName) -> List[BlockName]:
+        """The blocks immediately dominated by `name`."""
+        return [self.names[c] for c in self._children[self.ids[name]]]
+
+    def immediate_dominators(self) -> Dict[BlockName, BlockName]:
+        """Map every block that has an immediate dominator to it."""
+        names, idom, virtual = self.names, self._idom, self._virtual
+        return {
+            names[node]: names[parent]
+            for node, parent in enumerate(idom[:virtual])
+            if parent != virtual and parent != -1
+        }
+
+    def __getitem__(self, name: BlockName) -> DominatorSet:
+        return DominatorSet(self, self.ids[name])
+
+    def __iter__(self) -> Iterator[BlockName]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.ids
+
+
+def _immediate_dominators(
+    succs: Sequence[Sequence[int]],
+    preds: Sequence[Sequence[int]],
+    roots: Sequence[int],
+) -> Tuple[List[int], List[int]]:
+    # The immediate dominator of every node, with the virtual root as id
+    # len(succs) and -1 for unreachable nodes, and the reachable nodes in
+    # reverse postorder.
+    num_nodes = len(succs)
+    virtual = num_nodes
+    order = list(dfs_postorder(roots, succs.__getitem__))
+    po_num = [-1] * (num_nodes + 1)
+    for i, node in enumerate(order):
+        po_num[node] = i
+    po_num[virtual] = len(order)
+
+    idom = [-1] * (num_nodes + 1)
+    idom[virtual] = virtual
+    for root in roots:
+        idom[root] = virtual
+    root_set = set(roots)
+    rpo = order[::-1]
+
+    changed = True
+    while changed:
+        changed = False
+        for node in rpo:
+            if node in root_set:
+                continue
+            new_idom = -1
+            for pred in preds[node]:
+                if idom[pred] == -1:
+                    # Not processed yet or unreachable.
+                    continue
+                if new_idom == -1:
+                    new_idom = pred
+                    continue
+                # Intersect the dominator tree paths.
+                finger1, finger2 = pred, new_idom
+                while finger1 != finger2:
+                    while po_num[finger1] < po_num[finger2]:
+                        finger1 = idom[finger1]
+                    while po_num[finger2] < po_num[finger1]:
+                        finger2 = idom[finger2]
+                new_idom = finger1
+            if idom[node] != new_idom:
+                idom[node] = new_idom
+                changed = True
+    return idom, rpo
+
+
+def _as_dense(graph):
+    from numba_rvsdg.core.datastructures.dense_graph import DenseGraph
+
+    return graph if isinstance(graph, DenseGraph) else graph.to_dense()
+
+
+def _roots(graph, dense, edges, boundary) -> List[int]:
+    # Blocks without edges inside the graph, and for a SubgraphView also the
+    # blocks with edges crossing its boundary.
+    from numba_rvsdg.core.datastructures.subgraph import SubgraphView
+
+    roots = [k for k in range(len(dense)) if not edges[k]]
+    if isinstance(graph, SubgraphView):
+        ids = dense.ids
+        roots.extend(
+            ids[name] for name in boundary(graph) if name in ids and edges[ids[name]]
+        )
+    return roots
+
+
+def dominator_tree(graph) -> DominatorTree:
+    """Dominator tree of a DenseGraph, SCFG or SubgraphView, rooted at all
+    blocks without predecessors, and for a SubgraphView also at its
+    headers."""
+    dense = _as_dense(graph)
+    succs = dense.successor_lists()
+    preds = dense.predecessor_lists()
+    roots = _roots(graph, dense, preds, lambda view: view.find_headers_and_entries()[0])
+    return DominatorTree(dense.names, dense.ids, succs, preds, roots)
+
+
+def post_dominator_tree(graph) -> DominatorTree:
+    """Post-dominator tree of a DenseGraph, SCFG or SubgraphView, rooted at
+    all blocks without successors, and for a SubgraphView also at its
+    exiting blocks."""
+    dense = _as_dense(graph)
+    succs = dense.successor_lists()
+    preds = dense.predecessor_lists()
+    roots = _roots(graph, dense, succs, lambda view: view.find_exiting_and_exits()[0])
+    return DominatorTree(dense.names, dense.ids, preds, succs, roots)
+
+
+class DynamicDominatorTree(Mapping):
+    """Dominator tree of an SCFG that is updated in place as edges are
+    inserted and deleted.
+
+    Insertions use the depth based search of Georgiadis, Italiano, Laura and
+    Santaroni, "An Experimental Study of Dynamic Dominators": the immediate
+    dominator of a block only changes to the nearest common dominator `nca`
+    of the endpoints of the new edge, and the affected blocks are found by a
+    search from the target that visits blocks in decreasing depth and never
+    looks at blocks at or above the depth of `nca` plus one. A block that
+    becomes reachable is first attached with a DFS tree of the newly reachable
+    blocks, and the remaining edges out of them are then inserted one by one.
+
+    A deletion changes nothing if the target has another predecessor that
+    dominates the source. Otherwise the blocks that may change are the ones
+    dominated by the nearest common dominator of the endpoints, except for
+    those strictly dominated by the target, so only that part of the tree is
+    recomputed, with the algorithm of DominatorTree. If blocks become
+    unreachable, the blocks reached through them elsewhere may change as
+    well and the tree is rebuilt. Inserting a block between others, as
+    `insert_block_between` does, is a sequence of these updates.
+
+    Unlike `dominator_tree` the entries are fixed: they are the blocks without
+    predecessors when the tree is built. Blocks added later are unreachable
+    until an edge from a reachable block points to them. As a Mapping the
+    tree maps every block to the set of its dominators.
+
+    Hand the tree to `scfg.analyses.maintain` to have it kept current by the
+    mutating methods of the SCFG.
+
+    Parameters
+    ----------
+    scfg: SCFG
+        The SCFG, its edges are read live on every update.
+    """
+
+    def __init__(self, scfg):
+        self.scfg = scfg
+        self.roots: List[BlockName] = [name for name in scfg.blocks if not scfg.in_edges[name]]
+        self._rebuild()
+
+    def _rebuild(self):
+        # Entries have None as immediate dominator, unreachable blocks have
+        # no depth. The children of None are the entries.
+        scfg = self.scfg
+        roots = [name for name in self.roots if name in scfg.blocks]
+        self._idom: Dict[BlockName, Optional[BlockName]] = {}
+        self._depth: Dict[BlockName, int] = {}
+        self._children: Dict[Optional[BlockName], set] = {None: set()}
+        idoms = _idoms_from(roots, scfg.out_edges.__getitem__, scfg.in_edges.__getitem__)
+        for name, parent in idoms.items():
+            self._set_idom(name, parent)
+        self._update_depths(list(self._children[None]))
+
+    def _set_idom(self, name: BlockName, parent: Optional[BlockName]):
+        if name in self._idom:
+            self._children[self._idom[name]].discard(name)
+        self._idom[name] = parent
+        self._children.setdefault(parent, set()).add(name)
+
+    def _update_depths(self, tops: List[BlockName]):
+        # Renumber the subtrees of `tops`. Depths are taken from the parent
+        # when a block is visited, so `tops` may be nested in each other.
+        depth, idom, children = self._depth, self._idom, self._children
+        stack = list(tops)
+        while stack:
+            name = stack.pop()
+            parent = idom[name]
+            depth[name] = 0 if parent is None else depth[parent] + 1
+            stack.extend(children.get(name, ()))
+
+    def nca(self, a: BlockName, b: BlockName) -> Optional[BlockName]:
+        """Nearest common dominator of the reachable blocks `a` and `b`, None
+        if they are below different entries."""
+        depth, idom = self._depth, self._idom
+        while a != b:
+            if a is None or b is None:
+                return None
+            if depth[a] >= depth[b]:
+                a = idom[a]
+            else:
+                b = idom[b]
+        return a
+
+    def edge_inserted(self, src: BlockName, dst: BlockName):
+        """Update the tree for the new edge from `src` to `dst`."""
+        depth = self._depth
+        if src not in depth:
+            return
+        if dst not in depth:
+            self._insert_unreachable(src, dst)
+            return
+        nca = self.nca(src, dst)
+        limit = (-1 if nca is None else depth[nca]) + 1
+        if depth[dst] <= limit:
+            return
+
+        out_edges = self.scfg.out_edges
+        affected = []
+        marked = {dst}
+        order = itertools.count()
+        buckets = [(-depth[dst], next(order), dst)]
+        while buckets:
+            _, _, top = heapq.heappop(buckets)
+            affected.append(top)
+            level = depth[top]
+            stack = [top]
+            while stack:
+                name = stack.pop()
+                for succ in out_edges[name]:
+                    if succ in marked or succ not in depth or depth[succ] <= limit:
+                        continue
+                    marked.add(succ)
+                    if depth[succ] > level:
+                        stack.append(succ)
+                    else:
+                        heapq.heappush(buckets, (-depth[succ], next(order), succ))
+        for name in affected:
+            self._set_idom(name, nca)
+        self._update_depths(affected)
+
+    def _insert_unreachable(self, src: BlockName, dst: BlockName):
+        # Attach a DFS tree of the blocks reachable from `dst` that were not
+        # reachable before, then insert the other edges leaving them.
+        depth = self._depth
+        self._set_idom(dst, src)
+        depth[dst] = depth[src] + 1
+        remaining = []
+        stack = [dst]
+        while stack:
+            name = stack.pop()
+            for succ in self.scfg.out_edges[name]:
+                if succ in depth:
+                    remaining.append((name, succ))
+                else:
+                    self._set_idom(succ, name)
+                    depth[succ] = depth[name] + 1
+                    stack.append(succ)
+        for name, succ in remaining:
+            self.edge_inserted(name, succ)
+
+    def edge_deleted(self, src: BlockName, dst: BlockName):
+        """Update the tree for the removed edge from `src` to `dst`."""
+        depth = self._depth
+        if src not in depth or dst not in depth:
+            return
+        # Paths through the edge can be rerouted through another predecessor
+        # that dominates `src`: its first occurrence on such a path comes
+        # before `src`, so the path up to it survives the deletion.
+        for pred in self.scfg.in_edges[dst]:
+            if pred != src and pred in depth and self.dominates(pred, src):
+                return
+        top = self.nca(src, dst)
+        if top is None:
+            self._rebuild()
+            return
+        if top == dst:
+            # Paths through the edge pass `dst` before, and can skip ahead.
+            return
+
+        # Only blocks dominated by `top` may change, and the blocks strictly
+        # dominated by `dst` keep their immediate dominators: a path to them
+        # can continue from its last visit of `dst`. So the subtree of `dst`
+        # is collapsed into `dst`, whose successors are the blocks entered
+        # from anywhere in that subtree.
+        region = set()
+        stack = [top]
+        while stack:
+            name = stack.pop()
+            region.add(name)
+            if name != dst:
+                stack.extend(self._children.get(name, ()))
+        in_edges, out_edges = self.scfg.in_edges, self.scfg.out_edges
+        # Reachable predecessors outside of the region are all in the subtree
+        # of `dst`, since the immediate dominator of a block in the subtree
+        # of `top` dominates its predecessors.
+        entered = [
+            name for name in region
+            if name != top and any(p in depth and p not in region for p in in_edges[name])
+        ]
+
+        def successors(name):
+            targets = [t for t in out_edges[name] if t in region]
+            return targets + entered if name == dst else targets
+
+        def predecessors(name):
+            return [
+                p if p in region else dst for p in in_edges[name] if p in depth
+            ]
+
+        idoms = _idoms_from([top], successors, predecessors)
+        if len(idoms) < len(region):
+            # Blocks became unreachable, which may affect blocks they lead
+            # to anywhere in the graph.
+            self._rebuild()
+            return
+        changed = [
+            name for name, parent in idoms.items()
+            if name != top and parent != self._idom[name]
+        ]
+        for name in changed:
+            self._set_idom(name, idoms[name])
+        self._update_depths(changed)
+
+    def dominates(self, a: BlockName, b: BlockName) -> bool:
+        """Does `a` dominate `b`."""
+        if a == b:
+            return True
+        depth = self._depth
+        if a not in depth or b not in depth:
+            return False
+        target = depth[a]
+        while depth[b] > target:
+            b = self._idom[b]
+        return a == b
+
+    def strictly_dominates(self, a: BlockName, b: BlockName) -> bool:
+        """Does `a` dominate `b` with `a` not being `b`."""
+        return a != b and self.dominates(a, b)
+
+    def idom(self, name: BlockName) -> Optional[BlockName]:
+        """The immediate dominator of `name`, None for entries and unreachable
+        blocks."""
+        return self._idom.get(name)
+
+    def children(self, name: BlockName) -> List[BlockName]:
+        """The blocks immediately dominated by `name`."""
+        return sorted(self._children.get(name, ()))
+
+    def immediate_dominators(self) -> Dict[BlockName, BlockName]:
+        """Map every block that has an immediate dominator to it."""
+        return {name: parent for name, parent in self._idom.items() if parent is not None}
+
+    def __getitem__(self, name: BlockName) -> FrozenSet[BlockName]:
+        if name not in self.scfg.blocks:
+            raise KeyError(name)
+        doms = [name]
+        if name in self._depth:
+            parent = self._idom[name]
+            while parent is not None:
+                doms.append(parent)
+                parent = self._idom[parent]
+        return frozenset(doms)
+
+    def __iter__(self) -> Iterator[BlockName]:
+        return iter(self.scfg.blocks)
+
+    def __len__(self) -> int:
+        return len(self.scfg.blocks)
+
+    def __contains__(self, name) -> bool:
+        return name in self.scfg.blocks
+
+
+def _idoms_from(
+    roots: List[BlockName], successors: Callable, predecessors: Callable
+) -> Dict[BlockName, Optional[BlockName]]:
+    # Immediate dominators of the blocks reachable from `roots`, None for the
+    # roots. This is the algorithm of DominatorTree run on the names, the
+    # subtrees recomputed by DynamicDominatorTree are usually too small to be
+    # worth a DenseGraph.
+    po_num: Dict = {}
+    order: List[BlockName] = []
+    visited = set(roots)
+    for root in roots:
+        stack = [(root, iter(successors(root)))]
+        while stack:
+            name, it = stack[-1]
+            for succ in it:
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(successors(succ))))
+                    break
+            else:
+                stack.pop()
+                po_num[name] = len(order)
+                order.append(name)
+    virtual = object()
+    po_num[virtual] = len(order)
+    idom: Dict = {root: virtual for root in roots}
+    changed = True
+    while changed:
+        changed = False
+        for name in reversed(order):
+            if idom.get(name) is virtual:
+                continue
+            new_idom = None
+            for pred in predecessors(name):
+                if pred not in idom:
+                    # Not processed yet or unreachable.
+                    continue
+                if new_idom is None:
+                    new_idom = pred
+                    continue
+                finger1, finger2 = pred, new_idom
+                while finger1 != finger2:
+                    while po_num[finger1] < po_num[finger2]:
+                        finger1 = idom[finger1]
+                    while po_num[finger2] < po_num[finger1]:
+                        finger2 = idom[finger2]
+                new_idom = finger1
+            if idom.get(name) != new_idom:
+                idom[name] = new_idom
+                changed = True
+    return {name: None if parent is virtual else parent for name, parent in idom.items()}
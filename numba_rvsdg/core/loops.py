@@ -0,0 +1,178 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterator, List, Optional
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+from numba_rvsdg.core.scc import strongly_connected_components
+
+
+@dataclass(eq=False)
+class Loop:
+    """A loop of the loop nesting forest.
+
+    Attributes
+    ----------
+    headers: FrozenSet[BlockName]
+        Blocks of the loop with predecessors outside of it, the entry points.
+    blocks: FrozenSet[BlockName]
+        All blocks of the loop, including those of nested loops.
+    latches: FrozenSet[BlockName]
+        Blocks of the loop with an edge to one of the headers.
+    exiting: FrozenSet[BlockName]
+        Blocks of the loop with an edge leaving it.
+    exits: FrozenSet[BlockName]
+        Blocks outside of the loop that are targeted from inside of it.
+    depth: int
+        Nesting depth, 1 for outermost loops.
+    parent: Loop, optional
+        The immediately enclosing loop.
+    children: List[Loop]
+        The loops immediately nested in this one.
+    """
+
+    headers: FrozenSet[BlockName]
+    blocks: FrozenSet[BlockName]
+    latches: FrozenSet[BlockName]
+    exiting: FrozenSet[BlockName]
+    exits: FrozenSet[BlockName]
+    depth: int
+    parent: Optional["Loop"] = field(default=None, repr=False)
+    children: List["Loop"] = field(default_factory=list, repr=False)
+
+    def __contains__(self, name) -> bool:
+        return name in self.blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def is_tail_controlled(self) -> bool:
+        """Is the loop in the form loop restructuring brings it into: a
+        single header, and a single latch that is also the only block
+        leaving the loop."""
+        return (
+            len(self.headers) == 1
+            and len(self.latches) == 1
+            and self.latches == self.exiting
+        )
+
+
+class LoopForest:
+    """The loop nesting forest of a graph.
+
+    Loops are found as in Steensgaard's and Ramalingam's definition: the
+    cyclic strongly connected components of the graph are the outermost
+    loops, their headers are the blocks entered from outside, and the loops
+    nested in a loop are the cyclic components of its body once the edges
+    into its headers are removed. Irreducible loops, with several headers,
+    are handled like any other.
+
+    All components are computed over dense ids with the iterative SCC, so
+    the whole forest takes one SCC pass per nesting level instead of
+    recomputing SCCs of the whole graph for every loop.
+
+    Parameters
+    ----------
+    graph: DenseGraph, SCFG or SubgraphView
+        The graph to analyse.
+
+    Attributes
+    ----------
+    roots: List[Loop]
+        The outermost loops, in reverse topological order of the graph.
+    """
+
+    def __init__(self, graph):
+        from numba_rvsdg.core.datastructures.dense_graph import DenseGraph
+
+        dense = graph if isinstance(graph, DenseGraph) else graph.to_dense()
+        self.ids: Dict[BlockName, int] = dense.ids
+        names = dense.names
+        succs = dense.successor_lists()
+        preds = dense.predecessor_lists()
+        innermost: List[Optional[Loop]] = [None] * len(names)
+        self.roots: List[Loop] = []
+
+        # Work items are a loop, its body and its headers, the cyclic
+        # components of the body without the edges into the headers are the
+        # nested loops. The whole graph is the body of a virtual root loop.
+        work = [(None, list(range(len(names))), frozenset())]
+        while work:
+            parent, body, headers = work.pop()
+            local = {node: pos for pos, node in enumerate(body)}
+            local_succs = [
+                [local[t] for t in succs[node] if t in local and t not in headers]
+                for node in body
+            ]
+            for component in strongly_connected_components(local_succs):
+                if len(component) == 1 and component[0] not in local_succs[component[0]]:
+                    continue
+                members = [body[pos] for pos in component]
+                loop = self._make_loop(names, succs, preds, members, parent)
+                if parent is None:
+                    self.roots.append(loop)
+                else:
+                    parent.children.append(loop)
+                for node in members:
+                    innermost[node] = loop
+                header_ids = frozenset(self.ids[h] for h in loop.headers)
+                work.append((loop, sorted(members), header_ids))
+        self._innermost = innermost
+
+    def _make_loop(self, names, succs, preds, members, parent) -> Loop:
+        member_set = set(members)
+        headers = [n for n in members if any(p not in member_set for p in preds[n])]
+        if not headers:
+            # Not entered from outside, e.g. unreachable: pick a stable header.
+            headers = [min(members)]
+        header_set = set(headers)
+        latches, exiting, exits = [], [], set()
+        for node in members:
+            node_succs = succs[node]
+            if any(t in header_set for t in node_succs):
+                latches.append(node)
+            leaving = [t for t in node_succs if t not in member_set]
+            if leaving or not node_succs:
+                exiting.append(node)
+                exits.update(leaving)
+        return Loop(
+            headers=frozenset(names[n] for n in headers),
+            blocks=frozenset(names[n] for n in members),
+            latches=frozenset(names[n] for n in latches),
+            exiting=frozenset(names[n] for n in exiting),
+            exits=frozenset(names[n] for n in exits),
+            depth=1 if parent is None else parent.depth + 1,
+            parent=parent,
+        )
+
+    def __iter__(self) -> Iterator[Loop]:
+        """All loops, every loop before the loops nested in it."""
+        stack = list(reversed(self.roots))
+        while stack:
+            loop = stack.pop()
+            yield loop
+            stack.extend(reversed(loop.children))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def innermost_first(self) -> List[Loop]:
+        """All loops, every loop after the loops nested in it."""
+        return list(self)[::-1]
+
+    def loop_of(self, name: BlockName) -> Optional[Loop]:
+        """The innermost loop containing `name`, None if it is in no loop."""
+        return self._innermost[self.ids[name]]
+
+    def depth(self, name: BlockName) -> int:
+        """Loop nesting depth of `name`, 0 outside of all loops."""
+        loop = self.loop_of(name)
+        return 0 if loop is None else loop.depth
+
+    def is_header(self, name: BlockName) -> bool:
+        """Is `name` the header of a loop.
+
+        The edges into a header are not part of the body of its loop, so a
+        header is never part of a nested loop.
+        """
+        loop = self.loop_of(name)
+        return loop is not None and name in loop.headers
@@ -0,0 +1,200 @@
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence
+
+from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.transformations import (
+    join_returns,
+    restructure_branch,
+    restructure_loop,
+)
+from numba_rvsdg.core.utils import _logger
+
+if TYPE_CHECKING:
+    from numba_rvsdg.core.datastructures.byte_flow import ByteFlow
+
+
+class Pass:
+    """A step of a PassManager pipeline, transforming an SCFG in place.
+
+    Attributes
+    ----------
+    name: str
+        The name the pass is reported under.
+    """
+
+    name: str = "pass"
+
+    def is_satisfied(self, scfg: SCFG) -> bool:
+        """Does `scfg` already have the form the pass brings it into, so that
+        running it would change nothing. The pass is skipped if so."""
+        return False
+
+    def run(self, scfg: SCFG):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class JoinReturns(Pass):
+    """Close the SCFG, see `join_returns`."""
+
+    name = "join_returns"
+
+    def is_satisfied(self, scfg: SCFG) -> bool:
+        return scfg.shape().closed
+
+    def run(self, scfg: SCFG):
+        join_returns(scfg)
+
+
+class RestructureLoop(Pass):
+    """Restructure the loops, see `restructure_loop`."""
+
+    name = "restructure_loop"
+
+    def is_satisfied(self, scfg: SCFG) -> bool:
+        return scfg.shape().acyclic
+
+    def run(self, scfg: SCFG):
+        restructure_loop(scfg)
+
+
+class RestructureBranch(Pass):
+    """Restructure the branches, see `restructure_branch`."""
+
+    name = "restructure_branch"
+
+    def is_satisfied(self, scfg: SCFG) -> bool:
+        return scfg.shape().linear
+
+    def run(self, scfg: SCFG):
+        restructure_branch(scfg)
+
+
+@dataclass(frozen=True)
+class PassResult:
+    """What running one pass did.
+
+    Attributes
+    ----------
+    name: str
+        The name of the pass.
+    skipped: bool
+        Was the pass skipped because the SCFG was already in its form.
+    seconds: float
+        Wall time taken, including the check for skipping it.
+    blocks_added: int
+        Number of blocks added to the SCFG.
+    edges_added: int
+        Number of edges added to the SCFG, negative if edges were removed.
+    allocated: int, optional
+        Bytes still allocated after the pass that were not before, if memory
+        was traced.
+    peak: int, optional
+        Highest number of bytes allocated while the pass ran, on top of those
+        allocated before it, if memory was traced.
+    """
+
+    name: str
+    skipped: bool
+    seconds: float
+    blocks_added: int
+    edges_added: int
+    allocated: Optional[int] = None
+    peak: Optional[int] = None
+
+
+class PassManager:
+    """Runs an ordered list of passes over the SCFG of a ByteFlow.
+
+    Every pass is skipped if its preconditions already hold, and timed
+    otherwise, together with the number of blocks and edges it adds and,
+    with `trace_memory`, the memory it allocates. Tracing memory slows the
+    passes down, so the timings are best taken without it.
+
+    Parameters
+    ----------
+    passes: Sequence[Pass]
+        The passes, in the order they are run.
+    trace_memory: bool
+        Record the memory allocated by every pass with tracemalloc.
+    """
+
+    def __init__(self, passes: Sequence[Pass], trace_memory: bool = False):
+        self.passes: List[Pass] = list(passes)
+        self.trace_memory = trace_memory
+
+    def run(self, flow: "ByteFlow") -> List[PassResult]:
+        """Run all passes over `flow` and return what each of them did."""
+        return list(self.iter_run(flow))
+
+    def iter_run(self, flow: "ByteFlow") -> Iterator[PassResult]:
+        """Run the passes over `flow` one at a time, yielding what each of
+        them did once it is done."""
+        scfg = flow.scfg
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        try:
+            for pass_ in self.passes:
+                result = self._run_pass(pass_, scfg)
+                _logger.debug("%s", result)
+                yield result
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+    def _run_pass(self, pass_: Pass, scfg: SCFG) -> PassResult:
+        num_blocks = len(scfg.blocks)
+        num_edges = _num_edges(scfg)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        skipped = pass_.is_satisfied(scfg)
+        if not skipped:
+            pass_.run(scfg)
+        seconds = time.perf_counter() - start
+        allocated = peak = None
+        if self.trace_memory:
+            current, highest = tracemalloc.get_traced_memory()
+            allocated, peak = current - before, highest - before
+        return PassResult(
+            name=pass_.name,
+            skipped=skipped,
+            seconds=seconds,
+            blocks_added=len(scfg.blocks) - num_blocks,
+            edges_added=_num_edges(scfg) - num_edges,
+            allocated=allocated,
+            peak=peak,
+        )
+
+
+def _num_edges(scfg: SCFG) -> int:
+    return sum(len(targets) for targets in scfg.out_edges.values())
+
+
+def restructure_passes() -> List[Pass]:
+    """The passes of `ByteFlow.restructure`: close the SCFG, then restructure
+    the loops and then the branches."""
+    return [JoinReturns(), RestructureLoop(), RestructureBranch()]
+
+
+def format_results(results: Sequence[PassResult]) -> str:
+    """A table of pass results, one line per pass."""
+    lines = [
+        f"{'pass':24} {'seconds':>10} {'blocks':>7} {'edges':>7} {'allocated':>10}"
+    ]
+    for result in results:
+        if result.skipped:
+            lines.append(f"{result.name:24} {'skipped':>10}")
+            continue
+        allocated = "" if result.allocated is None else result.allocated
+        lines.append(
+            f"{result.name:24} {result.seconds:10.6f} {result.blocks_added:7}"
+            f" {result.edges_added:7} {allocated:>10}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,86 @@
+from typing import List, Optional
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+# Up to this many strongly connected components the full transitive closure
+# is computed up front, beyond that the rows are filled in on demand.
+_EAGER_CLOSURE_LIMIT = 4096
+
+
+class ReachabilityIndex:
+    """Answers "is there a path from a to b" queries on a DenseGraph.
+
+    The graph is condensed into its strongly connected components (see
+    `Condensation`), and every component gets a bitset (a Python int) of the
+    components reachable from it through at least one edge. A query is then
+    two id lookups and a bit test.
+
+    For graphs with up to `_EAGER_CLOSURE_LIMIT` components all bitsets are
+    computed at construction time in a single pass over the condensation in
+    reverse topological order. For larger graphs, where the full closure would
+    be quadratic in memory, a bitset is only computed when it is first
+    queried, together with the bitsets of the components it reaches, and then
+    memoized. This keeps the constant time queries, but a query from near the
+    top of a large graph still fills in the rows of most of it. An interval or
+    chain labelling of the condensation would bound the memory instead, it is
+    not implemented since the graphs restructured so far stay far below the
+    limit.
+
+    Parameters
+    ----------
+    graph: Condensation, DenseGraph, SCFG or SubgraphView
+        The graph to index, or its condensation.
+    """
+
+    def __init__(self, graph):
+        from numba_rvsdg.core.scc import Condensation
+
+        condensation = graph if isinstance(graph, Condensation) else Condensation(graph)
+        self._condensation = condensation
+        self._cyclic = condensation.cyclic
+        self._comp_succs = condensation.succs
+        self._rows: List[Optional[int]] = [None] * len(condensation)
+
+        if len(condensation) <= _EAGER_CLOSURE_LIMIT:
+            # Successors have higher component numbers, so visiting the
+            # components backwards computes successor rows first.
+            for comp in reversed(range(len(condensation))):
+                self._rows[comp] = self._compute_row(comp)
+
+    def _compute_row(self, comp: int) -> int:
+        # All successor rows are known at this point.
+        rows = self._rows
+        row = 1 << comp if self._cyclic[comp] else 0
+        for succ in self._comp_succs[comp]:
+            row |= (1 << succ) | rows[succ]
+        return row
+
+    def _row(self, comp: int) -> int:
+        row = self._rows[comp]
+        if row is not None:
+            return row
+        # Fill in the missing rows of everything reachable from comp in
+        # postorder, so that successor rows are always computed first.
+        rows, comp_succs = self._rows, self._comp_succs
+        stack = [(comp, iter(comp_succs[comp]))]
+        while stack:
+            node, it = stack[-1]
+            for succ in it:
+                if rows[succ] is None:
+                    stack.append((succ, iter(comp_succs[succ])))
+                    break
+            else:
+                stack.pop()
+                if rows[node] is None:
+                    rows[node] = self._compute_row(node)
+        return rows[comp]
+
+    def reachable(self, begin: BlockName, end: BlockName) -> bool:
+        """Is `end` reachable from `begin` by following at least one edge.
+
+        This matches `SCFG.is_reachable_dfs`, a block only reaches itself if
+        it is part of a cycle.
+        """
+        begin_comp = self._condensation.component_index(begin)
+        end_comp = self._condensation.component_index(end)
+        return (self._row(begin_comp) >> end_comp) & 1 == 1
@@ -0,0 +1,147 @@
+from typing import Dict, FrozenSet, List, Sequence
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+
+def strongly_connected_components(succs: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Strongly connected components of a graph over dense integer ids.
+
+    This is Tarjan's algorithm, made iterative with an explicit call stack
+    and an edge cursor per vertex: when the DFS returns to a vertex it resumes
+    at the next unvisited out edge, so every edge is looked at exactly once
+    and the running time is linear even for vertices with a high out degree.
+
+    Parameters
+    ----------
+    succs: Sequence[Sequence[int]]
+        Successor ids for every id ``0 .. len(succs) - 1``.
+
+    Returns
+    -------
+    components: List[List[int]]
+        The components in reverse topological order, i.e. every component
+        comes after all components reachable from it.
+    """
+    num_nodes = len(succs)
+    index = [-1] * num_nodes
+    lowlink = [0] * num_nodes
+    cursor = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        call_stack = [root]
+        while call_stack:
+            node = call_stack[-1]
+            edges = succs[node]
+            for pos in range(cursor[node], len(edges)):
+                succ = edges[pos]
+                if index[succ] == -1:
+                    # Descend, and resume after this edge when back.
+                    cursor[node] = pos + 1
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack[succ] = True
+                    call_stack.append(succ)
+                    break
+                if on_stack[succ] and index[succ] < lowlink[node]:
+                    lowlink[node] = index[succ]
+            else:
+                # All edges are done.
+                call_stack.pop()
+                if call_stack:
+                    parent = call_stack[-1]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+class Condensation:
+    """The condensation DAG of a graph: its strongly connected components
+    and the edges between them.
+
+    Components are numbered in topological order, so every edge of the DAG
+    goes from a lower to a higher component number.
+
+    Parameters
+    ----------
+    graph: DenseGraph, SCFG or SubgraphView
+        The graph to condense.
+
+    Attributes
+    ----------
+    components: List[FrozenSet[BlockName]]
+        The blocks of every component, in topological order.
+    succs: List[List[int]]
+        The successor components of every component, without duplicates.
+    cyclic: List[bool]
+        Whether the component contains a cycle, i.e. has more than one block
+        or a block with an edge to itself.
+    """
+
+    def __init__(self, graph):
+        from numba_rvsdg.core.datastructures.dense_graph import DenseGraph
+
+        dense = graph if isinstance(graph, DenseGraph) else graph.to_dense()
+        names = dense.names
+        node_succs = dense.successor_lists()
+        found = strongly_connected_components(node_succs)
+        num_comps = len(found)
+
+        comp_of = [0] * len(names)
+        for pos, members in enumerate(found):
+            comp = num_comps - 1 - pos
+            for node in members:
+                comp_of[node] = comp
+        components: List[FrozenSet[BlockName]] = [frozenset()] * num_comps
+        cyclic = [False] * num_comps
+        for pos, members in enumerate(found):
+            comp = num_comps - 1 - pos
+            components[comp] = frozenset(names[node] for node in members)
+            cyclic[comp] = len(members) > 1 or members[0] in node_succs[members[0]]
+        succs: List[List[int]] = [[] for _ in range(num_comps)]
+        for node, targets in enumerate(node_succs):
+            comp = comp_of[node]
+            for target in targets:
+                target_comp = comp_of[target]
+                if target_comp != comp:
+                    succs[comp].append(target_comp)
+
+        self.ids: Dict[BlockName, int] = dense.ids
+        self.components = components
+        self.succs = [list(dict.fromkeys(s)) for s in succs]
+        self.cyclic = cyclic
+        self._comp_of = comp_of
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def component_index(self, name: BlockName) -> int:
+        """Number of the component containing `name`."""
+        return self._comp_of[self.ids[name]]
+
+    def component_of(self, name: BlockName) -> FrozenSet[BlockName]:
+        """The blocks of the component containing `name`."""
+        return self.components[self.component_index(name)]
+
+    def loops(self) -> List[FrozenSet[BlockName]]:
+        """The cyclic components, in topological order."""
+        return [c for c, is_cyclic in zip(self.components, self.cyclic) if is_cyclic]
@@ -0,0 +1,453 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Hashable, Iterator, List, Optional, Sequence
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+
+@dataclass(eq=False)
+class SESERegion:
+    """A canonical single entry single exit region of the program structure
+    tree.
+
+    The boundaries are either a block, for regions that start after or end
+    before that block, or an edge ``(src, dst)``. None stands for the virtual
+    exit that all exiting blocks are linked to, e.g. ``(name, None)`` is the
+    edge from the exiting block `name` to it.
+
+    Attributes
+    ----------
+    entry: BlockName or Tuple
+        The entry of the region.
+    exit: BlockName or Tuple
+        The exit of the region.
+    blocks: FrozenSet[BlockName]
+        All blocks strictly inside of the region, including those of nested
+        regions.
+    parent: SESERegion, optional
+        The immediately enclosing region.
+    children: List[SESERegion]
+        The regions immediately nested in this one, in depth-first order.
+    """
+
+    entry: Hashable
+    exit: Hashable
+    blocks: FrozenSet[BlockName] = frozenset()
+    parent: Optional["SESERegion"] = field(default=None, repr=False)
+    children: List["SESERegion"] = field(default_factory=list, repr=False)
+
+    def __contains__(self, name) -> bool:
+        return name in self.blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+
+class _BracketList:
+    # Doubly linked list of brackets with constant time push, delete and
+    # concatenation, the links live in the arrays shared by all lists.
+
+    __slots__ = ("top", "bottom", "size")
+
+    def __init__(self):
+        self.top = -1
+        self.bottom = -1
+        self.size = 0
+
+
+class ProgramStructureTree:
+    """The program structure tree of a graph: its canonical single entry
+    single exit (SESE) regions and how they nest.
+
+    This is the linear time algorithm of Johnson, Pearson and Pingali, "The
+    Program Structure Tree: Computing Control Regions in Linear Time". The
+    blocks are split into an in and an out node joined by an edge of their
+    own, so that regions can be bounded by blocks as well as by edges, and
+    the exiting blocks are linked to a virtual exit with an edge back to the
+    entries. Two edges are then cycle equivalent when every cycle contains
+    either both of them or none, which is found with a single undirected
+    DFS that tracks the set of back edges bracketing every tree edge. The
+    edges of an equivalence class are ordered by dominance, consecutive ones
+    bound a canonical region, and a second DFS nests the regions.
+
+    Blocks that can not be reached from an entry are not part of any region,
+    and blocks that never reach an exiting block, like infinite loops, are
+    linked to the virtual exit as well. Regions without any block inside,
+    like the one between an edge and the only block it leads to, are left
+    out of the tree.
+
+    Parameters
+    ----------
+    names: List[BlockName]
+        Mapping of dense ids to BlockNames.
+    succs: Sequence[Sequence[int]]
+        Successor ids for every id.
+    entries: Sequence[int]
+        The entries of the graph.
+
+    Attributes
+    ----------
+    roots: List[SESERegion]
+        The outermost regions, in depth-first order.
+    """
+
+    def __init__(
+        self,
+        names: List[BlockName],
+        succs: Sequence[Sequence[int]],
+        entries: Sequence[int],
+    ):
+        self.names = names
+        edges = self._split_graph(succs, entries)
+        self._num_nodes = 2 * len(names) + 1
+        self._edges = edges
+        classes = self._cycle_equivalence()
+        self._build_regions(classes, entries)
+
+    def _split_graph(self, succs, entries) -> List[List[int]]:
+        # Block i becomes the nodes 2i (in) and 2i + 1 (out) linked by edge i,
+        # the virtual exit is node 2n. Edges are [src, dst] pairs of nodes.
+        num_blocks = len(succs)
+        end = 2 * num_blocks
+        reached = [False] * num_blocks
+        stack = list(entries)
+        for entry in entries:
+            reached[entry] = True
+        while stack:
+            node = stack.pop()
+            for succ in succs[node]:
+                if not reached[succ]:
+                    reached[succ] = True
+                    stack.append(succ)
+        preds: List[List[int]] = [[] for _ in range(num_blocks)]
+        for node in range(num_blocks):
+            if reached[node]:
+                for succ in succs[node]:
+                    preds[succ].append(node)
+        # Blocks reaching the virtual exit, the rest gets an edge to it.
+        exits = [n for n in range(num_blocks) if reached[n] and not succs[n]]
+        reaches_end = [False] * num_blocks
+        stack = list(exits)
+        for node in exits:
+            reaches_end[node] = True
+        while stack:
+            node = stack.pop()
+            for pred in preds[node]:
+                if not reaches_end[pred]:
+                    reaches_end[pred] = True
+                    stack.append(pred)
+
+        edges = [[2 * n, 2 * n + 1] for n in range(num_blocks)]
+        for node in range(num_blocks):
+            if not reached[node]:
+                continue
+            for succ in succs[node]:
+                edges.append([2 * node + 1, 2 * succ])
+            if not succs[node] or not reaches_end[node]:
+                edges.append([2 * node + 1, end])
+        for entry in entries:
+            edges.append([end, 2 * entry])
+        self._reached = reached
+        return edges
+
+    def _cycle_equivalence(self) -> List[int]:
+        # The class of every edge, computed on the undirected graph.
+        edges = self._edges
+        num_nodes = self._num_nodes
+        adjacent: List[List[int]] = [[] for _ in range(num_nodes)]
+        for k, (src, dst) in enumerate(edges):
+            if src != dst:
+                adjacent[src].append(k)
+                adjacent[dst].append(k)
+
+        # Undirected DFS from the virtual exit, which reaches all nodes of
+        # reachable blocks.
+        root = num_nodes - 1
+        dfsnum = [-1] * num_nodes
+        parent_edge = [-1] * num_nodes
+        order: List[int] = []
+        children: List[List[int]] = [[] for _ in range(num_nodes)]
+        # Back edges from a node to its ancestors, and from its descendants.
+        up: List[List[int]] = [[] for _ in range(num_nodes)]
+        down: List[List[int]] = [[] for _ in range(num_nodes)]
+        dfsnum[root] = 0
+        order.append(root)
+        stack = [(root, iter(adjacent[root]))]
+        while stack:
+            node, it = stack[-1]
+            for k in it:
+                if k == parent_edge[node]:
+                    continue
+                src, dst = edges[k]
+                other = dst if src == node else src
+                if dfsnum[other] == -1:
+                    dfsnum[other] = len(order)
+                    order.append(other)
+                    parent_edge[other] = k
+                    children[node].append(other)
+                    stack.append((other, iter(adjacent[other])))
+                    break
+                if dfsnum[other] < dfsnum[node]:
+                    up[node].append(k)
+                    down[other].append(k)
+            else:
+                stack.pop()
+
+        # Brackets are the back edges, with the ids of their edges, and the
+        # capping back edges, numbered after all edges.
+        num_edges = len(edges)
+        nxt: List[int] = [-1] * num_edges
+        prv: List[int] = [-1] * num_edges
+        recent_size: List[int] = [-1] * num_edges
+        recent_class: List[int] = [-1] * num_edges
+        edge_class: List[int] = [-1] * num_edges
+        capping: List[List[int]] = [[] for _ in range(num_nodes)]
+        infinity = num_nodes
+        hi = [infinity] * num_nodes
+        blists: List[Optional[_BracketList]] = [None] * num_nodes
+        num_classes = 0
+
+        def push(blist, bracket):
+            prv[bracket] = -1
+            nxt[bracket] = blist.top
+            if blist.top == -1:
+                blist.bottom = bracket
+            else:
+                prv[blist.top] = bracket
+            blist.top = bracket
+            blist.size += 1
+
+        def delete(blist, bracket):
+            before, after = prv[bracket], nxt[bracket]
+            if before == -1:
+                blist.top = after
+            else:
+                nxt[before] = after
+            if after == -1:
+                blist.bottom = before
+            else:
+                prv[after] = before
+            blist.size -= 1
+
+        def concat(first, second):
+            if first.size == 0:
+                return second
+            if second.size:
+                nxt[first.bottom] = second.top
+                prv[second.top] = first.bottom
+                first.bottom = second.bottom
+                first.size += second.size
+            return first
+
+        for node in reversed(order):
+            hi0 = min(
+                (dfsnum[edges[k][0] + edges[k][1] - node] for k in up[node]),
+                default=infinity,
+            )
+            hi1 = infinity
+            hichild = -1
+            for child in children[node]:
+                if hi[child] < hi1:
+                    hi1 = hi[child]
+                    hichild = child
+            hi[node] = min(hi0, hi1)
+            hi2 = min((hi[c] for c in children[node] if c != hichild), default=infinity)
+
+            blist = _BracketList()
+            for child in children[node]:
+                blist = concat(blists[child], blist)
+                blists[child] = None
+            for bracket in capping[node]:
+                delete(blist, bracket)
+            for bracket in down[node]:
+                delete(blist, bracket)
+                if edge_class[bracket] == -1:
+                    edge_class[bracket] = num_classes
+                    num_classes += 1
+            for bracket in up[node]:
+                push(blist, bracket)
+            if hi2 < hi0:
+                # A capping back edge to order[hi2].
+                bracket = len(nxt)
+                for array in (nxt, prv, recent_size, recent_class):
+                    array.append(-1)
+                capping[order[hi2]].append(bracket)
+                push(blist, bracket)
+            blists[node] = blist
+
+            k = parent_edge[node]
+            if k != -1:
+                bracket = blist.top
+                if bracket == -1:
+                    # A bridge, which no cycle goes through.
+                    edge_class[k] = num_classes
+                    num_classes += 1
+                    continue
+                if recent_size[bracket] != blist.size:
+                    recent_size[bracket] = blist.size
+                    recent_class[bracket] = num_classes
+                    num_classes += 1
+                edge_class[k] = recent_class[bracket]
+                if recent_size[bracket] == 1 and bracket < num_edges:
+                    edge_class[bracket] = edge_class[k]
+        return edge_class
+
+    def _boundary(self, k: int) -> Hashable:
+        # The block or (src, dst) edge that edge k stands for.
+        if k < len(self.names):
+            return self.names[k]
+        src, dst = self._edges[k]
+        end = self._num_nodes - 1
+        return (
+            None if src == end else self.names[src // 2],
+            None if dst == end else self.names[dst // 2],
+        )
+
+    def _build_regions(self, classes: List[int], entries):
+        edges = self._edges
+        num_nodes = self._num_nodes
+        end = num_nodes - 1
+        out: List[List[int]] = [[] for _ in range(num_nodes)]
+        for k, (src, dst) in enumerate(edges):
+            out[src].append(k)
+
+        # Directed DFS from the virtual exit: the edges of a class are met in
+        # dominance order, consecutive ones bound a canonical region.
+        last: Dict[int, int] = {}
+        entry_of: Dict[int, int] = {}
+        exit_of: Dict[int, int] = {}
+        regions: List[List[int]] = []
+        visited = [False] * num_nodes
+        visited[end] = True
+        stack = [end]
+        while stack:
+            node = stack.pop()
+            for k in reversed(out[node]):
+                cls = classes[k]
+                if cls in last:
+                    pos = len(regions)
+                    regions.append([last[cls], k])
+                    entry_of[last[cls]] = pos
+                    exit_of[k] = pos
+                last[cls] = k
+                dst = edges[k][1]
+                if not visited[dst]:
+                    visited[dst] = True
+                    stack.append(dst)
+
+        # Nest the regions with a second DFS, the region of a node is the one
+        # it is first reached in.
+        parent: List[int] = [-1] * len(regions)
+        innermost: Dict[int, int] = {}
+        region_of = [-1] * num_nodes
+        visited = [False] * num_nodes
+        visited[end] = True
+        stack = [end]
+        while stack:
+            node = stack.pop()
+            current = region_of[node]
+            for k in reversed(out[node]):
+                region = current
+                if exit_of.get(k, -1) == region != -1:
+                    region = parent[region]
+                if k < len(self.names):
+                    # The edge of block k lies in the region it is met in.
+                    innermost[k] = region
+                pos = entry_of.get(k)
+                if pos is not None:
+                    parent[pos] = region
+                    region = pos
+                dst = edges[k][1]
+                if not visited[dst]:
+                    visited[dst] = True
+                    region_of[dst] = region
+                    stack.append(dst)
+
+        # Gather the blocks, children before parents, and drop empty regions.
+        members: List[List[int]] = [[] for _ in regions]
+        for block, region in innermost.items():
+            if region != -1:
+                members[region].append(block)
+        kids: List[List[int]] = [[] for _ in regions]
+        for pos in range(len(regions)):
+            if parent[pos] != -1:
+                kids[parent[pos]].append(pos)
+        blocks: List[FrozenSet[BlockName]] = [frozenset()] * len(regions)
+        post = []
+        stack = [(pos, False) for pos in range(len(regions)) if parent[pos] == -1]
+        while stack:
+            pos, done = stack.pop()
+            if done:
+                post.append(pos)
+            else:
+                stack.append((pos, True))
+                stack.extend((kid, False) for kid in kids[pos])
+        names = self.names
+        for pos in post:
+            collected = set(names[b] for b in members[pos])
+            for kid in kids[pos]:
+                collected |= blocks[kid]
+            blocks[pos] = frozenset(collected)
+
+        nodes: List[Optional[SESERegion]] = [None] * len(regions)
+        for pos, (entry, exit) in enumerate(regions):
+            if blocks[pos]:
+                nodes[pos] = SESERegion(
+                    self._boundary(entry), self._boundary(exit), blocks[pos]
+                )
+        self.roots: List[SESERegion] = []
+        self._by_entry: Dict[Hashable, SESERegion] = {}
+        self._innermost: Dict[BlockName, SESERegion] = {}
+        for pos in range(len(regions)):
+            node = nodes[pos]
+            if node is None:
+                continue
+            self._by_entry[node.entry] = node
+            up_pos = parent[pos]
+            while up_pos != -1 and nodes[up_pos] is None:
+                up_pos = parent[up_pos]
+            if up_pos == -1:
+                self.roots.append(node)
+            else:
+                node.parent = nodes[up_pos]
+                nodes[up_pos].children.append(node)
+        for block, region in innermost.items():
+            while region != -1 and nodes[region] is None:
+                region = parent[region]
+            if region != -1:
+                self._innermost[names[block]] = nodes[region]
+
+    def __iter__(self) -> Iterator[SESERegion]:
+        """All regions, every region before the regions nested in it."""
+        stack = list(reversed(self.roots))
+        while stack:
+            region = stack.pop()
+            yield region
+            stack.extend(reversed(region.children))
+
+    def __len__(self) -> int:
+        return len(self._by_entry)
+
+    def region_of(self, name: BlockName) -> Optional[SESERegion]:
+        """The innermost region containing `name`, None if it is in none."""
+        return self._innermost.get(name)
+
+    def region_at(self, entry: Hashable) -> Optional[SESERegion]:
+        """The region entered at the block or edge `entry`, None if there is
+        none. The region entered at a block is the one from that block to
+        the nearest block or edge that is on all paths leaving it, and that
+        it dominates."""
+        return self._by_entry.get(entry)
+
+
+def program_structure_tree(graph) -> ProgramStructureTree:
+    """Program structure tree of a DenseGraph, SCFG or SubgraphView, entered
+    at all blocks without predecessors, and for a SubgraphView also at its
+    headers."""
+    from numba_rvsdg.core.dominators import _as_dense, _roots
+
+    dense = _as_dense(graph)
+    preds = dense.predecessor_lists()
+    entries = _roots(
+        graph, dense, preds, lambda view: view.find_headers_and_entries()[0]
+    )
+    return ProgramStructureTree(dense.names, dense.successor_lists(), entries)
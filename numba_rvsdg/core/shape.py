@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Dict
+
+from numba_rvsdg.core.datastructures.labels import BlockName
+
+
+@dataclass(frozen=True)
+class GraphShape:
+    """The trivial shapes an SCFG can have, for which a restructuring pass
+    has nothing to do, as far as one pass over its edges can tell.
+
+    This does not detect graphs that are structured in general: loops that
+    already have a single header, latch and exit, and branches that already
+    rejoin, still go through restructuring, which records them as regions.
+
+    Attributes
+    ----------
+    closed: bool
+        There is at most one exiting block, so there are no returns to join.
+    acyclic: bool
+        There are no cycles, so there are no loops to restructure.
+    linear: bool
+        No block has more than one successor, so there are no branches to
+        restructure.
+    """
+
+    closed: bool
+    acyclic: bool
+    linear: bool
+
+    @property
+    def trivial(self) -> bool:
+        """Is the SCFG a single path, that no restructuring pass changes."""
+        return self.closed and self.acyclic and self.linear
+
+
+def summarize_shape(scfg) -> GraphShape:
+    """Find the shape of `scfg` with a single depth-first search.
+
+    A cycle shows up as an edge to a block that is still on the DFS stack.
+    The search covers all blocks, like the loop forest does, so it is not
+    fooled by unreachable cycles.
+    """
+    out_edges = scfg.out_edges
+    linear = True
+    acyclic = True
+    # Blocks on the DFS stack map to True, finished ones to False.
+    on_stack: Dict[BlockName, bool] = {}
+    for root in scfg.blocks:
+        if root in on_stack:
+            continue
+        on_stack[root] = True
+        stack = [(root, iter(out_edges[root]))]
+        while stack:
+            name, targets = stack[-1]
+            for target in targets:
+                state = on_stack.get(target)
+                if state is None:
+                    on_stack[target] = True
+                    stack.append((target, iter(out_edges[target])))
+                    break
+                if state:
+                    acyclic = False
+            else:
+                stack.pop()
+                on_stack[name] = False
+                if len(out_edges[name]) > 1:
+                    linear = False
+    return GraphShape(
+        closed=len(scfg.find_exiting_blocks()) <= 1,
+        acyclic=acyclic,
+        linear=linear,
+    )
@@ -1,5 +1,5 @@
-from collections import defaultdict
-from typing import Set, Dict, List
+import itertools
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from numba_rvsdg.core.datastructures.labels import (
     Label,
@@ -10,16 +10,19 @@ from numba_rvsdg.core.datastructures.labels import (
     SyntheticReturn,
     SyntheticTail,
     SynthenticAssignment,
-    PythonBytecodeLabel,
     BlockName,
+    RegionName,
 )
 from numba_rvsdg.core.datastructures.scfg import SCFG
-from numba_rvsdg.core.datastructures.basic_block import (
-    BasicBlock,
-    ControlVariableBlock,
-    BranchBlock,
+from numba_rvsdg.core.datastructures.jump_table import JumpTable
+
+from numba_rvsdg.core.loops import Loop
+from numba_rvsdg.core.sese import ProgramStructureTree
+from numba_rvsdg.core.dominators import (
+    DominatorTree,
+    DynamicDominatorTree,
+    dominator_tree,
 )
-
 from numba_rvsdg.core.utils import _logger
 
 
@@ -69,10 +72,14 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
         and len(exiting_blocks) == 1
         and backedge_blocks[0] == next(iter(exiting_blocks))
     ):
-        scfg.back_edges[backedge_blocks[0]].append(loop_head)
+        if loop_head not in scfg.back_edges[backedge_blocks[0]]:
+            scfg.add_back_edge(backedge_blocks[0], loop_head)
         return
 
+    # The dominators of the headers before any edge is redirected, also
+    # when they are maintained through the mutations below.
     doms = _doms(scfg)
+    header_doms = {header: frozenset(doms[header]) for header in headers}
     # The synthetic exiting latch and synthetic exit need to be created
     # based on the state of the cfg. If there are multiple exits, we need a
     # SyntheticExit, otherwise we only need a SyntheticExitingLatch
@@ -89,7 +96,7 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
     else:
         exit_variable = scfg.name_gen.new_var_name()
 
-    exit_value_table = dict(((i, j) for i, j in enumerate(exit_blocks)))
+    exit_value_table = JumpTable(enumerate(exit_blocks))
     if needs_synth_exit:
         synth_exit_label = SyntheticExit()
         synth_exit = scfg.add_block(
@@ -101,17 +108,15 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
     # Now we setup the lookup tables for the various control variables,
     # depending on the state of the CFG and what is needed
     if needs_synth_exit:
-        backedge_value_table = dict(
-            (i, j) for i, j in enumerate((loop_head, synth_exit))
-        )
+        backedge_value_table = JumpTable(enumerate((loop_head, synth_exit)))
     else:
-        backedge_value_table = dict(
-            (i, j) for i, j in enumerate((loop_head, next(iter(exit_blocks))))
+        backedge_value_table = JumpTable(
+            enumerate((loop_head, next(iter(exit_blocks))))
         )
     if headers_were_unified:
         header_value_table = scfg[loop_head].branch_value_table
     else:
-        header_value_table = {}
+        header_value_table = JumpTable()
 
     synth_latch_label = SyntheticExitingLatch()
     # This variable denotes the backedge
@@ -122,17 +127,23 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
         variable=backedge_variable,
         branch_value_table=backedge_value_table)
 
-    # This does a dictionary reverse lookup, to determine the key for a given
-    # value.
-    def reverse_lookup(d, value):
-        for k, v in d.items():
-            if v == value:
-                return k
-        else:
-            return "UNUSED"
+    # If an exit is to be created, we do so too, but only add it to the scfg,
+    # since it isn't part of the loop
+    if needs_synth_exit:
+        scfg.add_connections(synth_exit, list(exit_blocks))
+        latch_exit = synth_exit
+    else:
+        latch_exit = list(exit_blocks)[0]
+
+    # Add the back_edge and the exit of the latch at once, so that its out
+    # edges always match its table.
+    scfg.add_connections(
+        synth_exiting_latch, [loop_head, latch_exit], [loop_head]
+    )
 
     # Now that everything is in place, we can start to insert blocks, depending
-    # on what is needed
+    # on what is needed. The latch is wired up first, so that redirecting the
+    # edges to it never cuts blocks off the graph.
 
     # For every block in the loop:
     for _name in sorted(loop):
@@ -141,7 +152,7 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
             # For each jump_target in the block
             for out_target in scfg.out_edges[_name]:
                 # If the target is an exit block
-                if out_target in exit_blocks:
+                if out_target in exit_value_table.targets():
                     # Create a new assignment name and record it
                     synth_assign = SynthenticAssignment()
 
@@ -150,12 +161,15 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
                     # Setup the variables in the assignment table to point to
                     # the correct blocks
                     if needs_synth_exit:
-                        variable_assignment[exit_variable] = reverse_lookup(
-                            exit_value_table, out_target
+                        variable_assignment[exit_variable] = (
+                            exit_value_table.value_of(out_target, "UNUSED")
+                        )
+                    variable_assignment[backedge_variable] = (
+                        backedge_value_table.value_of(
+                            synth_exit if needs_synth_exit
+                            else next(iter(exit_blocks)),
+                            "UNUSED",
                         )
-                    variable_assignment[backedge_variable] = reverse_lookup(
-                        backedge_value_table,
-                        synth_exit if needs_synth_exit else next(iter(exit_blocks)),
                     )
                     # Insert the assignment to the block map
                     synth_assign = scfg.add_block(
@@ -169,21 +183,20 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
                     loop.add(synth_assign)
                     # Update the edge from the out_target to point to the new
                     # assignment block
-                    out_edges = scfg.out_edges[_name]
-                    out_edges[out_edges.index(out_target)] = synth_assign
+                    scfg.replace_out_edge(_name, out_target, synth_assign)
                 # If the target is the loop_head
-                elif out_target in headers and _name not in doms[out_target]:
+                elif out_target in headers and _name not in header_doms[out_target]:
                     # Create the assignment and record it
                     synth_assign = SynthenticAssignment()
                     # Setup the variables in the assignment table to point to
                     # the correct blocks
                     variable_assignment = {}
-                    variable_assignment[backedge_variable] = reverse_lookup(
-                        backedge_value_table, loop_head
+                    variable_assignment[backedge_variable] = (
+                        backedge_value_table.value_of(loop_head, "UNUSED")
                     )
                     if needs_synth_exit:
-                        variable_assignment[exit_variable] = reverse_lookup(
-                            header_value_table, out_target
+                        variable_assignment[exit_variable] = (
+                            header_value_table.value_of(out_target, "UNUSED")
                         )
                     synth_assign = scfg.add_block(
                         "control_variable",
@@ -197,119 +210,56 @@ def loop_restructure_helper(scfg: SCFG, loop: Set[BlockName]):
 
                     # Update the edge from the out_target to point to the new
                     # assignment block
-                    out_edges = scfg.out_edges[_name]
-                    out_edges[out_edges.index(out_target)] = synth_assign
+                    scfg.replace_out_edge(_name, out_target, synth_assign)
 
     # Finally, add the synthetic exiting latch to loop
     loop.add(synth_exiting_latch)
 
-    # Add the back_edge
-    scfg.out_edges[synth_exiting_latch].append(loop_head)
-    scfg.back_edges[synth_exiting_latch].append(loop_head)
-
-    # If an exit is to be created, we do so too, but only add it to the scfg,
-    # since it isn't part of the loop
-    if needs_synth_exit:
-        scfg.insert_block_between(
-            synth_exit,
-            [synth_exiting_latch],
-            list(exit_blocks))
-    else:
-        scfg.out_edges[synth_exiting_latch].append(list(exit_blocks)[0])
-
 
 def restructure_loop(scfg: SCFG):
-    """Inplace restructuring of the given graph to extract loops using
-    strongly-connected components
+    """Inplace restructuring of the given graph to extract loops, including
+    nested loops, using the loop nesting forest
     """
-    # obtain a List of Sets of Labels, where all labels in each set are strongly
-    # connected, i.e. all reachable from one another by traversing the subset
-    scc: List[Set[SCFG]] = scfg.compute_scc()
-    # loops are defined as strongly connected subsets who have more than a
-    # single label and single label loops that point back to to themselves.
-    loops: List[Set[SCFG]] = [
-        nodes
-        for nodes in scc
-        if len(nodes) > 1 or next(iter(nodes)) in scfg.out_edges[next(iter(nodes))]
-    ]
+    # The forest is computed once up front. Loops are restructured outermost
+    # first: restructuring a loop only adds blocks to it and redirects the
+    # edges to its headers and exits, so the bodies of the loops nested in it,
+    # which never contain its headers, are still valid afterwards.
+    loops: List[Loop] = list(scfg.loop_forest())
 
     _logger.debug(
         "restructure_loop found %d loops in %s", len(loops), scfg.blocks.keys()
     )
     # rotate and extract loop
-    for loop in loops:
-        loop_restructure_helper(scfg, loop)
-        extract_region(scfg, loop, "loop")
-
-
-def find_head_blocks(scfg: SCFG, begin: BlockName) -> Set[BlockName]:
-    head = scfg.find_head()
-    head_region_blocks = set()
-    current_block = head
-    # Start at the head block and traverse the graph linearly until
-    # reaching the begin block.
-    while True:
-        head_region_blocks.add(current_block)
-        if current_block == begin:
-            break
-        else:
-            out_targets = scfg.out_edges[current_block]
-            assert len(out_targets) == 1
-            current_block = out_targets[0]
-    return head_region_blocks
-
-
-def find_branch_regions(scfg: SCFG, begin: BlockName, end: BlockName) -> Set[BlockName]:
-    # identify branch regions
-    doms = _doms(scfg)
-    postdoms = _post_doms(scfg)
-    postimmdoms = _imm_doms(postdoms)
-    immdoms = _imm_doms(doms)
-    branch_regions = []
-    out_targets = scfg.out_edges[begin]
-    for bra_start in out_targets:
-        for out_targets in jump_targets:
-            if (out_targets != bra_start
-               and scfg.is_reachable_dfs(out_targets, bra_start)):
-                branch_regions.append(tuple())
-                break
-        else:
-            sub_keys: Set[PythonBytecodeLabel] = set()
-            branch_regions.append((bra_start, sub_keys))
-            # a node is part of the branch if
-            # - the start of the branch is a dominator; and,
-            # - the tail of the branch is not a dominator
-            for k, kdom in doms.items():
-                if bra_start in kdom and end not in kdom:
-                    sub_keys.add(k)
-    return branch_regions
-
-
-def _find_branch_regions(scfg: SCFG, begin: BlockName, end: BlockName) -> Set[BlockName]:
-    # identify branch regions
-    branch_regions = []
-    for bra_start in scfg.out_edges[begin]:
-        region = []
-        region.append(bra_start)
-    return branch_regions
-
-
-def find_tail_blocks(scfg: SCFG, begin: Set[BlockName], head_region_blocks, branch_regions):
-    tail_subregion = set((b for b in scfg.blocks.keys()))
-    tail_subregion.difference_update(head_region_blocks)
-    for reg in branch_regions:
-        if not reg:
-            continue
-        b, sub = reg
-        tail_subregion.discard(b)
-        for s in sub:
-            tail_subregion.discard(s)
-    # exclude parents
-    tail_subregion.discard(begin)
-    return tail_subregion
-
-
-def extract_region(scfg: SCFG, region_blocks, region_kind):
+    tree = scfg.region_tree
+    if not loops:
+        return
+    # The dominators are updated by every edge the helper inserts or deletes,
+    # instead of being recomputed for every loop. Tail controlled loops only
+    # get their back edge marked, so without other loops there is no need.
+    if not all(loop.is_tail_controlled for loop in loops):
+        scfg.analyses.maintain("doms", DynamicDominatorTree(scfg))
+    try:
+        for loop in loops:
+            loop_blocks = scfg.block_set(loop.blocks)
+            enclosing = tree.region_of(next(iter(loop.headers)))
+            num_blocks = len(scfg.blocks)
+            loop_restructure_helper(scfg, loop_blocks)
+            # Blocks added next to the loop, like a SyntheticExit, belong to
+            # the enclosing region, the ones in the loop are added with its
+            # region.
+            for name in itertools.islice(scfg.blocks, num_blocks, None):
+                if name not in loop_blocks:
+                    tree.add_block(name, enclosing)
+            extract_region(scfg, loop_blocks, "loop")
+    finally:
+        scfg.analyses.release("doms")
+
+
+def extract_region(
+    scfg: SCFG, region_blocks: Set[BlockName], region_kind
+) -> RegionName:
+    """Record the given blocks, a plain set or a BlockSet, as a region, and
+    add it to the region tree."""
     headers, entries = scfg.find_headers_and_entries(region_blocks)
     exiting_blocks, exit_blocks = scfg.find_exiting_and_exits(region_blocks)
     assert len(headers) == 1
@@ -317,199 +267,294 @@ def extract_region(scfg: SCFG, region_blocks, region_kind):
     region_header = next(iter(headers))
     region_exiting = next(iter(exiting_blocks))
 
-    scfg.add_region(region_header, region_exiting, region_kind)
+    return scfg.add_region(
+        region_header, region_exiting, region_kind, blocks=region_blocks
+    )
 
 
-def restructure_branch(scfg: SCFG):
-    print("restructure_branch", scfg.blocks)
-    doms = _doms(scfg)
-    postdoms = _post_doms(scfg)
-    postimmdoms = _imm_doms(postdoms)
-    immdoms = _imm_doms(doms)
-    regions = [r for r in _iter_branch_regions(scfg, immdoms, postimmdoms)]
-
-    # Early exit when no branching regions are found.
-    # TODO: the whole graph should become a linear mono head
-    if not regions:
-        return
+class _RegionGraph:
+    """The acyclic graph of one region, as seen by branch restructuring.
 
-    # Compute initial regions.
-    begin, end = regions[0]
-    head_region_blocks = find_head_blocks(scfg, begin)
-    branch_regions = find_branch_regions(scfg, begin, end)
-    tail_region_blocks = find_tail_blocks(
-        scfg, begin, head_region_blocks, branch_regions
-    )
+    The nodes are the blocks of the region, except that every loop nested in
+    the region is collapsed into its header, whose successors are then the
+    exits of the loop. Back edges and edges leaving the region are dropped.
+    Dominators and the program structure tree are computed on this graph
+    only, so restructuring a region never looks at the blocks outside of it,
+    and only once they are needed, so linear regions do without them.
 
-    # Unify headers of tail subregion if need be.
-    headers, entries = scfg.find_headers_and_entries(tail_region_blocks)
-    if len(headers) > 1:
-        end = SyntheticHead()
-        insert_block_and_control_blocks(scfg, entries, headers, end)
-
-    # Recompute regions.
-    head_region_blocks = find_head_blocks(scfg, begin)
-    branch_regions = find_branch_regions(scfg, begin, end)
-    tail_region_blocks = find_tail_blocks(
-        scfg, begin, head_region_blocks, branch_regions
-    )
+    Parameters
+    ----------
+    scfg: SCFG
+        The SCFG containing the region.
+    blocks: Set[BlockName]
+        The blocks of the region.
+    header: BlockName
+        The single header of the region.
+    loops: List[Loop]
+        The outermost loops inside the region, all of them restructured.
+    pst: ProgramStructureTree, optional
+        The program structure tree of the region this one was split from, if
+        neither of them changed since. The region is single entry single exit
+        in there, so it tells whether the branches of its first branch
+        rejoin just like its own tree would. Computed when needed if not
+        given.
+    """
 
-    # Branch region processing:
-    # Close any open branch regions by inserting a SyntheticTail.
-    # Populate any empty branch regions by inserting a SyntheticBranch.
-    for region in branch_regions:
-        if region:
-            bra_start, inner_nodes = region
-            if inner_nodes:
-                # Insert SyntheticTail
-                exiting_blocks, _ = scfg.find_exiting_and_exits(inner_nodes)
-                tail_headers, _ = scfg.find_headers_and_entries(tail_region_blocks)
-                _, _ = join_tails_and_exits(scfg, exiting_blocks, tail_headers)
-
-        else:
-            # Insert SyntheticBranch
-            tail_headers, _ = scfg.find_headers_and_entries(tail_region_blocks)
-            synthetic_branch_block_label = SyntheticBranch()
-            scfg.add_block(block_label=synthetic_branch_block_label)
-            scfg.insert_block_between(synthetic_branch_block_label, (begin,), tail_headers)
-
-    # Recompute regions.
-    head_region_blocks = find_head_blocks(scfg, begin)
-    branch_regions = find_branch_regions(scfg, begin, end)
-    tail_region_blocks = find_tail_blocks(
-        scfg, begin, head_region_blocks, branch_regions
-    )
+    def __init__(
+        self,
+        scfg: SCFG,
+        blocks: Set[BlockName],
+        header: BlockName,
+        loops: List[Loop],
+        pst: Optional[ProgramStructureTree] = None,
+    ):
+        self.scfg = scfg
+        self.header = header
+        self.loops: Dict[BlockName, Loop] = {}
+        collapsed: Dict[BlockName, BlockName] = {}
+        for loop in loops:
+            assert len(loop.headers) == 1, "loops must be restructured first"
+            loop_head = next(iter(loop.headers))
+            self.loops[loop_head] = loop
+            for name in loop.blocks:
+                collapsed[name] = loop_head
+
+        names = sorted(name for name in blocks if collapsed.get(name, name) == name)
+        ids = {name: idx for idx, name in enumerate(names)}
+        succs: List[List[int]] = [[] for _ in names]
+        preds: List[List[int]] = [[] for _ in names]
+        for idx, name in enumerate(names):
+            for source in self.sources(name):
+                back_edges = scfg.back_edges[source]
+                for target in scfg.out_edges[source]:
+                    if target in back_edges or target not in blocks:
+                        continue
+                    target_idx = ids[collapsed.get(target, target)]
+                    if target_idx != idx and target_idx not in succs[idx]:
+                        succs[idx].append(target_idx)
+                        preds[target_idx].append(idx)
+        self.names = names
+        self.ids = ids
+        self._succs = succs
+        self._preds = preds
+        self._doms: Optional[DominatorTree] = None
+        self._pst = pst
+
+    @property
+    def doms(self) -> DominatorTree:
+        """The dominator tree, computed on first use."""
+        if self._doms is None:
+            self._doms = DominatorTree(
+                self.names, self.ids, self._succs, self._preds, [self.ids[self.header]]
+            )
+        return self._doms
+
+    @property
+    def pst(self) -> ProgramStructureTree:
+        """The program structure tree, computed on first use."""
+        if self._pst is None:
+            self._pst = ProgramStructureTree(
+                self.names, self._succs, [self.ids[self.header]]
+            )
+        return self._pst
+
+    def sources(self, name: BlockName) -> Iterable[BlockName]:
+        """The blocks of the SCFG whose out edges are those of `name`."""
+        loop = self.loops.get(name)
+        return (name,) if loop is None else sorted(loop.exiting)
+
+    def expand(self, nodes: Iterable[BlockName]) -> Set[BlockName]:
+        """The blocks of the SCFG making up the given nodes."""
+        blocks = set()
+        for name in nodes:
+            loop = self.loops.get(name)
+            if loop is None:
+                blocks.add(name)
+            else:
+                blocks.update(loop.blocks)
+        return blocks
+
+    def successors(self, name: BlockName) -> List[BlockName]:
+        return [self.names[s] for s in self._succs[self.ids[name]]]
+
+    def predecessors(self, name: BlockName) -> List[BlockName]:
+        return [self.names[p] for p in self._preds[self.ids[name]]]
+
+    def find_head_blocks(self) -> Tuple[Set[BlockName], Optional[BlockName]]:
+        """The linear chain of nodes from the header up to and including the
+        first branch, and that branch, None if the whole region is linear."""
+        head = set()
+        name = self.header
+        while True:
+            head.add(name)
+            succs = self.successors(name)
+            if len(succs) > 1:
+                return head, name
+            if not succs:
+                return head, None
+            name = succs[0]
+
+    def find_branch_regions(
+        self, begin: BlockName
+    ) -> List[Tuple[BlockName, Optional[Set[BlockName]]]]:
+        """The branches of `begin`, each as its first node and the nodes
+        dominated by it, or None if the branch is empty because its first
+        node is also reached from elsewhere."""
+        branch_regions = []
+        for bra_start in self.successors(begin):
+            if self.predecessors(bra_start) != [begin]:
+                branch_regions.append((bra_start, None))
+                continue
+            region = set()
+            stack = [bra_start]
+            while stack:
+                name = stack.pop()
+                region.add(name)
+                stack.extend(self.doms.children(name))
+            branch_regions.append((bra_start, region))
+        return branch_regions
+
+    def find_headers_and_entries(
+        self, nodes: Set[BlockName]
+    ) -> Tuple[Set[BlockName], Set[BlockName]]:
+        """Headers of the given nodes, and the blocks of the SCFG that jump
+        to them from outside."""
+        headers, entries = set(), set()
+        for name in nodes:
+            for pred in self.predecessors(name):
+                if pred not in nodes:
+                    headers.add(name)
+                    entries.update(self.sources(pred))
+        return headers, entries
+
+    def find_exiting(self, nodes: Set[BlockName]) -> Set[BlockName]:
+        """The blocks of the SCFG that jump out of the given nodes."""
+        exiting = set()
+        for name in nodes:
+            if any(succ not in nodes for succ in self.successors(name)):
+                exiting.update(self.sources(name))
+        return exiting
 
-    # extract subregions
-    extract_region(scfg, head_region_blocks, "head")
-    for region in branch_regions:
-        if region:
-            bra_start, inner_nodes = region
-            if inner_nodes:
-                extract_region(scfg, inner_nodes, "branch")
-    extract_region(scfg, tail_region_blocks, "tail")
 
+def restructure_branch(scfg: SCFG):
+    """Inplace restructuring of the given graph to extract branch regions,
+    including the branches nested in other branches and in loops.
+
+    Applies the algorithm BRANCH RESTRUCTURING from section 4.2 of
+    Bahmann2015 to a worklist of regions, which starts out with the whole
+    graph. A region is split into a head, ending in its first branch, the
+    branches and the tail where they join again, and these are put on the
+    worklist in turn. Loops must have been restructured already: each of them
+    is a single node of the regions around it, and becomes a region of its
+    own, without its back edge, once it is reached by a linear region.
+
+    Analyses are computed on the graph of one region at a time, so the whole
+    restructuring takes time proportional to the total size of the regions.
+    Whether the branches of a region rejoin is read off the program structure
+    tree of its graph, which is handed down to the subregions and only
+    computed again once a region is changed.
+    """
+    work = [
+        (None, set(scfg.blocks), scfg.find_head(), scfg.loop_forest().roots, None)
+    ]
+    while work:
+        region, blocks, header, loops, pst = work.pop()
+        work.extend(
+            _restructure_branch_region(scfg, region, blocks, header, loops, pst)
+        )
 
-def _iter_branch_regions(
-    scfg: SCFG, immdoms: Dict[BlockName, BlockName], postimmdoms: Dict[BlockName, BlockName]
-):
-    for begin, node in [i for i in scfg.blocks.items()]:
-        if len(scfg.out_edges[begin]) > 1:
-            # found branch
-            if begin in postimmdoms:
-                end = postimmdoms[begin]
-                if immdoms[end] == begin:
-                    yield begin, end
-
-
-def _imm_doms(doms: Dict[BlockName, Set[BlockName]]) -> Dict[BlockName, BlockName]:
-    idoms = {k: v - {k} for k, v in doms.items()}
-    changed = True
-    while changed:
-        changed = False
-        for k, vs in idoms.items():
-            nstart = len(vs)
-            for v in list(vs):
-                vs -= idoms[v]
-            if len(vs) < nstart:
-                changed = True
-    # fix output
-    out = {}
-    for k, vs in idoms.items():
-        if vs:
-            [v] = vs
-            out[k] = v
-    return out
-
-
-def _doms(scfg: SCFG):
-    # compute dom
-    entries = set()
-    preds_table = defaultdict(set)
-    succs_table = defaultdict(set)
-
-    node: BasicBlock
-    for src, node in scfg.blocks.items():
-        for dst in scfg.out_edges[src]:
-            # check dst is in subgraph
-            if dst in scfg.blocks:
-                preds_table[dst].add(src)
-                succs_table[src].add(dst)
-
-    for k in scfg.blocks:
-        if not preds_table[k]:
-            entries.add(k)
-    return _find_dominators_internal(
-        entries, list(scfg.blocks.keys()), preds_table, succs_table
-    )
 
+def _restructure_branch_region(
+    scfg: SCFG,
+    region: Optional[RegionName],
+    blocks: Set[BlockName],
+    header: BlockName,
+    loops: List[Loop],
+    pst: Optional[ProgramStructureTree],
+):
+    # Restructure the first branch of the region, adding any new blocks to
+    # `blocks` and to the region tree, and return the work items of its
+    # subregions.
+    tree = scfg.region_tree
+    while True:
+        graph = _RegionGraph(scfg, blocks, header, loops, pst)
+        pst = None
+        head_region_blocks, begin = graph.find_head_blocks()
+        if begin is None or graph.pst.region_at(begin) is None:
+            # Linear, only the loops in the region are left to do. The paths
+            # from `begin` rejoin exactly when it starts a SESE region, as
+            # it dominates all blocks after it.
+            return [
+                (
+                    tree.region_of(loop_head),
+                    set(loop.blocks),
+                    loop_head,
+                    loop.children,
+                    None,
+                )
+                for loop_head, loop in graph.loops.items()
+            ]
+        branch_regions = graph.find_branch_regions(begin)
+        tail_region_blocks = set(graph.names) - head_region_blocks
+        for _, inner_nodes in branch_regions:
+            if inner_nodes:
+                tail_region_blocks -= inner_nodes
+
+        # Unify headers of tail subregion if need be.
+        tail_headers, entries = graph.find_headers_and_entries(tail_region_blocks)
+        if len(tail_headers) > 1:
+            tail_head = insert_block_and_control_blocks(
+                scfg, sorted(entries), sorted(tail_headers), SyntheticHead()
+            )
+            for name in [tail_head, *scfg.in_edges[tail_head]]:
+                blocks.add(name)
+                tree.add_block(name, region)
+            continue
+        tail_header = next(iter(tail_headers))
+
+        # Close any open branch regions by inserting a SyntheticTail.
+        # Populate any empty branch regions by inserting a SyntheticBranch.
+        new_blocks = []
+        for _, inner_nodes in branch_regions:
+            if inner_nodes is None:
+                synthetic_branch = scfg.add_block(block_label=SyntheticBranch())
+                scfg.insert_block_between(
+                    synthetic_branch, list(graph.sources(begin)), [tail_header]
+                )
+                new_blocks.append(synthetic_branch)
+                continue
+            exiting_blocks = graph.find_exiting(inner_nodes)
+            if len(exiting_blocks) > 1:
+                solo_tail, _ = join_tails_and_exits(
+                    scfg, exiting_blocks, {tail_header}
+                )
+                new_blocks.append(solo_tail)
+        if new_blocks:
+            for name in new_blocks:
+                blocks.add(name)
+                tree.add_block(name, region)
+            continue
 
-def _post_doms(scfg: SCFG):
-    # compute post dom
-    entries = set()
-    for k in scfg.blocks.keys():
-        targets = set(scfg.out_edges[k]) & set(scfg.blocks)
-        if not targets:
-            entries.add(k)
-    preds_table = defaultdict(set)
-    succs_table = defaultdict(set)
-
-    for src in scfg.blocks.keys():
-        for dst in scfg.out_edges[src]:
-            # check dst is in subgraph
-            if dst in scfg.blocks:
-                preds_table[src].add(dst)
-                succs_table[dst].add(src)
-
-    return _find_dominators_internal(
-        entries, list(scfg.blocks.keys()), preds_table, succs_table
-    )
+        # Extract the subregions and queue them.
+        subregions = [(head_region_blocks, header, "head")]
+        for bra_start, inner_nodes in branch_regions:
+            subregions.append((inner_nodes, bra_start, "branch"))
+        subregions.append((tail_region_blocks, tail_header, "tail"))
+        work = []
+        for nodes, region_header, region_kind in subregions:
+            region_blocks = graph.expand(nodes)
+            subregion = extract_region(scfg, region_blocks, region_kind)
+            region_loops = [graph.loops[n] for n in nodes if n in graph.loops]
+            work.append(
+                (subregion, region_blocks, region_header, region_loops, graph.pst)
+            )
+        return work
 
 
-def _find_dominators_internal(entries, nodes, preds_table, succs_table):
-    # From NUMBA
-    # See theoretical description in
-    # http://en.wikipedia.org/wiki/Dominator_%28graph_theory%29
-    # The algorithm implemented here uses a todo-list as described
-    # in http://pages.cs.wisc.edu/~fischer/cs701.f08/finding.loops.html
-
-    # if post:
-    #     entries = set(scfg._exit_points)
-    #     preds_table = scfg._succs
-    #     succs_table = scfg._preds
-    # else:
-    #     entries = set([scfg._entry_point])
-    #     preds_table = scfg._preds
-    #     succs_table = scfg._succs
-
-    import functools
-
-    if not entries:
-        raise RuntimeError("no entry points: dominator algorithm " "cannot be seeded")
-
-    doms = {}
-    for e in entries:
-        doms[e] = set([e])
-
-    todo = []
-    for n in nodes:
-        if n not in entries:
-            doms[n] = set(nodes)
-            todo.append(n)
-
-    while todo:
-        n = todo.pop()
-        if n in entries:
-            continue
-        new_doms = set([n])
-        preds = preds_table[n]
-        if preds:
-            new_doms |= functools.reduce(set.intersection, [doms[p] for p in preds])
-        if new_doms != doms[n]:
-            assert len(new_doms) < len(doms[n])
-            doms[n] = new_doms
-            todo.extend(succs_table[n])
-    return doms
+def _doms(scfg: SCFG) -> DominatorTree:
+    """Dominators of every block, cached until the SCFG is mutated, or the
+    maintained DynamicDominatorTree while there is one."""
+    return scfg.analyses.get("doms", lambda: dominator_tree(scfg.to_dense()))
 
 
 def insert_block_and_control_blocks(
@@ -521,49 +566,51 @@ def insert_block_and_control_blocks(
     # TODO: needs a diagram and documentaion
     # name of the variable for this branching assignment
     branch_variable = scfg.name_gen.new_var_name()
-    # initial value of the assignment
-    branch_variable_value = 0
-    # store for the mapping from variable value to blockname
-    branch_value_table = {}
+    # Every arc from a predecessor to a successor gets its own value of the
+    # variable, in the order of the out edges of the predecessors so that
+    # the branch conditions keep their meaning. The table of the branching
+    # block is immutable, so the arcs are collected before creating it.
+    successor_set = set(successors)
+    arcs = [
+        (pred_name, s)
+        for pred_name in predecessors
+        for s in scfg.out_edges[pred_name]
+        if s in successor_set
+    ]
     # initialize new block, which will hold the branching table
     branch_block_name = scfg.add_block(
         "branch",
         block_label,
         variable=branch_variable,
-        branch_value_table=branch_value_table
+        branch_value_table=JumpTable(enumerate(s for _, s in arcs))
     )
 
-    control_blocks = {}
     # Replace any arcs from any of predecessors to any of successors with
-    # an arc through the to be inserted block instead.
-
-    for pred_name in predecessors:
-        pred_outs = scfg.out_edges[pred_name]
-        # Need to create synthetic assignments for each arc from a
-        # predecessors to a successor and insert it between the predecessor
-        # and the newly created block
-        for s in successors:
-            if s in pred_outs:
-                synth_assign = SynthenticAssignment()
-                variable_assignment = {}
-                variable_assignment[branch_variable] = branch_variable_value
-
-                # add block
-                control_block_name = scfg.add_block(
-                    "control_variable",
-                    synth_assign,
-                    variable_assignment=variable_assignment,
-                )
-                # update branching table
-                branch_value_table[branch_variable_value] = s
-                # update branching variable
-                branch_variable_value += 1
-                control_blocks[control_block_name] = pred_name
+    # an arc through the to be inserted block instead. Need to create
+    # synthetic assignments for each arc and insert it between the
+    # predecessor and the newly created block. The out edges of the new
+    # blocks come first, so that no successor is ever cut off.
+    control_blocks = []
+    for branch_variable_value in range(len(arcs)):
+        synth_assign = SynthenticAssignment()
+        variable_assignment = {}
+        variable_assignment[branch_variable] = branch_variable_value
+
+        # add block
+        control_block_name = scfg.add_block(
+            "control_variable",
+            synth_assign,
+            variable_assignment=variable_assignment,
+        )
+        control_blocks.append(control_block_name)
 
-    scfg.insert_block_between(branch_block_name, predecessors, successors)
+    scfg.add_connections(branch_block_name, successors)
 
-    for _synth_assign, _pred in control_blocks.items():
-        scfg.insert_block_between(_synth_assign, [_pred], [branch_block_name])
+    # Each arc is redirected on its own, so that a predecessor with several
+    # arcs keeps them apart, in its out edges and in its jump table.
+    for _synth_assign, (_pred, _succ) in zip(control_blocks, arcs):
+        scfg.add_edge(_synth_assign, branch_block_name)
+        scfg.replace_out_edge(_pred, _succ, _synth_assign)
 
     return branch_block_name
 
@@ -575,7 +622,7 @@ def join_returns(scfg: SCFG):
     predescessors and no successors respectively.
     """
     # for all nodes that contain a return
-    return_nodes = [node for node in scfg.blocks.keys() if scfg.is_exiting(node)]
+    return_nodes = scfg.find_exiting_blocks()
     # close if more than one is found
     if len(return_nodes) > 1:
         return_solo_label = SyntheticReturn()
@@ -0,0 +1,69 @@
+from collections import deque
+from typing import Callable, Hashable, Iterable, Iterator, List
+
+Successors = Callable[[Hashable], Iterable[Hashable]]
+
+
+def bfs(roots: Iterable[Hashable], successors: Successors) -> Iterator[Hashable]:
+    """Breadth-first traversal, every node reachable from `roots` is yielded
+    once."""
+    seen = set()
+    to_visit = deque()
+    for root in roots:
+        if root not in seen:
+            seen.add(root)
+            to_visit.append(root)
+    while to_visit:
+        node = to_visit.popleft()
+        yield node
+        for succ in successors(node):
+            if succ not in seen:
+                seen.add(succ)
+                to_visit.append(succ)
+
+
+def dfs_preorder(roots: Iterable[Hashable], successors: Successors) -> Iterator[Hashable]:
+    """Depth-first traversal, nodes are yielded when they are first
+    entered."""
+    for node, entering in _dfs(roots, successors):
+        if entering:
+            yield node
+
+
+def dfs_postorder(roots: Iterable[Hashable], successors: Successors) -> Iterator[Hashable]:
+    """Depth-first traversal, nodes are yielded once all their successors
+    have been finished."""
+    for node, entering in _dfs(roots, successors):
+        if not entering:
+            yield node
+
+
+def reverse_postorder(roots: Iterable[Hashable], successors: Successors) -> List[Hashable]:
+    """Nodes reachable from `roots` in reverse postorder, i.e. every node
+    comes before its successors unless the edge closes a cycle."""
+    order = list(dfs_postorder(roots, successors))
+    order.reverse()
+    return order
+
+
+def _dfs(roots, successors):
+    # Iterative DFS with one successor iterator per stack entry, so each
+    # edge is looked at exactly once.
+    seen = set()
+    for root in roots:
+        if root in seen:
+            continue
+        seen.add(root)
+        yield root, True
+        stack = [(root, iter(successors(root)))]
+        while stack:
+            node, it = stack[-1]
+            for succ in it:
+                if succ not in seen:
+                    seen.add(succ)
+                    yield succ, True
+                    stack.append((succ, iter(successors(succ))))
+                    break
+            else:
+                stack.pop()
+                yield node, False
@@ -13,6 +13,7 @@ from numba_rvsdg.core.datastructures.labels import (
     BlockName,
 )
 from numba_rvsdg.core.datastructures.byte_flow import ByteFlow
+from numba_rvsdg.core.passes import PassManager, restructure_passes
 import dis
 from typing import Dict
 
@@ -31,19 +32,23 @@ class ByteFlowRenderer(object):
         self.render_regions()
 
     def render_regions(self):
-        # render subgraph
-        # for region_name, region in self.scfg.regions.items():
-        #     graph = region.get_full_graph()
-        #     with self.g.subgraph(name=f"cluster_{label}") as subg:
-        #         color = "blue"
-        #         if region.kind == "branch":
-        #             color = "green"
-        #         if region.kind == "tail":
-        #             color = "purple"
-        #         if region.kind == "head":
-        #             color = "red"
-        #         subg.attr(color=color, label=region.kind)
-        pass
+        # Render every region of the region tree as a cluster, nested like
+        # the tree, with the blocks directly in the region as its nodes.
+        tree = self.scfg.region_tree
+        colors = {"loop": "blue", "branch": "green", "tail": "purple", "head": "red"}
+
+        def render_region(graph, node):
+            region = self.scfg.regions[node.region_name]
+            with graph.subgraph(name=f"cluster_{node.region_name.name}") as subg:
+                subg.attr(color=colors.get(region.kind, "black"), label=region.kind)
+                for child in node.children:
+                    render_region(subg, child)
+                for block_name in node.blocks:
+                    if tree.region_of(block_name) == node.region_name:
+                        subg.node(str(block_name))
+
+        for root in tree.roots:
+            render_region(self.g, root)
 
     def render_basic_block(self, block_name: BlockName):
         block = self.scfg[block_name]
@@ -54,7 +59,7 @@ class ByteFlowRenderer(object):
             body += "\l".join(
                 [f"{inst.offset:3}: {inst.opname}" for inst in instlist] + [""]
             )
-        elif isinstance(block, ControlLabel):
+        elif isinstance(block.label, ControlLabel):
             body = str(block_name)
         else:
             raise Exception("Unknown label type: " + block.label)
@@ -135,11 +140,10 @@ def render_func(func):
     flow = ByteFlow.from_bytecode(func)
     ByteFlowRenderer(flow).view("before")
 
-    flow._join_returns()
-    ByteFlowRenderer(flow).view("closed")
-
-    flow._restructure_loop()
-    ByteFlowRenderer(flow).view("loop restructured")
-
-    flow._restructure_branch()
-    ByteFlowRenderer(flow).view("branch restructured")
+    titles = {
+        "join_returns": "closed",
+        "restructure_loop": "loop restructured",
+        "restructure_branch": "branch restructured",
+    }
+    for result in PassManager(restructure_passes()).iter_run(flow):
+        ByteFlowRenderer(flow).view(titles.get(result.name, result.name))
@@ -7,6 +7,7 @@ from numba_rvsdg.core.datastructures.basic_block import (
     PythonBytecodeBlock,
     ControlVariableBlock,
     BranchBlock,
+    RegionBlock,
 )
 from numba_rvsdg.core.datastructures.labels import (
     Label,
@@ -56,6 +57,10 @@ class Simulator:
         List of names, block combinations visisted
     branch: Boolean
         Flag to be set during execution.
+    jump_target: BlockName
+        Target of the last synthetic branch block executed.
+    region_stack: List[RegionBlock]
+        The RegionBlocks being run, innermost last.
     return_value: Any
         The return value of the function.
 
@@ -73,7 +78,9 @@ class Simulator:
         self.stack = []
         self.trace = []
         self.branch = None
+        self.jump_target = None
         self.return_value = None
+        self.region_stack = []
 
     def get_block(self, name: BlockName):
         """Return the BasicBlock object for a give name.
@@ -96,8 +103,35 @@ class Simulator:
             The requested block
 
         """
+        if self.region_stack:
+            return self.region_stack[-1].subregion[name]
         return self.flow.scfg[name]
 
+    def get_out_edges(self, name: BlockName):
+        """Return the out edges of the block with the given name.
+
+        The exiting block of a region has no out edges in the SCFG of the
+        region, so those are taken from the RegionBlock on top of the
+        `region_stack`.
+
+        Parameters
+        ----------
+        name: BlockName
+            The name of the block
+
+        Return
+        ------
+        out_edges: List[BlockName]
+            The out edges, in order.
+
+        """
+        if self.region_stack:
+            region = self.region_stack[-1]
+            if name == region.exiting:
+                return list(region.jump_targets)
+            return region.subregion.out_edges[name]
+        return self.flow.scfg.out_edges[name]
+
     def run(self, args):
         """Run the given simulator with given args.
 
@@ -113,12 +147,70 @@ class Simulator:
 
         """
         self.varmap.update(args)
-        name = self.flow.scfg.find_head()
+        action = self.run_SCFG(self.flow.scfg, self.flow.scfg.find_head())
+        return action["return"]
+
+    def run_SCFG(self, scfg: SCFG, name: BlockName):
+        """Run the blocks of one SCFG, starting at the given block, until
+        returning or jumping to a block that is not part of it.
+
+        A jump to the header of a region nested in the SCFG runs its
+        RegionBlock instead.
+
+        Parameters
+        ----------
+        scfg: SCFG
+            The SCFG to run, the whole graph or the subregion of a region.
+        name: BlockName
+            The block to start at.
+
+        Returns
+        -------
+        action: Dict[Str: Int or Boolean or Any]
+            The return or the jump out of the SCFG.
+
+        """
+        region_headers = {
+            block.header: block_name
+            for block_name, block in scfg.blocks.items()
+            if isinstance(block, RegionBlock)
+        }
+        name = region_headers.get(name, name)
         while True:
-            action = self.run_BasicBlock(name)
+            if isinstance(scfg[name], RegionBlock):
+                action = self.run_RegionBlock(name)
+            else:
+                action = self.run_BasicBlock(name)
             if "return" in action:
-                return action["return"]
+                return action
             name = action["jumpto"]
+            if name in region_headers:
+                name = region_headers[name]
+            elif name not in scfg.blocks:
+                return action
+
+    def run_RegionBlock(self, name: BlockName):
+        """Run a RegionBlock, by running the SCFG of its region.
+
+        Parameters
+        ----------
+        name: BlockName
+            The BlockName of the RegionBlock
+
+        Returns
+        -------
+        action: Dict[Str: Int or Boolean or Any]
+            The action to be taken as a result of having executed the
+            region.
+
+        """
+        region: RegionBlock = self.get_block(name)
+        self.trace.append((name, region))
+        self.region_stack.append(region)
+        try:
+            return self.run_SCFG(region.subregion, region.header)
+        finally:
+            self.region_stack.pop()
 
     def run_BasicBlock(self, name: BlockName):
         """Run a BasicBlock.
@@ -143,11 +235,20 @@ class Simulator:
             self.run_synth_block(name)
         elif isinstance(block.label, PythonBytecodeLabel):
             self.run_PythonBytecodeBlock(name)
-        if len(self.scfg.out_edges[name]) == 1:
-            [name] = self.scfg.out_edges[name]
+        out_edges = self.get_out_edges(name)
+        if isinstance(block, BranchBlock):
+            # The table must agree with the graph, a jump to a block that is
+            # not a successor would run blocks the SCFG never reaches.
+            assert self.jump_target in out_edges, (
+                f"{name} jumps to {self.jump_target}, "
+                f"which is not one of its out edges {out_edges}"
+            )
+            return {"jumpto": self.jump_target}
+        if len(out_edges) == 1:
+            [name] = out_edges
             return {"jumpto": name}
-        elif len(self.scfg.out_edges[name]) == 2:
-            [br_false, br_true] = self.scfg.out_edges[name]
+        elif len(out_edges) == 2:
+            [br_false, br_true] = out_edges
             return {"jumpto": br_true if self.branch else br_false}
         else:
             return {"return": self.return_value}
@@ -178,7 +279,7 @@ class Simulator:
         print("----", name)
         print(f"control variable map: {self.ctrl_varmap}")
         block = self.get_block(name)
-        handler = getattr(self, f"synth_{type(name).__name__}")
+        handler = getattr(self, f"synth_{type(block.label).__name__}")
         handler(name, block)
 
     def run_inst(self, inst: Instruction):
@@ -205,8 +306,7 @@ class Simulator:
         self.ctrl_varmap.update(block.variable_assignment)
 
     def _synth_branch(self, control_label: BlockName, block: BranchBlock):
-        jump_target = block.branch_value_table[self.ctrl_varmap[block.variable]]
-        self.branch = bool(block._jump_targets.index(jump_target))
+        self.jump_target = block.branch_value_table[self.ctrl_varmap[block.variable]]
 
     def synth_SyntheticExitingLatch(
         self, control_label: BlockName, block: ControlVariableBlock
@@ -324,6 +424,14 @@ class Simulator:
     def op_POP_TOP(self, inst: Instruction):
         self.stack.pop()
 
+    def op_SWAP(self, inst: Instruction):
+        stack = self.stack
+        stack[-1], stack[-inst.arg] = stack[-inst.arg], stack[-1]
+
+    def op_EXTENDED_ARG(self, inst: Instruction):
+        # The extended argument is already part of the next instruction.
+        pass
+
     def op_RESUME(self, inst: Instruction):
         pass
 
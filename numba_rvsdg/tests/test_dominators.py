@@ -0,0 +1,197 @@
+import random
+from unittest import main
+
+from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.dominators import (
+    DominatorTree,
+    DynamicDominatorTree,
+    dominator_tree,
+    post_dominator_tree,
+)
+from numba_rvsdg.core.transformations import _doms
+from numba_rvsdg.tests.test_utils import SCFGComparator
+
+
+class TestDominatorTree(SCFGComparator):
+    def test_diamond_with_loop(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: ["4"]
+        "4":
+            type: "basic"
+            out: ["3", "5"]
+        "5":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        doms = dominator_tree(scfg)
+        self.assertEqual(doms[r["0"]], {r["0"]})
+        self.assertEqual(doms[r["3"]], {r["0"], r["3"]})
+        self.assertEqual(doms[r["5"]], {r["0"], r["3"], r["4"], r["5"]})
+        self.assertEqual(len(doms[r["5"]]), 4)
+        self.assertTrue(doms.dominates(r["3"], r["4"]))
+        self.assertFalse(doms.dominates(r["4"], r["3"]))
+        self.assertFalse(doms.strictly_dominates(r["3"], r["3"]))
+        self.assertEqual(doms.idom(r["0"]), None)
+        self.assertEqual(sorted(doms.children(r["0"])), [r["1"], r["2"], r["3"]])
+        self.assertEqual(
+            doms.immediate_dominators(),
+            {
+                r["1"]: r["0"],
+                r["2"]: r["0"],
+                r["3"]: r["0"],
+                r["4"]: r["3"],
+                r["5"]: r["4"],
+            },
+        )
+
+        postdoms = post_dominator_tree(scfg)
+        self.assertEqual(postdoms[r["0"]], {r["0"], r["3"], r["4"], r["5"]})
+        self.assertEqual(postdoms[r["1"]], {r["1"], r["3"], r["4"], r["5"]})
+        self.assertEqual(postdoms.idom(r["3"]), r["4"])
+
+    def test_multiple_entries(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["2"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        doms = dominator_tree(scfg)
+        self.assertEqual(doms[r["2"]], {r["2"]})
+        self.assertEqual(doms[r["3"]], {r["2"], r["3"]})
+        self.assertEqual(doms.immediate_dominators(), {r["3"]: r["2"]})
+
+    def test_unreachable(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: []
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: ["2"]
+        """
+        )
+        r = ref_dict
+        doms = dominator_tree(scfg)
+        self.assertEqual(doms[r["2"]], {r["2"]})
+        self.assertFalse(doms.dominates(r["0"], r["2"]))
+        self.assertFalse(doms.dominates(r["3"], r["2"]))
+        self.assertEqual(doms.idom(r["2"]), None)
+
+
+class TestDynamicDominatorTree(SCFGComparator):
+    def assertMatchesStatic(self, scfg, doms):
+        # Compare with the static tree over the same entries.
+        dense = scfg.to_dense()
+        roots = [dense.ids[name] for name in doms.roots]
+        static = DominatorTree(
+            dense.names, dense.ids, dense.successor_lists(), dense.predecessor_lists(), roots
+        )
+        for name in scfg.blocks:
+            self.assertEqual(doms.idom(name), static.idom(name), name)
+            self.assertEqual(doms[name], set(static[name]), name)
+
+    def test_updates(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        doms = DynamicDominatorTree(scfg)
+        scfg.analyses.maintain("doms", doms)
+        self.assertIs(_doms(scfg), doms)
+        self.assertEqual(doms.idom(r["3"]), r["0"])
+
+        scfg.replace_out_edge(r["2"], r["3"], r["1"])
+        self.assertEqual(doms.idom(r["1"]), r["0"])
+        self.assertEqual(doms.idom(r["3"]), r["1"])
+        self.assertMatchesStatic(scfg, doms)
+
+        new = scfg.add_block()
+        self.assertEqual(doms.idom(new), None)
+        self.assertEqual(doms[new], {new})
+        scfg.insert_block_between(new, [r["1"]], [r["3"]])
+        self.assertEqual(doms.idom(new), r["1"])
+        self.assertEqual(doms.idom(r["3"]), new)
+        self.assertTrue(doms.dominates(r["1"], r["3"]))
+        self.assertMatchesStatic(scfg, doms)
+
+        scfg.analyses.release("doms")
+        self.assertIsNot(_doms(scfg), doms)
+
+    def test_random_updates(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            scfg = SCFG()
+            names = [scfg.add_block() for _ in range(rng.randint(2, 12))]
+            for src, dst in zip(names, names[1:]):
+                extra = [rng.choice(names[1:]) for _ in range(rng.randint(0, 2))]
+                scfg.add_connections(src, list(dict.fromkeys([dst, *extra])))
+            doms = DynamicDominatorTree(scfg)
+            scfg.analyses.maintain("doms", doms)
+            for _ in range(20):
+                blocks = list(scfg.blocks)
+                src = rng.choice(blocks)
+                dst = rng.choice(blocks[1:])
+                out_edges = scfg.out_edges[src]
+                choice = rng.random()
+                if choice < 0.4:
+                    if dst not in out_edges:
+                        scfg.add_edge(src, dst)
+                elif choice < 0.7:
+                    if out_edges and dst not in out_edges:
+                        scfg.replace_out_edge(src, rng.choice(out_edges), dst)
+                elif choice < 0.85:
+                    scfg._set_out_edges(src, out_edges[: rng.randint(0, len(out_edges))])
+                else:
+                    succs = [t for t in out_edges if rng.random() < 0.7]
+                    scfg.insert_block_between(scfg.add_block(), [src], succs)
+                self.assertMatchesStatic(scfg, doms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from unittest import main
+
+from numba_rvsdg.core.datastructures.byte_flow import ByteFlow
+from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.transformations import join_returns, restructure_loop
+from numba_rvsdg.tests.test_utils import SCFGComparator
+
+
+class TestLoopForest(SCFGComparator):
+    def test_nested(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: ["2", "4"]
+        "4":
+            type: "basic"
+            out: ["1", "5"]
+        "5":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        forest = scfg.loop_forest()
+        self.assertIs(forest, scfg.loop_forest())
+        self.assertEqual(len(forest), 2)
+        [outer] = forest.roots
+        [inner] = outer.children
+        self.assertEqual(list(forest), [outer, inner])
+        self.assertEqual(forest.innermost_first(), [inner, outer])
+        self.assertIs(inner.parent, outer)
+
+        self.assertEqual(outer.headers, {r["1"]})
+        self.assertEqual(outer.blocks, {r["1"], r["2"], r["3"], r["4"]})
+        self.assertEqual(outer.latches, {r["4"]})
+        self.assertEqual(outer.exiting, {r["4"]})
+        self.assertEqual(outer.exits, {r["5"]})
+        self.assertEqual(outer.depth, 1)
+
+        self.assertEqual(inner.headers, {r["2"]})
+        self.assertEqual(inner.blocks, {r["2"], r["3"]})
+        self.assertEqual(inner.latches, {r["3"]})
+        self.assertEqual(inner.exits, {r["4"]})
+        self.assertEqual(inner.depth, 2)
+        self.assertTrue(outer.is_tail_controlled)
+        self.assertTrue(inner.is_tail_controlled)
+
+        self.assertIs(forest.loop_of(r["3"]), inner)
+        self.assertIs(forest.loop_of(r["4"]), outer)
+        self.assertIsNone(forest.loop_of(r["0"]))
+        self.assertEqual(
+            [forest.depth(r[k]) for k in "012345"], [0, 1, 2, 2, 1, 0]
+        )
+        self.assertTrue(forest.is_header(r["1"]))
+        self.assertTrue(forest.is_header(r["2"]))
+        self.assertFalse(forest.is_header(r["3"]))
+
+    def test_irreducible_and_self_loop(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: ["1", "3"]
+        "3":
+            type: "basic"
+            out: ["3", "4"]
+        "4":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        forest = scfg.loop_forest()
+        self.assertEqual(len(forest.roots), 2)
+        irreducible = forest.loop_of(r["1"])
+        self.assertEqual(irreducible.headers, {r["1"], r["2"]})
+        self.assertEqual(irreducible.children, [])
+        self_loop = forest.loop_of(r["3"])
+        self.assertEqual(self_loop.blocks, {r["3"]})
+        self.assertEqual(self_loop.latches, {r["3"]})
+        self.assertFalse(irreducible.is_tail_controlled)
+        self.assertTrue(self_loop.is_tail_controlled)
+
+
+class TestRestructureNestedLoops(SCFGComparator):
+    def test_nested_loops_with_break_and_continue(self):
+        def foo(n):
+            c = 0
+            for i in range(n):
+                c += i
+                if i == 3:
+                    break
+                for j in range(i):
+                    if j == 2:
+                        continue
+                    c += j
+                    if c > 100:
+                        break
+            return c
+
+        flow = ByteFlow.from_bytecode(foo)
+        scfg = flow.scfg
+        before = len(scfg.loop_forest())
+        self.assertEqual(before, 2)
+        self.assertFalse(any(loop.is_tail_controlled for loop in scfg.loop_forest()))
+        join_returns(scfg)
+        restructure_loop(scfg)
+        self.assertInEdgesConsistent(scfg)
+
+        # Every loop now has a single header and a single exiting latch.
+        forest = scfg.loop_forest()
+        self.assertEqual(len(forest), before)
+        for loop in forest:
+            self.assertTrue(loop.is_tail_controlled)
+            self.assertEqual(len(loop.exits), 1)
+            [latch] = loop.latches
+            [header] = loop.headers
+            self.assertEqual(scfg.back_edges[latch], (header,))
+        self.assertEqual(len(scfg.regions), before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from unittest import main
+
+from numba_rvsdg.core.datastructures.byte_flow import ByteFlow
+from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.passes import (
+    Pass,
+    PassManager,
+    format_results,
+    restructure_passes,
+)
+from numba_rvsdg.core.transformations import (
+    join_returns,
+    restructure_branch,
+    restructure_loop,
+)
+from numba_rvsdg.tests.test_utils import SCFGComparator
+
+
+def loop_with_branch(x):
+    c = 0
+    for i in range(x):
+        if i > 3:
+            c += i
+    return c
+
+
+def straight(x):
+    return x + 1
+
+
+class AddBlock(Pass):
+    name = "add_block"
+
+    def run(self, scfg):
+        scfg.add_block()
+
+
+class TestPassManager(SCFGComparator):
+    def test_restructure(self):
+        flow = ByteFlow.from_bytecode(loop_with_branch)
+        reference = ByteFlow.from_bytecode(loop_with_branch)
+        results = flow.restructure()
+        self.assertEqual(
+            [result.name for result in results],
+            ["join_returns", "restructure_loop", "restructure_branch"],
+        )
+        # The loop returns from a single block, so there is nothing to join.
+        self.assertEqual(
+            [result.skipped for result in results], [True, False, False]
+        )
+        self.assertEqual(
+            sum(result.blocks_added for result in results),
+            len(flow.scfg.blocks) - len(reference.scfg.blocks),
+        )
+        self.assertTrue(all(result.seconds >= 0 for result in results))
+        self.assertTrue(all(result.allocated is None for result in results))
+
+        # The same as running the transformations by hand.
+        join_returns(reference.scfg)
+        restructure_loop(reference.scfg)
+        restructure_branch(reference.scfg)
+        self.assertSCFGEqual(flow.scfg, reference.scfg)
+
+    def test_skipped(self):
+        flow = ByteFlow.from_bytecode(straight)
+        results = PassManager(restructure_passes(), trace_memory=True).run(flow)
+        self.assertTrue(all(result.skipped for result in results))
+        self.assertTrue(all(result.blocks_added == 0 for result in results))
+        self.assertIn("skipped", format_results(results))
+
+    def test_trace_memory(self):
+        flow = ByteFlow.from_bytecode(loop_with_branch)
+        forest = flow.scfg.loop_forest()
+        dense = flow.scfg.to_dense()
+        manager = PassManager([AddBlock()], trace_memory=True)
+        [result] = list(manager.iter_run(flow))
+        self.assertFalse(result.skipped)
+        self.assertEqual((result.blocks_added, result.edges_added), (1, 0))
+        self.assertGreater(result.peak, 0)
+        self.assertIsInstance(result.allocated, int)
+        # Analyses computed before the pass are dropped.
+        self.assertIsNot(flow.scfg.loop_forest(), forest)
+        self.assertIsNot(flow.scfg.to_dense(), dense)
+
+
+class TestGraphShape(SCFGComparator):
+    def test_shape(self):
+        scfg, _ = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: []
+        """
+        )
+        shape = scfg.shape()
+        self.assertIs(shape, scfg.shape())
+        self.assertTrue(shape.trivial)
+
+        scfg, _ = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: []
+        "2":
+            type: "basic"
+            out: []
+        """
+        )
+        shape = scfg.shape()
+        self.assertEqual(
+            (shape.closed, shape.acyclic, shape.linear), (False, True, False)
+        )
+        self.assertFalse(shape.trivial)
+
+    def test_unreachable_cycle(self):
+        scfg, _ = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: []
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: ["2"]
+        """
+        )
+        shape = scfg.shape()
+        self.assertFalse(shape.acyclic)
+        self.assertTrue(shape.linear)
+
+    def test_restructured(self):
+        # Restructuring leaves the back edges, so the loop stays a cycle.
+        flow = ByteFlow.from_bytecode(loop_with_branch)
+        flow.restructure()
+        shape = flow.scfg.shape()
+        self.assertTrue(shape.closed)
+        self.assertFalse(shape.acyclic)
+
+
+if __name__ == "__main__":
+    main()
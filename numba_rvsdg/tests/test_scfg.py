@@ -1,10 +1,25 @@
-from unittest import main
+import random
+from unittest import main, mock
 from textwrap import dedent
-from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.datastructures.scfg import SCFG, CheckLevel, GraphCheckError
 
 from numba_rvsdg.tests.test_utils import SCFGComparator
-from numba_rvsdg.core.datastructures.basic_block import BasicBlock
-from numba_rvsdg.core.datastructures.labels import Label, NameGenerator
+from numba_rvsdg.core.datastructures.basic_block import (
+    BasicBlock,
+    BranchBlock,
+    ControlVariableBlock,
+    PythonBytecodeBlock,
+)
+from numba_rvsdg.core.datastructures.labels import (
+    BlockName,
+    Label,
+    NameGenerator,
+    PythonBytecodeLabel,
+    RegionName,
+    SyntheticHead,
+)
+from numba_rvsdg.core.datastructures.jump_table import JumpTable
+from numba_rvsdg.core.datastructures.region import Region
 
 
 class TestSCFGConversion(SCFGComparator):
@@ -109,6 +124,115 @@ class TestSCFGConversion(SCFGComparator):
             self.assertDictEquals(case, generated_dict, ref_dict)
 
 
+class TestSlots(SCFGComparator):
+    def test_no_instance_dict(self):
+        name_gen = NameGenerator()
+        objects = [
+            BasicBlock(name_gen, Label()),
+            PythonBytecodeBlock(name_gen, PythonBytecodeLabel(), begin=0, end=2),
+            ControlVariableBlock(name_gen, SyntheticHead(), variable_assignment={}),
+            BranchBlock(name_gen, SyntheticHead(), variable="a", branch_value_table={}),
+            Region(name_gen, "loop", BlockName("a"), BlockName("b")),
+            Label(),
+            SyntheticHead(),
+            BlockName("a"),
+            RegionName("a"),
+            JumpTable({0: BlockName("a")}),
+        ]
+        for obj in objects:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj))
+
+    def test_frozen_semantics(self):
+        name_gen = NameGenerator()
+        block = PythonBytecodeBlock(name_gen, PythonBytecodeLabel(), begin=0, end=2)
+        # The name is set by __post_init__ despite the block being frozen.
+        self.assertEqual(block.block_name, BlockName("pythonbytecodelabel_0"))
+        with self.assertRaises(AttributeError):
+            block.begin = 4
+        with self.assertRaises(AttributeError):
+            BlockName("a").name = "b"
+        self.assertEqual(hash(BlockName("a")), hash(BlockName("a")))
+        self.assertLess(BlockName("a"), BlockName("b"))
+        self.assertEqual(
+            block, PythonBytecodeBlock(NameGenerator(), PythonBytecodeLabel(), begin=0, end=2)
+        )
+
+
+class TestBlockName(SCFGComparator):
+    def test_creation_order(self):
+        scfg = SCFG()
+        names = [scfg.add_block() for _ in range(12)]
+        self.assertEqual(names[10].name, "label_10")
+        self.assertEqual([n.index for n in names], list(range(12)))
+        # Creation order, not string order ("label_10" < "label_2").
+        self.assertEqual(sorted(reversed(names)), names)
+        self.assertLess(names[2], names[10])
+
+    def test_equality_and_hash(self):
+        name = NameGenerator().new_block_name(Label())
+        self.assertEqual(name, name)
+        # Equal to names from another generator with the same string.
+        other = NameGenerator().new_block_name(Label())
+        self.assertIsNot(name, other)
+        self.assertEqual(name, other)
+        self.assertEqual(hash(name), hash(other))
+        self.assertEqual(name, BlockName("label_0"))
+        self.assertNotEqual(name, BlockName("label_1"))
+        self.assertNotEqual(name, "label_0")
+
+    def test_order_consistent_with_equality(self):
+        name = NameGenerator().new_block_name(Label())
+        written = BlockName("label_0")
+        self.assertEqual(written.index, 0)
+        self.assertEqual(hash(written), hash(name))
+        self.assertFalse(written < name or name < written)
+        self.assertTrue(written <= name and name <= written)
+        # Names without a numeric suffix come first and sort by string.
+        self.assertEqual(BlockName("b").index, -1)
+        self.assertEqual(
+            sorted([name, BlockName("b"), BlockName("a")]),
+            [BlockName("a"), BlockName("b"), name],
+        )
+
+    def test_copy(self):
+        import copy
+        import pickle
+
+        name = NameGenerator().new_block_name(Label())
+        for new in (copy.deepcopy(name), pickle.loads(pickle.dumps(name))):
+            self.assertEqual(new, name)
+            self.assertEqual(new.index, name.index)
+            self.assertEqual(hash(new), hash(name))
+
+
+class TestNameGenerator(SCFGComparator):
+    def test_block_names(self):
+        from numba_rvsdg.core.datastructures.labels import label_types
+
+        name_gen = NameGenerator()
+        for index, label_class in enumerate(label_types.values()):
+            label = label_class()
+            expected = str(label).lower().split("(")[0] + "_" + str(index)
+            self.assertEqual(name_gen.new_block_name(label).name, expected)
+        self.assertEqual(name_gen.new_region_name("loop").name, "loop_0")
+
+    def test_variable_names(self):
+        name_gen = NameGenerator()
+        names = [name_gen.new_var_name() for _ in range(26 * 27 + 1)]
+        self.assertEqual(names[:3], ["a", "b", "c"])
+        self.assertEqual(names[25:29], ["z", "aa", "ab", "ac"])
+        self.assertEqual(names[51:53], ["az", "ba"])
+        self.assertEqual(names[-2:], ["zz", "aaa"])
+        self.assertEqual(len(set(names)), len(names))
+        self.assertTrue(all(name.isalpha() and name.islower() for name in names))
+
+        # variable_index is the code point of the first name.
+        name_gen = NameGenerator(variable_index=ord("y"))
+        names = [name_gen.new_var_name() for _ in range(3)]
+        self.assertEqual(names, ["y", "z", "aa"])
+        self.assertEqual(name_gen.variable_index, ord("a") + 27)
+
+
 class TestSCFGIterator(SCFGComparator):
     def test_scfg_iter(self):
         name_generator = NameGenerator()
@@ -130,6 +254,80 @@ class TestSCFGIterator(SCFGComparator):
         received = list(scfg)
         self.assertEqual(expected, received)
 
+    def test_traversal_orders(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "4"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["5"]
+        "3":
+            type: "basic"
+            out: ["5"]
+        "4":
+            type: "basic"
+            out: ["5"]
+        "5":
+            type: "basic"
+            out: ["1", "6"]
+            back: ["1"]
+        "6":
+            type: "basic"
+            out: []
+        """
+        )
+
+        def refs(names):
+            inverse = {v: k for k, v in ref_dict.items()}
+            return [inverse[name] for name in names]
+
+        self.assertEqual(
+            refs(scfg.iter_bfs()), ["0", "1", "4", "2", "3", "5", "6"]
+        )
+        self.assertEqual(
+            [name for name, _ in scfg], list(scfg.iter_bfs())
+        )
+        self.assertEqual(
+            refs(scfg.iter_dfs()), ["0", "1", "2", "5", "6", "3", "4"]
+        )
+        self.assertEqual(
+            refs(scfg.iter_postorder()), ["6", "5", "2", "3", "1", "4", "0"]
+        )
+        self.assertEqual(
+            refs(scfg.iter_rpo()), ["0", "4", "1", "3", "2", "5", "6"]
+        )
+        # Start somewhere else, with and without following back edges.
+        self.assertEqual(
+            refs(scfg.iter_bfs(ref_dict["5"])),
+            ["5", "1", "6", "2", "3"],
+        )
+        self.assertEqual(
+            refs(scfg.iter_bfs(ref_dict["5"], back_edges=False)), ["5", "6"]
+        )
+        # Restrict to a subgraph.
+        subgraph = {ref_dict[k] for k in ("0", "1", "2", "4")}
+        self.assertEqual(
+            refs(scfg.iter_dfs(subgraph=subgraph)), ["0", "1", "2", "4"]
+        )
+        self.assertEqual(
+            refs(scfg.iter_rpo(ref_dict["1"], subgraph=subgraph)), ["1", "2"]
+        )
+
+    def test_traversal_large(self):
+        builder = SCFG.builder()
+        names = [builder.add_block() for _ in range(10000)]
+        for src, dst in zip(names, names[1:]):
+            builder.add_connections(src, [dst])
+        scfg = builder.build()
+        self.assertEqual(list(scfg.iter_bfs()), names)
+        self.assertEqual(list(scfg.iter_dfs()), names)
+        self.assertEqual(list(scfg.iter_rpo()), names)
+
 
 class TestInsertBlock(SCFGComparator):
     def test_linear(self):
@@ -331,5 +529,759 @@ class TestInsertBlock(SCFGComparator):
         self.assertSCFGEqual(expected_scfg, original_scfg)
 
 
+class TestInEdges(SCFGComparator):
+    def test_from_yaml(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["1", "3"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        )
+        self.assertInEdgesConsistent(scfg)
+        self.assertEqual(scfg.in_edges[ref_dict["0"]], ())
+        self.assertEqual(
+            scfg.in_edges[ref_dict["1"]], (ref_dict["0"], ref_dict["2"])
+        )
+
+    def test_mutations(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["1", "4"]
+        "3":
+            type: "basic"
+            out: ["0"]
+        "4":
+            type: "basic"
+            out: []
+        """
+        )
+        new_block = scfg.add_block()
+        scfg.insert_block_between(
+            new_block,
+            [ref_dict["1"], ref_dict["2"]],
+            [ref_dict["3"], ref_dict["4"]],
+        )
+        self.assertInEdgesConsistent(scfg)
+        self.assertEqual(
+            scfg.in_edges[new_block], (ref_dict["1"], ref_dict["2"])
+        )
+        self.assertEqual(scfg.in_edges[ref_dict["4"]], (new_block,))
+
+        other_block = scfg.add_block()
+        scfg.replace_out_edge(ref_dict["3"], ref_dict["0"], other_block)
+        scfg.add_edge(other_block, ref_dict["0"], back_edge=True)
+        self.assertInEdgesConsistent(scfg)
+        self.assertEqual(scfg.in_edges[ref_dict["0"]], (other_block,))
+        self.assertEqual(scfg.back_edges[other_block], (ref_dict["0"],))
+
+    def test_read_only(self):
+        scfg = SCFG()
+        block = scfg.add_block()
+        other_block = scfg.add_block()
+        # The edges can only be changed through the SCFG methods.
+        for edges in (scfg.out_edges, scfg.back_edges, scfg.in_edges):
+            with self.assertRaises(TypeError):
+                edges[block] = (other_block,)
+            with self.assertRaises(AttributeError):
+                edges[block].append(other_block)
+        scfg.add_edge(block, other_block)
+        self.assertEqual(scfg.out_edges[block], (other_block,))
+        self.assertEqual(scfg.in_edges[other_block], (block,))
+        self.assertInEdgesConsistent(scfg)
+
+    def test_headers_and_entries(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["4"]
+        "3":
+            type: "basic"
+            out: ["2", "5"]
+        "4":
+            type: "basic"
+            out: ["1"]
+        "5":
+            type: "basic"
+            out: []
+        """
+        )
+        loop = {ref_dict[k] for k in ("1", "2", "3", "4")}
+        headers, entries = scfg.find_headers_and_entries(loop)
+        self.assertEqual(headers, {ref_dict["1"], ref_dict["2"]})
+        self.assertEqual(entries, {ref_dict["0"]})
+
+
+class TestHeadAndExiting(SCFGComparator):
+    @mock.patch(
+        "numba_rvsdg.core.datastructures.scfg.CHECK_LEVEL", CheckLevel.FULL
+    )
+    def test_tracking(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: []
+        "2":
+            type: "basic"
+            out: []
+        """
+        )
+        self.assertEqual(scfg.find_head(), ref_dict["0"])
+        self.assertEqual(
+            scfg.find_exiting_blocks(), [ref_dict["1"], ref_dict["2"]]
+        )
+
+        # A new block is both a head and exiting until it is connected.
+        new_block = scfg.add_block()
+        self.assertEqual(set(scfg._heads), {ref_dict["0"], new_block})
+        scfg.insert_block_between(
+            new_block, [ref_dict["1"], ref_dict["2"]], []
+        )
+        self.assertEqual(scfg.find_head(), ref_dict["0"])
+        self.assertEqual(scfg.find_exiting_blocks(), [new_block])
+
+        # Redirecting the only edge into a block turns it into a head.
+        other_block = scfg.add_block()
+        scfg.add_edge(other_block, ref_dict["1"])
+        scfg.replace_out_edge(ref_dict["0"], ref_dict["1"], other_block)
+        self.assertEqual(scfg.find_head(), ref_dict["0"])
+        scfg.replace_out_edge(other_block, ref_dict["1"], ref_dict["2"])
+        self.assertEqual(set(scfg._heads), {ref_dict["0"], ref_dict["1"]})
+        self.assertEqual(set(scfg._heads), scfg._scan_heads())
+
+    @mock.patch(
+        "numba_rvsdg.core.datastructures.scfg.CHECK_LEVEL", CheckLevel.FULL
+    )
+    def test_cross_check(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: []
+        """
+        )
+        # Bypassing the SCFG methods is caught by the cross-check.
+        scfg._out_edges[ref_dict["0"]] = ()
+        with self.assertRaises(AssertionError):
+            scfg.find_head()
+
+
+class TestCheckGraph(SCFGComparator):
+    def build(self, check_level):
+        builder = SCFG.builder(check_level)
+        names = [builder.add_block() for _ in range(3)]
+        builder.add_connections(names[0], [names[1]])
+        builder.add_connections(names[1], [names[2]])
+        return builder.build(), names
+
+    def test_off(self):
+        scfg, names = self.build(CheckLevel.OFF)
+        scfg._out_edges[names[0]] += (BlockName("missing"),)
+        scfg.check_graph()
+        scfg.check_graph([names[0]])
+
+    def test_incremental(self):
+        scfg, names = self.build(CheckLevel.INCREMENTAL)
+        # Only the touched blocks are looked at.
+        scfg._out_edges[names[2]] += (names[0],)
+        scfg.check_graph([names[0]])
+        with self.assertRaises(GraphCheckError):
+            scfg.check_graph([names[2]])
+        # Mutations check the blocks they touch.
+        scfg, names = self.build(CheckLevel.INCREMENTAL)
+        scfg.add_edge(names[0], names[2])
+        with self.assertRaises(GraphCheckError):
+            scfg.add_edge(names[0], names[2])
+
+    def test_full(self):
+        scfg, names = self.build(CheckLevel.FULL)
+        scfg._back_edges[names[2]] += (names[0],)
+        with self.assertRaises(GraphCheckError):
+            scfg.check_graph([names[0]])
+
+    def test_checks(self):
+        def broken(mutate):
+            scfg, names = self.build(CheckLevel.FULL)
+            with self.assertRaises(GraphCheckError):
+                mutate(scfg, names)
+                scfg.check_graph()
+
+        def append(edges, name, target):
+            edges[name] += (target,)
+
+        broken(lambda scfg, n: append(scfg._out_edges, n[0], BlockName("missing")))
+        broken(lambda scfg, n: append(scfg._out_edges, n[0], n[1]))
+        broken(lambda scfg, n: append(scfg._back_edges, n[0], n[2]))
+        broken(lambda scfg, n: append(scfg._in_edges, n[2], n[0]))
+        broken(lambda scfg, n: scfg._heads.pop(n[0]))
+        broken(lambda scfg, n: scfg.add_region(n[0], BlockName("missing"), "loop"))
+
+    def test_jump_tables(self):
+        scfg, names = self.build(CheckLevel.FULL)
+        branch = scfg.add_block(
+            "branch", SyntheticHead(), variable="x",
+            branch_value_table=[(0, names[0]), (1, names[1])],
+        )
+        # Tables of exiting blocks are not checked, their edges come later.
+        scfg.add_connections(branch, [names[0], names[1]])
+        # A table entry that is not an out edge is stale.
+        scfg.blocks[branch] = scfg[branch].replace_target(names[1], names[2])
+        with self.assertRaises(GraphCheckError):
+            scfg.check_graph([branch])
+
+    def test_closed(self):
+        scfg, names = self.build(CheckLevel.OFF)
+        scfg.check_closed()
+        scfg.add_region(names[0], names[2], "branch")
+        scfg.check_closed()
+        scfg.add_region(names[2], names[0], "branch")
+        with self.assertRaises(GraphCheckError):
+            scfg.check_closed()
+
+        # Graphs with several heads are fine until they are closed.
+        scfg, names = self.build(CheckLevel.FULL)
+        other = scfg.add_block()
+        scfg.check_graph()
+        with self.assertRaises(GraphCheckError):
+            scfg.check_closed()
+        scfg.add_edge(other, names[0])
+        scfg.check_closed()
+
+    def test_level_from_environment(self):
+        from numba_rvsdg.core.datastructures.scfg import _parse_check_level
+
+        self.assertIs(_parse_check_level("Full"), CheckLevel.FULL)
+        with self.assertRaisesRegex(ValueError, "off, incremental, full"):
+            _parse_check_level("ful")
+
+
+class TestAnalysisManager(SCFGComparator):
+    def test_generation(self):
+        scfg = SCFG()
+        generation = scfg.analyses.generation
+        block_0 = scfg.add_block()
+        block_1 = scfg.add_block()
+        scfg.add_connections(block_0, [block_1])
+        self.assertEqual(scfg.analyses.generation, generation + 3)
+
+        generation = scfg.analyses.generation
+        block_2 = scfg.add_block()
+        scfg.insert_block_between(block_2, [block_0], [block_1])
+        self.assertGreater(scfg.analyses.generation, generation + 1)
+
+        generation = scfg.analyses.generation
+        scfg.add_edge(block_1, block_0, back_edge=True)
+        self.assertEqual(scfg.analyses.generation, generation + 1)
+
+    def test_cached_analyses(self):
+        from numba_rvsdg.core.dominators import post_dominator_tree
+        from numba_rvsdg.core.transformations import _doms
+
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        )
+        doms = _doms(scfg)
+        self.assertIs(doms, _doms(scfg))
+        self.assertIs(scfg.to_dense(), scfg.to_dense())
+        self.assertTrue(scfg.analyses.is_cached("doms"))
+        self.assertFalse(scfg.analyses.is_cached("loop_forest"))
+        self.assertEqual(scfg.compute_scc(), scfg.compute_scc())
+
+        new_block = scfg.add_block()
+        scfg.insert_block_between(new_block, [ref_dict["1"]], [ref_dict["3"]])
+        self.assertFalse(scfg.analyses.is_cached("doms"))
+        new_doms = _doms(scfg)
+        self.assertIsNot(doms, new_doms)
+        self.assertEqual(new_doms[new_block], {ref_dict["0"], ref_dict["1"], new_block})
+        self.assertEqual(
+            post_dominator_tree(scfg)[ref_dict["1"]],
+            {ref_dict["1"], new_block, ref_dict["3"]},
+        )
+
+
+class TestBlockSet(SCFGComparator):
+    def setUp(self):
+        self.scfg = SCFG()
+        self.names = [self.scfg.add_block() for _ in range(100)]
+
+    def test_basic(self):
+        names = self.names
+        block_set = self.scfg.block_set([names[70], names[3], names[64]])
+        self.assertEqual(len(block_set), 3)
+        self.assertEqual(list(block_set), [names[3], names[64], names[70]])
+        self.assertIn(names[64], block_set)
+        self.assertNotIn(names[4], block_set)
+        self.assertEqual(block_set, {names[3], names[64], names[70]})
+        self.assertEqual({names[3], names[64], names[70]}, block_set)
+
+        block_set.add(names[0])
+        block_set.discard(names[64])
+        block_set.discard(names[65])
+        self.assertEqual(block_set, {names[0], names[3], names[70]})
+        self.assertFalse(self.scfg.block_set())
+
+        # Blocks added after the set was created can be added as well.
+        new_block = self.scfg.add_block()
+        block_set.add(new_block)
+        self.assertEqual(list(block_set)[-1], new_block)
+
+    def test_algebra(self):
+        names = self.names
+        evens = self.scfg.block_set(names[::2])
+        low = self.scfg.block_set(names[:10])
+        self.assertEqual(evens & low, set(names[:10:2]))
+        self.assertEqual(low - evens, set(names[1:10:2]))
+        self.assertEqual(len(evens | low), 55)
+        self.assertEqual(evens ^ low, set(names[1:10:2] + names[10::2]))
+        self.assertEqual(low.intersection(names[5:15]), set(names[5:10]))
+        self.assertEqual(low.difference(set(names[1:])), {names[0]})
+        self.assertEqual(low.union({names[99]}), set(names[:10] + [names[99]]))
+        self.assertEqual(set(names[:3]) - low, set())
+        self.assertTrue(low.isdisjoint(names[10:]))
+        self.assertTrue(self.scfg.block_set(names[:2]) <= low)
+        self.assertTrue(self.scfg.block_set(names[:2]).issubset(set(names)))
+
+        low.difference_update(evens)
+        self.assertEqual(low, set(names[1:10:2]))
+        low |= {names[0]}
+        self.assertEqual(low, set(names[0:1] + names[1:10:2]))
+
+    def test_exclude_blocks(self):
+        names = self.names
+        excluded = self.scfg.block_set(names[1:])
+        self.assertEqual(list(self.scfg.exclude_blocks(excluded)), [names[0]])
+        self.assertEqual(
+            list(self.scfg.exclude_blocks(set(names[1:]))), [names[0]]
+        )
+
+
+class TestJumpTable(SCFGComparator):
+    def test_lookups(self):
+        a, b, c = BlockName("a"), BlockName("b"), BlockName("c")
+        table = JumpTable(enumerate([a, b, a]))
+        self.assertEqual(dict(table), {0: a, 1: b, 2: a})
+        self.assertEqual(table[1], b)
+        self.assertEqual(table.value_of(a), 0)
+        self.assertEqual(table.value_of(b), 1)
+        self.assertEqual(list(table.targets()), [a, b])
+        self.assertIn(b, table.targets())
+        self.assertEqual(table.value_of(c, "UNUSED"), "UNUSED")
+        with self.assertRaises(KeyError):
+            table.value_of(c)
+        self.assertEqual(table, JumpTable({0: a, 1: b, 2: a}))
+        self.assertEqual(hash(table), hash(JumpTable({0: a, 1: b, 2: a})))
+
+    def test_branch_block(self):
+        name_gen = NameGenerator()
+        a, b = BlockName("a"), BlockName("b")
+        block = BranchBlock(
+            name_gen, SyntheticHead(), variable="x", branch_value_table={0: a, 1: b}
+        )
+        table = block.branch_value_table
+        self.assertIsInstance(table, JumpTable)
+        self.assertEqual(table.value_of(b), 1)
+        with self.assertRaises(TypeError):
+            table[2] = a
+        empty = BranchBlock(name_gen, SyntheticHead(), variable="x")
+        self.assertEqual(len(empty.branch_value_table), 0)
+        # Blocks with an immutable table are hashable.
+        self.assertEqual(len({block, block}), 1)
+
+    def test_replace_target(self):
+        a, b, c = BlockName("a"), BlockName("b"), BlockName("c")
+        table = JumpTable(enumerate([a, b, a]))
+        self.assertEqual(dict(table.replace_target(a, c)), {0: c, 1: b, 2: c})
+        self.assertEqual(table.replace_target(a, c).value_of(c), 0)
+        self.assertEqual(dict(table), {0: a, 1: b, 2: a})
+        block = BranchBlock(
+            NameGenerator(), SyntheticHead(), variable="x", branch_value_table=table
+        )
+        moved = block.replace_target(b, c)
+        self.assertEqual(moved.block_name, block.block_name)
+        self.assertEqual(dict(moved.branch_value_table), {0: a, 1: c, 2: a})
+        self.assertEqual(block.branch_value_table, table)
+
+    def test_redirected_edges(self):
+        # Redirecting the out edges of a branch block redirects its table.
+        scfg = SCFG()
+        a, b, c = (scfg.add_block() for _ in range(3))
+        branch = scfg.add_block(
+            "branch", SyntheticHead(), variable="x", branch_value_table=[(0, a), (1, b)]
+        )
+        scfg.add_connections(branch, [a, b])
+        scfg.replace_out_edge(branch, a, c)
+        self.assertEqual(dict(scfg[branch].branch_value_table), {0: c, 1: b})
+        d = scfg.add_block()
+        scfg.insert_block_between(d, [branch], [b])
+        self.assertEqual(dict(scfg[branch].branch_value_table), {0: c, 1: d})
+        self.assertEqual(scfg.out_edges[branch], (c, d))
+
+
+class TestReachability(SCFGComparator):
+    def _random_scfg(self, seed):
+        rnd = random.Random(seed)
+        scfg = SCFG()
+        names = [scfg.add_block() for _ in range(rnd.randint(1, 30))]
+        for name in names:
+            out_edges = [rnd.choice(names) for _ in range(rnd.choice([0, 1, 2, 2, 3]))]
+            scfg.add_connections(name, list(dict.fromkeys(out_edges)))
+        return scfg, names
+
+    def _check(self, seeds):
+        for seed in seeds:
+            scfg, names = self._random_scfg(seed)
+            for begin in names:
+                for end in names:
+                    self.assertEqual(
+                        scfg.is_reachable(begin, end),
+                        scfg.is_reachable_dfs(begin, end),
+                    )
+
+    def test_eager(self):
+        self._check(range(50))
+
+    @mock.patch("numba_rvsdg.core.reachability._EAGER_CLOSURE_LIMIT", 0)
+    def test_lazy(self):
+        self._check(range(50, 100))
+
+    def test_invalidation(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: []
+        """
+        )
+        self.assertFalse(scfg.is_reachable(ref_dict["1"], ref_dict["0"]))
+        scfg.add_edge(ref_dict["1"], ref_dict["0"], back_edge=True)
+        self.assertTrue(scfg.is_reachable(ref_dict["1"], ref_dict["0"]))
+        self.assertTrue(scfg.is_reachable(ref_dict["0"], ref_dict["0"]))
+
+    def test_outside_names(self):
+        scfg = SCFG()
+        block = scfg.add_block()
+        outside = BlockName("outside")
+        self.assertFalse(scfg.is_reachable(block, outside))
+        self.assertFalse(scfg.is_reachable(outside, block))
+
+
+class TestSCC(SCFGComparator):
+    def test_random(self):
+        from numba_rvsdg.core.scc import strongly_connected_components
+
+        rnd = random.Random(0)
+        for _ in range(100):
+            n = rnd.randint(1, 25)
+            succs = [
+                list(dict.fromkeys(rnd.randrange(n) for _ in range(rnd.choice([0, 1, 2, 3]))))
+                for _ in range(n)
+            ]
+            reach = []
+            for node in range(n):
+                seen, todo = {node}, [node]
+                while todo:
+                    for succ in succs[todo.pop()]:
+                        if succ not in seen:
+                            seen.add(succ)
+                            todo.append(succ)
+                reach.append(seen)
+            components = strongly_connected_components(succs)
+            self.assertEqual(sorted(m for c in components for m in c), list(range(n)))
+            comp_of = {m: k for k, c in enumerate(components) for m in c}
+            for a in range(n):
+                for b in range(n):
+                    same = b in reach[a] and a in reach[b]
+                    self.assertEqual(same, comp_of[a] == comp_of[b])
+                    # Reverse topological order.
+                    if b in reach[a]:
+                        self.assertGreaterEqual(comp_of[a], comp_of[b])
+
+    def test_deep_and_wide(self):
+        from numba_rvsdg.core.scc import strongly_connected_components
+
+        # A long cycle does not hit the recursion limit.
+        n = 100000
+        succs = [[i + 1] for i in range(n - 1)] + [[0]]
+        self.assertEqual(len(strongly_connected_components(succs)), 1)
+        # A hub with many back and forth edges.
+        succs = [list(range(1, 5001))] + [[0] for _ in range(5000)]
+        self.assertEqual(len(strongly_connected_components(succs)), 1)
+
+    def test_condensation(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["1"]
+        "3":
+            type: "basic"
+            out: ["3", "4"]
+        "4":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        condensation = scfg.condensation()
+        self.assertIs(condensation, scfg.condensation())
+        self.assertEqual(
+            condensation.components,
+            [
+                frozenset({r["0"]}),
+                frozenset({r["1"], r["2"]}),
+                frozenset({r["3"]}),
+                frozenset({r["4"]}),
+            ],
+        )
+        self.assertEqual(condensation.succs, [[1], [2], [3], []])
+        self.assertEqual(condensation.cyclic, [False, True, True, False])
+        self.assertEqual(condensation.component_of(r["2"]), {r["1"], r["2"]})
+        self.assertEqual(
+            condensation.loops(), [frozenset({r["1"], r["2"]}), frozenset({r["3"]})]
+        )
+        self.assertEqual(
+            scfg.compute_scc(), [{r["4"]}, {r["3"]}, {r["1"], r["2"]}, {r["0"]}]
+        )
+        scfg.add_edge(r["4"], r["0"])
+        self.assertEqual(len(scfg.condensation()), 1)
+
+
+class TestDenseGraph(SCFGComparator):
+    def test_dense_ids(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: ["1", "4"]
+            back: ["1"]
+        "4":
+            type: "basic"
+        """
+        )
+        dense = scfg.to_dense()
+        self.assertEqual(len(dense), 5)
+        self.assertEqual(dense.num_edges, 6)
+        for ref, name in ref_dict.items():
+            self.assertEqual(scfg.block_id(name), int(ref))
+            self.assertEqual(dense.names[int(ref)], name)
+            self.assertIn(name, dense)
+            self.assertIs(dense[name], scfg[name])
+            self.assertEqual(dense.out_edges[name], scfg.out_edges[name])
+            self.assertEqual(dense.back_edges[name], scfg.back_edges[name])
+
+        self.assertEqual(list(dense.successors(0)), [1, 2])
+        self.assertEqual(list(dense.successors(3)), [1, 4])
+        self.assertEqual(sorted(dense.predecessors(1)), [0, 3])
+        self.assertEqual(sorted(dense.predecessors(3)), [1, 2])
+        self.assertEqual(list(dense.predecessors(0)), [])
+        self.assertEqual(list(dense.back_successors(3)), [1])
+        self.assertEqual(
+            dense.successor_lists(), [[1, 2], [3], [3], [1, 4], []]
+        )
+
+    def test_snapshot(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+        """
+        )
+        dense = scfg.to_dense()
+        new_block = scfg.add_block()
+        scfg.insert_block_between(new_block, [ref_dict["0"]], [ref_dict["1"]])
+        self.assertEqual(scfg.block_id(new_block), 2)
+        self.assertNotIn(new_block, dense)
+        self.assertEqual(dense.out_edges[ref_dict["0"]], (ref_dict["1"],))
+
+
+class TestSubgraphView(SCFGComparator):
+    def setUp(self):
+        # A loop 1-2-3 with an inner loop 2-3 and a side exit from 2.
+        self.scfg, self.r = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: ["3", "4"]
+        "3":
+            type: "basic"
+            out: ["1", "2"]
+        "4":
+            type: "basic"
+            out: []
+        """
+        )
+
+    def test_neighbours(self):
+        r = self.r
+        view = self.scfg.subgraph({r["2"], r["3"]})
+        self.assertEqual(len(view), 2)
+        self.assertIn(r["2"], view)
+        self.assertNotIn(r["1"], view)
+        self.assertEqual(list(view.successors(r["2"])), [r["3"]])
+        self.assertEqual(list(view[r["3"]]), [r["2"]])
+        self.assertEqual(len(view.successors(r["3"])), 1)
+        self.assertNotIn(r["1"], view.successors(r["3"]))
+        self.assertEqual(sorted(view.predecessors(r["2"])), [r["3"]])
+        # The view is live.
+        view.blocks.add(r["1"])
+        self.assertEqual(list(view.successors(r["3"])), [r["1"], r["2"]])
+
+    def test_analyses(self):
+        r = self.r
+        view = self.scfg.subgraph({r["1"], r["2"], r["3"]})
+        headers, entries = view.find_headers_and_entries()
+        self.assertEqual((headers, entries), ({r["1"]}, {r["0"]}))
+        exiting, exits = view.find_exiting_and_exits()
+        self.assertEqual((exiting, exits), ({r["2"]}, {r["4"]}))
+        self.assertEqual(view.compute_scc(), [{r["1"], r["2"], r["3"]}])
+
+        inner = view.subgraph({r["2"], r["3"], r["4"]})
+        self.assertEqual(set(inner), {r["2"], r["3"]})
+        self.assertEqual(inner.compute_scc(), [{r["2"], r["3"]}])
+        self.assertTrue(inner.is_reachable(r["3"], r["2"]))
+        self.assertFalse(inner.is_reachable(r["3"], r["1"]))
+        self.assertTrue(self.scfg.is_reachable(r["3"], r["1"]))
+
+        from numba_rvsdg.core.dominators import dominator_tree
+
+        doms = dominator_tree(self.scfg.subgraph({r["2"], r["3"], r["4"]}))
+        # Rooted at the header of the subgraph.
+        self.assertEqual(doms.roots, [r["2"]])
+        self.assertEqual(doms.idom(r["4"]), r["2"])
+        self.assertEqual(doms.idom(r["3"]), r["2"])
+
+    def test_dense(self):
+        r = self.r
+        dense = self.scfg.subgraph([r["3"], r["2"]]).to_dense()
+        self.assertEqual(dense.names, [r["3"], r["2"]])
+        self.assertEqual(dense.successor_lists(), [[1], [0]])
+        self.assertEqual(dense.predecessor_lists(), [[1], [0]])
+
+
+class TestSCFGBuilder(SCFGComparator):
+    def test_matches_incremental(self):
+        builder = SCFG.builder()
+        b = [builder.add_block() for _ in range(4)]
+        builder.add_connections(b[0], [b[1], b[2]])
+        builder.add_connections(b[1], [b[3]])
+        builder.add_connections(b[2], [b[3]])
+        builder.add_connections(b[3], [b[1]], [b[1]])
+        built = builder.build()
+
+        scfg = SCFG()
+        names = [scfg.add_block() for _ in range(4)]
+        scfg.add_connections(names[0], [names[1], names[2]])
+        scfg.add_connections(names[1], [names[3]])
+        scfg.add_connections(names[2], [names[3]])
+        scfg.add_connections(names[3], [names[1]], [names[1]])
+        # Blocks without connections get empty edge lists.
+        self.assertSCFGEqual(built, scfg)
+        self.assertInEdgesConsistent(built)
+        self.assertEqual(built.find_head(), b[0])
+        self.assertEqual(built.find_exiting_blocks(), [])
+        self.assertEqual([built.block_id(name) for name in b], [0, 1, 2, 3])
+
+    def test_unconnected_block(self):
+        builder = SCFG.builder()
+        entry = builder.add_block()
+        exit = builder.add_block()
+        builder.add_connections(entry, [exit])
+        scfg = builder.build()
+        self.assertEqual(scfg.out_edges[exit], ())
+        self.assertEqual(scfg.find_exiting_blocks(), [exit])
+
+    def test_unknown_target(self):
+        builder = SCFG.builder()
+        entry = builder.add_block()
+        builder.add_connections(entry, [BlockName("missing")])
+        with self.assertRaises(ValueError):
+            builder.build()
+
+    def test_invalid_edges(self):
+        builder = SCFG.builder()
+        entry, exit = builder.add_block(), builder.add_block()
+        builder.add_connections(entry, [exit, exit])
+        with self.assertRaisesRegex(ValueError, "Duplicate"):
+            builder.build()
+
+        for back_edge in (entry, BlockName("missing")):
+            builder = SCFG.builder()
+            entry, exit = builder.add_block(), builder.add_block()
+            builder.add_connections(entry, [exit], [back_edge])
+            with self.assertRaisesRegex(ValueError, "Back edge"):
+                builder.build()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+import random
+from unittest import main
+
+from numba_rvsdg.core.datastructures.scfg import SCFG
+from numba_rvsdg.core.dominators import DominatorTree
+from numba_rvsdg.core.sese import ProgramStructureTree
+from numba_rvsdg.tests.test_utils import SCFGComparator
+
+
+class TestProgramStructureTree(SCFGComparator):
+    def test_nested(self):
+        scfg, ref_dict = SCFG.from_yaml(
+            """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3", "4"]
+        "2":
+            type: "basic"
+            out: ["6"]
+        "3":
+            type: "basic"
+            out: ["5"]
+        "4":
+            type: "basic"
+            out: ["5"]
+        "5":
+            type: "basic"
+            out: ["6"]
+        "6":
+            type: "basic"
+            out: ["7"]
+        "7":
+            type: "basic"
+            out: ["6", "8"]
+        "8":
+            type: "basic"
+            out: []
+        """
+        )
+        r = ref_dict
+        pst = scfg.program_structure_tree()
+        self.assertIs(pst, scfg.program_structure_tree())
+        self.assertEqual(len(pst), 2)
+        [outer] = pst.roots
+        [inner] = outer.children
+        self.assertEqual(list(pst), [outer, inner])
+        self.assertIs(inner.parent, outer)
+
+        # The loop header 6 is entered from both branches, so the region of
+        # the outer branch only ends at the edge leaving the loop.
+        self.assertEqual(outer.entry, r["0"])
+        self.assertEqual(outer.exit, (r["7"], r["8"]))
+        self.assertEqual(outer.blocks, {r[k] for k in "1234567"})
+        self.assertEqual(inner.entry, r["1"])
+        self.assertEqual(inner.exit, r["5"])
+        self.assertEqual(inner.blocks, {r["3"], r["4"]})
+
+        self.assertIs(pst.region_at(r["0"]), outer)
+        self.assertIs(pst.region_at(r["1"]), inner)
+        self.assertIsNone(pst.region_at(r["2"]))
+        self.assertIs(pst.region_of(r["3"]), inner)
+        self.assertIs(pst.region_of(r["5"]), outer)
+        self.assertIsNone(pst.region_of(r["0"]))
+        self.assertIsNone(pst.region_of(r["8"]))
+
+    def test_linear(self):
+        # A chain of blocks has no regions with blocks inside.
+        pst = ProgramStructureTree(["0", "1", "2"], [[1], [2], []], [0])
+        self.assertEqual(len(pst), 0)
+        self.assertEqual(pst.roots, [])
+
+    def test_random_graphs(self):
+        # Every region is single entry single exit, and on acyclic graphs the
+        # first branch starts a region exactly when it has an immediate
+        # post-dominator.
+        rnd = random.Random(0)
+        for _ in range(300):
+            size = rnd.randint(1, 10)
+            names = [str(k) for k in range(size)]
+            succs = [
+                sorted({rnd.randrange(size) for _ in range(rnd.randint(0, 2))})
+                for _ in range(size)
+            ]
+            reached = _reached(succs)
+            for region in ProgramStructureTree(names, succs, [0]):
+                inside = {int(name) for name in region.blocks}
+                entering = {
+                    (src, dst)
+                    for src in reached - inside
+                    for dst in succs[src]
+                    if dst in inside
+                }
+                leaving = {
+                    (src, dst)
+                    for src in inside
+                    for dst in succs[src] or [None]
+                    if dst not in inside
+                }
+                if 0 in inside:
+                    self.assertEqual(region.entry, (None, "0"))
+                else:
+                    self.assertLessEqual(entering, _edges(region.entry, succs, True))
+                self.assertLessEqual(leaving, _edges(region.exit, succs, False))
+                if region.parent is not None:
+                    self.assertLessEqual(region.blocks, region.parent.blocks)
+
+            dag = [[t for t in targets if t > k] for k, targets in enumerate(succs)]
+            reached = _reached(dag)
+            dag = [targets if k in reached else [] for k, targets in enumerate(dag)]
+            preds = [[] for _ in names]
+            for k, targets in enumerate(dag):
+                for succ in targets:
+                    preds[succ].append(k)
+            ids = {name: k for k, name in enumerate(names)}
+            sinks = [k for k in reached if not dag[k]]
+            post_doms = DominatorTree(names, ids, preds, dag, sinks)
+            pst = ProgramStructureTree(names, dag, [0])
+            # Like `begin` of branch restructuring, the first branch dominates
+            # all blocks after it.
+            begin = 0
+            while len(dag[begin]) == 1:
+                begin = dag[begin][0]
+            self.assertEqual(
+                pst.region_at(names[begin]) is not None,
+                post_doms.idom(names[begin]) is not None,
+            )
+
+
+def _reached(succs):
+    reached = {0}
+    stack = [0]
+    while stack:
+        for succ in succs[stack.pop()]:
+            if succ not in reached:
+                reached.add(succ)
+                stack.append(succ)
+    return reached
+
+
+def _edges(boundary, succs, out):
+    # The edges through a region boundary, those leaving a block boundary if
+    # `out` and those entering it otherwise.
+    if isinstance(boundary, tuple):
+        return {tuple(None if name is None else int(name) for name in boundary)}
+    k = int(boundary)
+    if out:
+        return {(k, dst) for dst in succs[k]}
+    return {(src, k) for src, targets in enumerate(succs) if k in targets}
+
+
+if __name__ == "__main__":
+    main()
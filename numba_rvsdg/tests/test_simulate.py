@@ -8,6 +8,9 @@ class SimulatorTest(unittest.TestCase):
         with self.subTest():
             sim = Simulator(flow, func.__globals__)
             self.assertEqual(sim.run(kwargs), func(**kwargs))
+        with self.subTest(nested=True):
+            sim = Simulator(flow.nested(), func.__globals__)
+            self.assertEqual(sim.run(kwargs), func(**kwargs))
 
     def test_simple_branch(self):
         def foo(x):
@@ -19,7 +22,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # if case
         self._run(foo, flow, {"x": 1})
@@ -34,7 +37,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # loop bypass case
         self._run(foo, flow, {"x": 0})
@@ -53,7 +56,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # loop bypass case
         self._run(foo, flow, {"x": 0})
@@ -72,7 +75,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # loop bypass case
         self._run(foo, flow, {"x": 0})
@@ -96,7 +99,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # no loop
         self._run(foo, flow, {"x": 0})
@@ -120,7 +123,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # loop bypass
         self._run(foo, flow, {"x": 0})
@@ -136,7 +139,7 @@ class SimulatorTest(unittest.TestCase):
             return (x > 0 and x < 10) or (y > 0 and y < 10)
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         self._run(foo, flow, {"x": 5, "y": 5})
 
@@ -150,7 +153,7 @@ class SimulatorTest(unittest.TestCase):
             return c
 
         flow = ByteFlow.from_bytecode(foo)
-        # flow = flow.restructure()
+        flow.restructure()
 
         # no looping
         self._run(foo, flow, {"s": 0, "e": 0})
@@ -166,6 +169,26 @@ class SimulatorTest(unittest.TestCase):
         # mutiple iterations
         self._run(foo, flow, {"s": 23, "e": 28})
 
+    def test_return_in_nested_loops(self):
+        # The exits of the inner loops are redirected through synthetic
+        # blocks, which must also redirect the jump tables of the branches
+        # that lead to them.
+        def foo(c):
+            if c < 14:
+                for i1 in range(1):
+                    if i1 > 3:
+                        for i3 in range(0):
+                            return c
+            return c
+
+        flow = ByteFlow.from_bytecode(foo)
+        flow.restructure()
+
+        # skip the loops
+        self._run(foo, flow, {"c": 20})
+        # run the outer loop
+        self._run(foo, flow, {"c": 0})
+
 
 if __name__ == "__main__":
     unittest.main()
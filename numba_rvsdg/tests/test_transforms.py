@@ -4,10 +4,16 @@ from numba_rvsdg.core.datastructures.labels import (
     ControlLabel,
     SyntheticTail,
     SyntheticExit,
+    SyntheticHead,
+    SyntheticBranch,
 )
+from numba_rvsdg.core.datastructures.basic_block import RegionBlock
 from numba_rvsdg.core.datastructures.scfg import SCFG
 from numba_rvsdg.core.transformations import (
     loop_restructure_helper,
+    restructure_loop,
+    restructure_branch,
+    insert_block_and_control_blocks,
     join_returns,
     join_tails_and_exits,
 )
@@ -681,6 +687,462 @@ class TestLoopRestructure(SCFGComparator):
         expected_scfg, block_ref_exp = SCFG.from_yaml(expected)
         loop_restructure_helper(original_scfg, set((block_ref_orig["1"], block_ref_orig["2"], block_ref_orig["3"], block_ref_orig["4"])))
         self.assertSCFGEqual(expected_scfg, original_scfg)
+        self.assertInEdgesConsistent(original_scfg)
+
+    def test_block_set_loop(self):
+        """Same as test_double_header, with the loop given as BlockSet."""
+        original = """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["4"]
+        "3":
+            type: "basic"
+            out: ["2", "5"]
+        "4":
+            type: "basic"
+            out: ["1"]
+        "5":
+            type: "basic"
+            out: []
+        """
+        original_scfg, block_ref_orig = SCFG.from_yaml(original)
+        reference_scfg, block_ref_reference = SCFG.from_yaml(original)
+        loop = original_scfg.block_set(
+            block_ref_orig[k] for k in ("1", "2", "3", "4")
+        )
+        loop_restructure_helper(original_scfg, loop)
+        loop_restructure_helper(
+            reference_scfg,
+            set(block_ref_reference[k] for k in ("1", "2", "3", "4"))
+        )
+        self.assertSCFGEqual(reference_scfg, original_scfg)
+        # The loop was updated in place with the synthetic blocks.
+        self.assertEqual(len(loop), 9)
+
+    def test_restructure_loop(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["1"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        original_scfg, block_ref_orig = SCFG.from_yaml(original)
+        restructure_loop(original_scfg)
+        [region] = original_scfg.regions.values()
+        self.assertEqual(region.kind, "loop")
+        self.assertEqual(region.header, block_ref_orig["1"])
+        self.assertEqual(
+            original_scfg.back_edges[region.exiting], (block_ref_orig["1"],)
+        )
+
+
+class TestBranchRestructure(SCFGComparator):
+    def regions(self, scfg):
+        return sorted(
+            (region.kind, region.header, region.exiting)
+            for region in scfg.regions.values()
+        )
+
+    def test_diamond(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["3"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        original_scfg, ref = SCFG.from_yaml(original)
+        expected_scfg, _ = SCFG.from_yaml(original)
+        restructure_branch(original_scfg)
+        self.assertSCFGEqual(expected_scfg, original_scfg)
+        self.assertEqual(
+            self.regions(original_scfg),
+            sorted([
+                ("branch", ref["1"], ref["1"]),
+                ("branch", ref["2"], ref["2"]),
+                ("head", ref["0"], ref["0"]),
+                ("tail", ref["3"], ref["3"]),
+            ]),
+        )
+
+    def test_empty_branch(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1", "2"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: []
+        """
+        original_scfg, ref = SCFG.from_yaml(original)
+        expected = """
+        "0":
+            type: "basic"
+            out: ["1", "3"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: []
+        "3":
+            type: "basic"
+            label_type: "synth_branch"
+            out: ["2"]
+        """
+        expected_scfg, _ = SCFG.from_yaml(expected)
+        restructure_branch(original_scfg)
+        self.assertSCFGEqual(expected_scfg, original_scfg)
+        self.assertEqual(len(original_scfg.regions), 4)
+
+    def test_nested_branches(self):
+        # The branch 1 is nested in the first branch of 0, and the branch 4
+        # is in the tail of 0.
+        original = """
+        "0":
+            type: "basic"
+            out: ["1", "6"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["7"]
+        "3":
+            type: "basic"
+            out: ["7"]
+        "7":
+            type: "basic"
+            out: ["4"]
+        "6":
+            type: "basic"
+            out: ["4"]
+        "4":
+            type: "basic"
+            out: ["5", "8"]
+        "5":
+            type: "basic"
+            out: ["9"]
+        "8":
+            type: "basic"
+            out: ["9"]
+        "9":
+            type: "basic"
+            out: []
+        """
+        original_scfg, ref = SCFG.from_yaml(original)
+        expected_scfg, _ = SCFG.from_yaml(original)
+        restructure_branch(original_scfg)
+        self.assertSCFGEqual(expected_scfg, original_scfg)
+        self.assertIn(("head", ref["1"], ref["1"]), self.regions(original_scfg))
+        self.assertIn(("tail", ref["7"], ref["7"]), self.regions(original_scfg))
+        self.assertIn(("head", ref["4"], ref["4"]), self.regions(original_scfg))
+        self.assertIn(("tail", ref["9"], ref["9"]), self.regions(original_scfg))
+        self.assertEqual(len(original_scfg.regions), 12)
+
+    def test_tail_with_two_headers(self):
+        # The branches of 0 join in two places, so a SyntheticHead is needed
+        # in front of the tail.
+        original = """
+        "0":
+            type: "basic"
+            out: ["1", "2", "3"]
+        "1":
+            type: "basic"
+            out: ["4"]
+        "2":
+            type: "basic"
+            out: ["4"]
+        "3":
+            type: "basic"
+            out: ["5"]
+        "4":
+            type: "basic"
+            out: ["5"]
+        "5":
+            type: "basic"
+            out: []
+        """
+        original_scfg, ref = SCFG.from_yaml(original)
+        restructure_branch(original_scfg)
+        [synth_head] = [
+            name for name, block in original_scfg.blocks.items()
+            if isinstance(block.label, SyntheticHead)
+        ]
+        # The empty branch from the SyntheticHead to 5 is populated too.
+        [synth_branch] = [
+            name for name, block in original_scfg.blocks.items()
+            if isinstance(block.label, SyntheticBranch)
+        ]
+        self.assertEqual(
+            original_scfg.out_edges[synth_head], (ref["4"], synth_branch)
+        )
+        self.assertIn(
+            ("tail", synth_head, ref["5"]), self.regions(original_scfg)
+        )
+
+    def test_branch_in_loop(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["4"]
+        "3":
+            type: "basic"
+            out: ["4"]
+        "4":
+            type: "basic"
+            out: ["1", "5"]
+            back: ["1"]
+        "5":
+            type: "basic"
+            out: []
+        """
+        original_scfg, ref = SCFG.from_yaml(original)
+        expected_scfg, _ = SCFG.from_yaml(original)
+        restructure_loop(original_scfg)
+        restructure_branch(original_scfg)
+        self.assertSCFGEqual(expected_scfg, original_scfg)
+        regions = self.regions(original_scfg)
+        # The loop is a single node of the linear graph around it, its body
+        # is restructured on its own.
+        self.assertIn(("loop", ref["1"], ref["4"]), regions)
+        self.assertIn(("head", ref["1"], ref["1"]), regions)
+        self.assertIn(("branch", ref["2"], ref["2"]), regions)
+        self.assertIn(("tail", ref["4"], ref["4"]), regions)
+        self.assertEqual(len(regions), 5)
+
+    def test_control_blocks_keep_edge_order(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["2", "1"]
+        "1":
+            type: "basic"
+            out: []
+        "2":
+            type: "basic"
+            out: []
+        """
+        original_scfg, ref = SCFG.from_yaml(original)
+        branch = insert_block_and_control_blocks(
+            original_scfg, [ref["0"]], [ref["1"], ref["2"]]
+        )
+        table = original_scfg[branch].branch_value_table
+        variable = original_scfg[branch].variable
+        targets = [
+            table[original_scfg[assign].variable_assignment[variable]]
+            for assign in original_scfg.out_edges[ref["0"]]
+        ]
+        self.assertEqual(targets, [ref["2"], ref["1"]])
+
+    def test_control_blocks_retarget_tables(self):
+        # A branching predecessor jumps to the assignment of each arc.
+        scfg = SCFG()
+        a, b = scfg.add_block(), scfg.add_block()
+        pred = scfg.add_block(
+            "branch", SyntheticHead(), variable="x", branch_value_table=[(0, a), (1, b)]
+        )
+        scfg.add_connections(pred, [a, b])
+        branch = insert_block_and_control_blocks(scfg, [pred], [a, b])
+        variable = scfg[branch].variable
+        table = scfg[pred].branch_value_table
+        self.assertEqual(set(table.values()), set(scfg.out_edges[pred]))
+        targets = [
+            scfg[branch].branch_value_table[
+                scfg[table[value]].variable_assignment[variable]
+            ]
+            for value in (0, 1)
+        ]
+        self.assertEqual(targets, [a, b])
+
+
+class TestRegionTree(SCFGComparator):
+    def test_nesting_in_any_order(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2"]
+        "2":
+            type: "basic"
+            out: ["3"]
+        "3":
+            type: "basic"
+            out: []
+        """
+        scfg, ref = SCFG.from_yaml(original)
+        tree = scfg.region_tree
+        inner = scfg.add_region(ref["1"], ref["1"], "loop", blocks={ref["1"]})
+        outer = scfg.add_region(
+            ref["0"], ref["2"], "head", blocks={ref["0"], ref["1"], ref["2"]}
+        )
+        # Same blocks as the inner region, so it is placed around it.
+        middle = scfg.add_region(ref["1"], ref["1"], "branch", blocks={ref["1"]})
+
+        self.assertEqual([node.region_name for node in tree.roots], [outer])
+        self.assertEqual(tree.children(outer), [middle])
+        self.assertEqual(tree.children(middle), [inner])
+        self.assertEqual(tree.parent(inner), middle)
+        self.assertEqual(tree[inner].depth, 3)
+        self.assertEqual(tree.region_of(ref["0"]), outer)
+        self.assertEqual(tree.region_of(ref["1"]), inner)
+        self.assertIsNone(tree.region_of(ref["3"]))
+
+        new_block = scfg.add_block()
+        tree.add_block(new_block, inner)
+        self.assertEqual(tree.region_of(new_block), inner)
+        self.assertIn(new_block, tree.blocks(outer))
+
+    def test_restructure_builds_tree(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["4"]
+        "3":
+            type: "basic"
+            out: ["4", "5"]
+        "4":
+            type: "basic"
+            out: ["1", "6"]
+        "5":
+            type: "basic"
+            out: ["6"]
+        "6":
+            type: "basic"
+            out: []
+        """
+        scfg, ref = SCFG.from_yaml(original)
+        restructure_loop(scfg)
+        restructure_branch(scfg)
+        tree = scfg.region_tree
+        self.assertEqual(len(tree), len(scfg.regions))
+        for node in tree:
+            region = scfg.regions[node.region_name]
+            # The block sets are exactly the blocks between header and
+            # exiting, including the synthetic blocks added later on.
+            headers, _ = scfg.find_headers_and_entries(node.blocks)
+            exiting, _ = scfg.find_exiting_and_exits(node.blocks)
+            self.assertEqual(headers, {region.header})
+            self.assertEqual(exiting, {region.exiting})
+            for child in node.children:
+                self.assertLessEqual(child.blocks, node.blocks)
+        [loop] = [
+            node for node in tree
+            if scfg.regions[node.region_name].kind == "loop"
+        ]
+        for name in loop.blocks:
+            node = tree[tree.region_of(name)]
+            self.assertTrue(node is loop or loop in node.ancestors())
+        for name in scfg.blocks:
+            region_name = tree.region_of(name)
+            if region_name is not None:
+                for child in tree[region_name].children:
+                    self.assertNotIn(name, child.blocks)
+
+
+class TestNestedRegions(SCFGComparator):
+    def test_nested(self):
+        original = """
+        "0":
+            type: "basic"
+            out: ["1"]
+        "1":
+            type: "basic"
+            out: ["2", "3"]
+        "2":
+            type: "basic"
+            out: ["4"]
+        "3":
+            type: "basic"
+            out: ["4", "5"]
+        "4":
+            type: "basic"
+            out: ["1", "6"]
+        "5":
+            type: "basic"
+            out: ["6"]
+        "6":
+            type: "basic"
+            out: []
+        """
+        scfg, ref = SCFG.from_yaml(original)
+        restructure_loop(scfg)
+        restructure_branch(scfg)
+        nested = scfg.nested()
+
+        seen = []
+        levels = [(nested, None)]
+        while levels:
+            level, region = levels.pop()
+            # Every level is a closed acyclic graph of its own.
+            head = level.find_head()
+            self.assertEqual(len(level.find_exiting_blocks()), 1)
+            self.assertTrue(all(len(c) == 1 for c in level.compute_scc()))
+            if region is not None:
+                # The header and exiting block may be in nested regions.
+                [exiting] = level.find_exiting_blocks()
+                block = level[head]
+                while isinstance(block, RegionBlock):
+                    head = block.subregion.find_head()
+                    block = block.subregion[head]
+                block = level[exiting]
+                while isinstance(block, RegionBlock):
+                    [exiting] = block.subregion.find_exiting_blocks()
+                    block = block.subregion[exiting]
+                self.assertEqual(head, region.header)
+                self.assertEqual(exiting, region.exiting)
+                self.assertEqual(
+                    region.jump_targets, scfg.out_edges[region.exiting]
+                )
+            for name, block in level.blocks.items():
+                if isinstance(block, RegionBlock):
+                    levels.append((block.subregion, block))
+                else:
+                    seen.append(name)
+        # Every block of the flat SCFG is in exactly one level.
+        self.assertEqual(sorted(seen), sorted(scfg.blocks))
+        # The loop is followed by a branch, so 0 and the loop form a head.
+        head_region = nested[nested.find_head()]
+        self.assertEqual(head_region.kind, "head")
+        self.assertEqual(head_region.header, ref["0"])
 
 
 if __name__ == "__main__":
@@ -20,6 +20,17 @@ class SCFGComparator(TestCase):
             self.assertEqual(first_scfg.out_edges[key1], second_scfg.out_edges[key2])
             self.assertEqual(first_scfg.back_edges[key1], second_scfg.back_edges[key2])
 
+    def assertInEdgesConsistent(self, scfg: SCFG):
+        expected = {name: [] for name in scfg.blocks}
+        for name in scfg.blocks:
+            for target in scfg.out_edges[name]:
+                expected[target].append(name)
+        for name in scfg.blocks:
+            self.assertEqual(
+                sorted(expected[name], key=lambda x: x.name),
+                sorted(scfg.in_edges[name], key=lambda x: x.name),
+            )
+
     def assertYAMLEquals(self, first_yaml: str, second_yaml: str, ref_dict: Dict):
         for key, value in ref_dict.items():
             second_yaml = second_yaml.replace(repr(value), key)